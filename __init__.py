@@ -22,10 +22,15 @@ Thanks so much for your purchase and please feel free to tag me @TheStrokeForge
 ''' 
 
 import os, sys, subprocess
+import json, shutil, tempfile
+import time, functools, contextlib, tracemalloc, cProfile, traceback
+import hashlib
 
 import math
 import numpy as np
 import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Context
 from logging import error, exception
 
@@ -34,7 +39,7 @@ import bmesh
 from bpy_extras.io_utils import ImportHelper
 from bpy.props import StringProperty, IntProperty, FloatProperty, BoolProperty, CollectionProperty, EnumProperty
 from bpy.types import Operator
-from mathutils import Matrix
+from mathutils import Matrix, Vector
 
 import webbrowser
 
@@ -48,6 +53,7 @@ class FlowData:
     CommonUVObjects = []
     CommonUVDupeObjects = []
     CommonUVOrigins = {}
+    CommonUVTags = {}       # [name] = the vox_ import tags of every model in a Shared UV set
 
     VertexCountInitialX = 0
     VertexCountFinalX = 0
@@ -64,6 +70,8 @@ class FlowData:
     ApproxLen = 0.0
     AutoRes = 0
     FinalTextureSize = 0.0
+    TileSize = 0            # UDIM tile size, 0 while the maps fit in one image
+    Tiles = []              # (UDIM number, size) of every tile
     Bleed = 0.0
 
     MaterialMaps = []
@@ -82,6 +90,9 @@ class FlowData:
     TwoStepCommonUV = False
     ProcessRunning = False
     MissingActors = False
+    BackgroundCleanStage = None     # Stage the modal Lazy Clean is on, None if it's not running
+    CleanError = None               # Why the last Lazy Clean stopped, None if it didn't
+    ExportError = None              # Why the last export didn't get everything out, None if it did
 
     ImportNameIndex = 0
  
@@ -90,6 +101,7 @@ class StaticData:
     #Default Numbers ----------------------------------------
     StandardBakeResolutions = [8,16,32,64,128,256,512,1024,2048,4096,8192]
     TriangulateLoops = 8
+    PaletteCacheSize = 64   # palettes the importer keeps decoded
     
     #Default Preferences ---------------------------------------
     # Importer
@@ -98,25 +110,45 @@ class StaticData:
     # Cleaner
     ResolutionDefault = "Mini"
     UpscalingDefault = "1"
+    MaxTileDefault = "8192"
     UVMethodDefault = "cube"
     RotateUVDefault = False
+    CollapseIslandsDefault = False
+    ShareIslandsDefault = False
     MCNVResDefault = "1024"
     NVDecimationDefault = 70
 
     BaseColorDefault = (0.6,0.0,0.2,1.0)
     AlphaDefault = False
     EmitStrengthDefault = 8.0
+    BakeDeviceDefault = "GPU"
+    MemoryBudgetDefault = 0         # MB, 0 for no limit
+    BudgetActionDefault = "Downscale"
+    PackORMDefault = False
+    ORMChannels = {"Roughness": 1, "Metallic": 2, "Transmission": 3}   # the channel of every map in a packed ORM image, R is occlusion
 
     ModelBackupDefault = True
+    BackgroundCleanDefault = False
     OrganiseDefault = True  # Organise model backups
 
     # Exporter
     TriangulateDefault = True
+    ParallelExportDefault = False
+    WorkerCountDefault = max(1, (os.cpu_count() or 2)//2)
+    AtlasSizeDefault = "4096"
+
+    # Batch
+    BatchRetriesDefault = 2
+
+    # Cache
+    CacheDefault = False
+    CacheSizeDefault = 2048     # MB
 
     #UI Data --------------------------------------------------
     BigButtonHeight = 1.5
     ButtonHeightMedium = 1.2
     CleanModePaneHeight = 1
+    BackgroundCleanInterval = 0.05  # seconds between the stages of a background clean
 
     RowSpacing = 1
 
@@ -128,6 +160,150 @@ class StaticData:
     VerticalSplitFactor = 0.5
 
 
+class VoxProfiler:
+    #Records wall time, operator calls, mode_set calls & memory peaks for every stage of the clean pipeline, when enabled in the General Settings.
+    #A run starts with the first stage & ends with EndRun(), which appends the stages to a JSON-lines log.
+    Run = None          # Stages of the run in progress
+    RunName = None
+    LastRun = []        # Stages of the last finished run, for the settings panel
+    Depth = 0
+    TracedPeaks = []    # traced memory peak of every open stage, outermost first
+
+    Profile = None      # cProfile of the run in progress, if enabled
+    OperatorCalls = 0
+    ModeSets = 0
+    OriginalOpCall = None
+
+    def Enabled():
+        try: return bpy.context.scene.vox_tool.ProfileStages
+        except Exception: return False
+
+    def Stage(Name):
+        #Decorator, records every call of the function as a stage
+        def Decorator(Function):
+            @functools.wraps(Function)
+            def Wrapper(*Args, **KwArgs):
+                if not VoxProfiler.Enabled(): return Function(*Args, **KwArgs)
+                with VoxProfiler.Measure(Name):
+                    return Function(*Args, **KwArgs)
+            return Wrapper
+        return Decorator
+
+    @contextlib.contextmanager
+    def Measure(Name):
+        if not VoxProfiler.Enabled():
+            yield
+            return
+
+        if VoxProfiler.Run is None: VoxProfiler.StartRun()
+
+        Start = time.perf_counter()
+        Operators, ModeSets = VoxProfiler.OperatorCalls, VoxProfiler.ModeSets
+        PeakBefore = VoxProfiler.PeakRSS()
+        # tracemalloc only has the one peak. The parent's peak so far is kept on the stack before it's reset for this stage
+        if tracemalloc.is_tracing():
+            if len(VoxProfiler.TracedPeaks) > 0: VoxProfiler.TracedPeaks[-1] = max(VoxProfiler.TracedPeaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            VoxProfiler.TracedPeaks.append(0)
+
+        VoxProfiler.Depth += 1
+        try:
+            yield
+        finally:
+            VoxProfiler.Depth -= 1
+            # the OS only keeps the process' peak, so a stage gets how far it pushed that peak up, 0 if it stayed under it
+            PeakAfter = VoxProfiler.PeakRSS()
+            Stage = {"Stage": Name, "Depth": VoxProfiler.Depth, "Seconds": round(time.perf_counter() - Start, 4),
+                     "Operators": VoxProfiler.OperatorCalls - Operators, "ModeSets": VoxProfiler.ModeSets - ModeSets,
+                     "ProcessPeakRSSMB": PeakAfter, "PeakRSSGrowthMB": None if PeakAfter is None else round(PeakAfter - PeakBefore, 1)}
+            if tracemalloc.is_tracing() and len(VoxProfiler.TracedPeaks) > 0:
+                # & a stage's peak goes up to its parent
+                Peak = max(VoxProfiler.TracedPeaks.pop(), tracemalloc.get_traced_memory()[1])
+                if len(VoxProfiler.TracedPeaks) > 0: VoxProfiler.TracedPeaks[-1] = max(VoxProfiler.TracedPeaks[-1], Peak)
+                Stage["PeakTracedMB"] = round(Peak/2**20, 2)
+            VoxProfiler.Run.append(Stage)
+
+    def StartRun():
+        mytool = bpy.context.scene.vox_tool
+
+        VoxProfiler.Run, VoxProfiler.TracedPeaks = [], []
+        VoxProfiler.RunName = bpy.context.active_object.name if bpy.context.active_object != None else "-"
+        VoxProfiler.CountOperators(True)
+
+        if mytool.ProfileMemory and not tracemalloc.is_tracing(): tracemalloc.start()
+        if mytool.ProfileCProfile:
+            VoxProfiler.Profile = cProfile.Profile()
+            VoxProfiler.Profile.enable()
+
+    def EndRun(Kind = "Clean"):
+        #Writes the stages of the run to the log & stops all the counters
+        if VoxProfiler.Run is None: return
+
+        mytool = bpy.context.scene.vox_tool
+        LogFile = VoxProfiler.LogFile()
+        RunInfo = {"Time": time.strftime("%Y-%m-%d %H:%M:%S"), "Kind": Kind, "Model": VoxProfiler.RunName, "File": bpy.data.filepath}
+
+        if VoxProfiler.Profile is not None:
+            VoxProfiler.Profile.disable()
+            RunInfo["CProfile"] = os.path.splitext(LogFile)[0] + "_" + time.strftime("%Y%m%d_%H%M%S") + ".prof"
+            try: VoxProfiler.Profile.dump_stats(RunInfo["CProfile"])
+            except Exception as e: print("Profile Error",e)
+            VoxProfiler.Profile = None
+
+        if tracemalloc.is_tracing(): tracemalloc.stop()
+        VoxProfiler.CountOperators(False)
+
+        try:
+            with open(LogFile, 'a') as Log:
+                for Stage in VoxProfiler.Run:
+                    Log.write(json.dumps(dict(RunInfo, **Stage)) + "\n")
+        except Exception as e:
+            print("Profile Log Error",e)
+
+        VoxProfiler.LastRun = VoxProfiler.Run
+        VoxProfiler.Run = None
+        VoxProfiler.RunName = None
+
+        print("\n● PROFILE (" + Kind + ", " + RunInfo["Model"] + ")  ->  " + LogFile)
+        for Stage in VoxProfiler.LastRun:
+            print("  " + "  "*Stage["Depth"] + Stage["Stage"].ljust(20), str(Stage["Seconds"]).rjust(9), "s", str(Stage["Operators"]).rjust(6), "ops", str(Stage["ModeSets"]).rjust(5), "mode sets")
+        print("\n")
+
+    def LogFile():
+        mytool = bpy.context.scene.vox_tool
+        if mytool.ProfileLog == "": return os.path.join(tempfile.gettempdir(), "VoxCleanerProfile.jsonl")
+        return os.path.realpath(bpy.path.abspath(mytool.ProfileLog))
+
+    def PeakRSS():
+        # Peak resident memory of the process in MB, where the OS tells us
+        try:
+            import resource
+            Peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return round(Peak/2**20 if sys.platform == "darwin" else Peak/2**10, 1)
+        except Exception:
+            return None
+
+    def CountOperators(Enable):
+        #Counts bpy.ops calls by wrapping bpy.ops' internal call function while a run is going on
+        OpsModule = sys.modules.get("bpy.ops")
+        if OpsModule is None or "_op_call" not in vars(OpsModule): return
+
+        if Enable and VoxProfiler.OriginalOpCall is None:
+            OriginalOpCall = OpsModule._op_call
+
+            def CountingOpCall(IdName, *Args):
+                VoxProfiler.OperatorCalls += 1
+                if IdName in ("object.mode_set", "OBJECT_OT_mode_set"): VoxProfiler.ModeSets += 1
+                return OriginalOpCall(IdName, *Args)
+
+            VoxProfiler.OriginalOpCall = OriginalOpCall
+            OpsModule._op_call = CountingOpCall
+
+        elif not Enable and VoxProfiler.OriginalOpCall is not None:
+            OpsModule._op_call = VoxProfiler.OriginalOpCall
+            VoxProfiler.OriginalOpCall = None
+
+
 class VoxProperties(bpy.types.PropertyGroup):
     # Clean related ###########################################################################################################################################################################################################################
     BaseColor : bpy.props.FloatVectorProperty(name='',subtype='COLOR_GAMMA',size=4, min=0.0, max=1.0, precision=4, default = StaticData.BaseColorDefault, description="""Base color of the generated image.
@@ -160,6 +336,29 @@ More upscaling takes more time to clean.
 
 Current upscaling""") # type: ignore
     
+    MaxTileSize : bpy.props.EnumProperty(
+        name = "",default= StaticData.MaxTileDefault,
+        items = [("1024", "1024 px", "", 1),
+                 ("2048", "2048 px", "", 2),
+                 ("4096", "4096 px", "", 3),
+                 ("8192", "8192 px", "", 4)],
+        description="""Largest texture for Voxel Models. 
+Models that need a bigger texture get UDIM tiles of this size instead, each baked, freed & exported as its own image.
+UDIM models can be exported as OBJ or FBX, not GLB.
+
+Max Texture Size""") # type: ignore
+
+    AtlasSize : bpy.props.EnumProperty(
+        name = "",default= StaticData.AtlasSizeDefault,
+        items = [("1024", "1024 px", "", 1),
+                 ("2048", "2048 px", "", 2),
+                 ("4096", "4096 px", "", 3),
+                 ("8192", "8192 px", "", 4)],
+        description="""Largest texture atlas to pack models into. 
+More atlases are made when the models don't fit in one.
+
+Max Atlas Size""") # type: ignore
+
     MCNVResolution : bpy.props.EnumProperty(
         name = "",default= StaticData.MCNVResDefault,
         items = [("64", "64 px", "", 1),
@@ -198,6 +397,28 @@ UV Projection method you're hovering on""",default = "cube") # type: ignore
 More will result in more cleaning""") # type: ignore
 
     AlphaBool: bpy.props.BoolProperty(name="", default = False, description="Should the generated image have alpha?") # type: ignore
+
+    BakeDevice : bpy.props.EnumProperty(name = "",
+        items = [("GPU", "GPU", "Bake on the GPU set up in Blender's preferences. Falls back to the CPU if there's none", 1),
+                 ("CPU", "CPU", "Always bake on the CPU. Slower, but the same on every machine", 2),
+                 ("RASTER", "CPU Rasterizer", """Fill non-voxel textures straight from the source's vertex colors, without Cycles. Runs on any machine.
+Falls back to a Cycles CPU bake when the source's materials are more than plain color attributes & values""", 3),],
+        description="""Device used by Cycles while baking the textures.
+
+Bake device you're hovering on""",default = StaticData.BakeDeviceDefault) # type: ignore
+
+    PackORM: bpy.props.BoolProperty(name="", default = StaticData.PackORMDefault, description="""Pack the baked Roughness, Metallic & Transmission maps into the channels of one ORM image.
+R: Occlusion (white), G: Roughness, B: Metallic, A: Transmission. One image to export instead of three""") # type: ignore
+
+    MemoryBudget : bpy.props.IntProperty(name = "", default = StaticData.MemoryBudgetDefault, min = 0, max = 1048576, subtype = 'NONE', description = """Most memory the bake images may take, in MB. 0 for no limit.
+Checked before the images are made, so a bake that's too big never starts""") # type: ignore
+
+    BudgetAction : bpy.props.EnumProperty(name = "",
+        items = [("Downscale", "Downscale", "Halve the texture size until the bake fits. Voxel models don't go below 1x upscaling, to stay Pixel-Perfect", 1),
+                 ("Refuse", "Refuse", "Stop the clean & bring the models back", 2),],
+        description="""What to do when a bake needs more memory than the budget.
+
+Action you're hovering on""",default = StaticData.BudgetActionDefault) # type: ignore
     
     CleanGeo: bpy.props.BoolProperty(name="Clean Geometry", default = True, description="""Clean Geometry while cleaning. 
 Disable if you wish to preserve the geometry for better mesh flexing""") # type: ignore
@@ -215,9 +436,25 @@ Disabling will not rotate the UV islands
                                      
 Affects only Voxel models""") # type: ignore
 
+    CollapseIslands: bpy.props.BoolProperty(name="", default = StaticData.CollapseIslandsDefault, description="""Shrinks the baked textures after baking. 
+UV islands of a single flat color are squeezed into one shared pixel & the rest are repacked into a smaller texture.
+Lazy Clean does it right after the bake, the 2-Step Process when it's finished, so the model can still be re-baked
+                                     
+Affects only Voxel models without UDIM tiles""") # type: ignore
+
+    ShareIslands: bpy.props.BoolProperty(name="", default = StaticData.ShareIslandsDefault, description="""Shrinks the baked textures after baking. 
+UV islands with exactly the same texels, like repeated windows, bricks & tiles, share one spot in the texture.
+Lazy Clean does it right after the bake, the 2-Step Process when it's finished, so the model can still be re-baked
+                                     
+Affects only Voxel models without UDIM tiles""") # type: ignore
+
     EmitStrength : bpy.props.FloatProperty(name="", default=StaticData.EmitStrengthDefault,min=0.0, max=100.0, description="""Default emission strength if emission is enabled.
 This can be tweaked later in the shader nodes""") # type: ignore
 
+    BackgroundClean: bpy.props.BoolProperty(name="Clean in the background", default = StaticData.BackgroundCleanDefault, description="""Lazy Clean one stage at a time, with a progress bar. Blender stays usable in between the stages.
+A stage itself still holds Blender until it's done, on big models that's a bake of one map, the UV scaling or the type check.
+Press Esc to cancel, the models are put back the way they were""") # type: ignore
+
     CreateBackup: bpy.props.BoolProperty(name="Create model backup", default = StaticData.ModelBackupDefault, description="Enabling preserves a version of the original model in the scene") # type: ignore
 
     OrganiseBackups: bpy.props.BoolProperty(name="Organise backups into Collections", default = StaticData.ModelBackupDefault, description="""Enabling will organise your backups in a Blender collection 
@@ -228,6 +465,33 @@ called 'Vox Cleaner Backups', not cluttering your Blender outliner""") # type: i
     ExportLocation : bpy.props.StringProperty(name="",default = "", description="Directory where your objects will be exported", subtype="DIR_PATH") # type: ignore
 
     TriangulatedExport: bpy.props.BoolProperty(name="Export Triangulated model", default = StaticData.TriangulateDefault, description="Enabling triangulates the model before exporting. (Enabling is highly recommended)") # type: ignore
+
+    ParallelExport: bpy.props.BoolProperty(name="Export in background workers", default = StaticData.ParallelExportDefault, description="""Export multiple models at once using background Blender processes.
+Each worker exports its own share of the models, so exports scale with the number of cores.
+
+Only kicks in when more than one file is being exported""") # type: ignore
+
+    WorkerCount: bpy.props.IntProperty(name="", default = StaticData.WorkerCountDefault, min = 1, max = 64, description="""Number of background Blender processes to use.
+Each one takes up it's own memory, so keep this below the number of cores""") # type: ignore
+
+    # Batch related #########################################################################################################################################################
+    BatchInput : bpy.props.StringProperty(name="",default = "", description="Folder with the .vox & .blend files to clean. Sub folders are included", subtype="DIR_PATH") # type: ignore
+
+    BatchFormats : bpy.props.EnumProperty(name = "",
+        items = [("OBJ", "OBJ", "Export an OBJ of every cleaned model, with textures"),
+                 ("FBX", "FBX", "Export an FBX of every cleaned model, with textures"),
+                 ("GLB", "GLB", "Export a GLB of every cleaned model, textures inside"),],
+        description = "Formats every cleaned model is exported in", options = {'ENUM_FLAG'}, default = {"OBJ"}) # type: ignore
+
+    BatchRetries : bpy.props.IntProperty(name="", default = StaticData.BatchRetriesDefault, min = 0, max = 10, description="""How many times a file is tried again when its worker crashes.
+Files that fail with an error aren't retried""") # type: ignore
+
+    # Cache related #########################################################################################################################################################
+    UseCache: bpy.props.BoolProperty(name="Cache cleaned models", default = StaticData.CacheDefault, description="""Keep the result of every Lazy Clean on disk. Cleaning a model that was cleaned before with the same settings just loads it back, without any baking.
+Models are matched by their mesh, color attributes & materials. Shared UV cleans aren't cached""") # type: ignore
+
+    CacheSize: bpy.props.IntProperty(name="", default = StaticData.CacheSizeDefault, min = 64, max = 65536, description="""Most disk space the cache can take up, in MB.
+The models that haven't been used for the longest are removed first""") # type: ignore
     
     
     
@@ -238,6 +502,16 @@ called 'Vox Cleaner Backups', not cluttering your Blender outliner""") # type: i
     ExportTransmission: bpy.props.BoolProperty(name="Transmission (T)", description="""Export transparency mask texture if available""", default = True) # type: ignore
     
 
+    # Profiler related #########################################################################################################################################################
+    ProfileStages: bpy.props.BoolProperty(name = "Profile cleaning stages", description = """Record the time, operator calls & memory of every cleaning & export stage.
+A summary shows up here & every run is added to the profile log""", default = False) # type: ignore
+
+    ProfileMemory: bpy.props.BoolProperty(name = "Trace Python memory", description = "Also record the peak Python memory of every stage. Slows down cleaning a bit", default = False) # type: ignore
+
+    ProfileCProfile: bpy.props.BoolProperty(name = "Capture cProfile", description = "Save a cProfile capture (.prof) of every run next to the profile log", default = False) # type: ignore
+
+    ProfileLog: bpy.props.StringProperty(name = "", default = "", subtype = "FILE_PATH", description = "JSON-lines file the profiles are added to. Leave empty to use the system's temporary folder") # type: ignore
+
     # Import related #########################################################################################################################################################
     Organize: bpy.props.BoolProperty(name = "Organize into Collections", description = "Organize imported objects into collections based on their Vox file names", default = False) # type: ignore
     
@@ -250,6 +524,26 @@ called 'Vox Cleaner Backups', not cluttering your Blender outliner""") # type: i
 Recommended for Materials containing Map Values like 0.1.
 
 Affects: Emission & Transmission values''',default = False) # type: ignore
+
+    Reimport: bpy.props.BoolProperty(name = "Only update changed models", description = """Importing a file again updates the models of its last import, instead of adding new ones.
+Models with the same voxels are kept as they are (even cleaned ones), moved models are just moved, & only the changed ones are rebuilt.
+Models that aren't in the file anymore are removed""", default = False) # type: ignore
+
+    CullBetweenModels: bpy.props.BoolProperty(name = "Hide faces between models", description = """Leave out the faces where models touch each other, as they're covered by the other model's voxels.
+Great for modular kits & scenes made of many parts. Every model in the file is read to find its neighbours""", default = False) # type: ignore
+
+    FillCavities: bpy.props.BoolProperty(name = "Fill sealed cavities", description = """Treat closed-off empty space inside a model, like hollow walls & sealed rooms, as solid.
+The faces inside can't be seen, so they're never made & take no space in the texture""", default = False) # type: ignore
+
+    LODLevels: bpy.props.IntProperty(name = "LOD Levels", description = """Also make lower detail copies of every model, at 1/2, 1/4 & 1/8 the resolution, named _LOD0 to _LOD3.
+Made in voxel space, each voxel taking the most common color of the ones it replaces. Clean a chain together with Shared UVs to give it one texture""", default = 0, min = 0, max = 3) # type: ignore
+
+    ChunkSize: bpy.props.EnumProperty(name = "Chunks", description = """Split big models into cubes of this many voxels, each its own object, to be culled & streamed in-engine.
+Every chunk is cleaned & baked on its own, keeping the bakes small. The faces between chunks aren't made""",
+                                      items = [('0', "Off", "Keep every model whole"),
+                                               ('32', "32", "32 x 32 x 32 voxel chunks"),
+                                               ('64', "64", "64 x 64 x 64 voxel chunks"),
+                                               ('128', "128", "128 x 128 x 128 voxel chunks")], default = '0') # type: ignore
     
     ImportColor: bpy.props.BoolProperty(name="Color (C)", description="""Import color map""", default = True) # type: ignore
     ImportRoughness: bpy.props.BoolProperty(name="Roughness (R)", description="""Import roughness map""", default = True) # type: ignore
@@ -265,294 +559,193 @@ class Vec3:
         return self.x + self.y*256 + self.z*256*256
 
 class VoxelObject:
+    # The 6 sides of a voxel - the neighbour that hides it & its corners, wound so the normals point out
+    Sides = (((1, 0, 0),  ((1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1))),
+             ((0, 1, 0),  ((0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0))),
+             ((0, 0, 1),  ((0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1))),
+             ((-1, 0, 0), ((0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0))),
+             ((0, -1, 0), ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1))),
+             ((0, 0, -1), ((0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0))))
+
     def __init__(self, Voxels, Size):
+        # Voxels is an (N,4) uint8 array of x, y, z & color index
         self.size = Size
-        self.voxels = {}
-        self.used_colors = []
-        self.position = Vec3(0, 0, 0)
-        self.rotation = Vec3(0, 0, 0)
-        
-        for vox in Voxels:
-            #              x       y       z
-            pos = Vec3(vox[0], vox[1], vox[2])
-            self.voxels[pos._index()] = (pos, vox[3])
-            
-            if vox[3] not in self.used_colors:
-                self.used_colors.append(vox[3])
-            
-    
-    def getVox(self, pos):
-        key = pos._index()
-        if key in self.voxels:
-            return self.voxels[key][1]
-        
-        return 0
-    
-    def compareVox(self, colA, b):
-        colB = self.getVox(b)
-        
-        if colB == 0:
-            return False
-        return True
-    
-    
-    def generate(self, file_name, palette, materials, collections,TransformMatrix4x4):
-        objects = []
-        
-        mytool = bpy.context.scene.vox_tool
 
-        self.materials = materials  # For helper functions.
-        
-        mesh_col = collections
+        # a voxel that's in the file twice keeps its last color
+        Keys, First = np.unique(VoxelObject.Keys(Voxels[::-1, :3]), return_index = True)
+        self.voxels = Voxels[::-1][First]
+        self.keys = Keys
+        self.used_colors = np.unique(self.voxels[:, 3])
+        self.step = 1   # the size of a voxel, in voxels of the original model
+
+    def Downsample(self, Factor):
+        #A copy at 1/Factor the resolution. Every Factor^3 block of voxels becomes one voxel with the block's most common color,
+        #so thin parts don't vanish. Ties go to the lower color index
+        Blocks = self.voxels[:, :3] // Factor
+        BlockColors = VoxelObject.Keys(Blocks)*256 + self.voxels[:, 3]
+        Pairs, Counts = np.unique(BlockColors, return_counts = True)
+
+        # most common color first in every block
+        Order = np.lexsort((-Counts, Pairs // 256))
+        Pairs = Pairs[Order]
+        First = np.ones(len(Pairs), dtype = bool)
+        First[1:] = Pairs[1:] // 256 != Pairs[:-1] // 256
+
+        Keys = Pairs[First] // 256
+        Voxels = np.column_stack((Keys % 258 - 1, Keys // 258 % 258 - 1, Keys // (258*258) - 1, Pairs[First] % 256)).astype(np.uint8)
+        Downsampled = VoxelObject(Voxels, self.size)
+        Downsampled.step = self.step * Factor
+        return Downsampled
+
+    def Centers(self, WorldMatrix):
+        #Voxel centers in the scene, doubled so they're integers, for the given unscaled world matrix
+        Offset = np.array([int(-self.size.x/2), int(-self.size.y/2), int(-self.size.z/2)])
+        Doubled = 2*(self.voxels[:, :3].astype(np.int64) + Offset) + 1
+        return Doubled @ np.rint(WorldMatrix[:3, :3]).astype(np.int64).T + 2*np.rint(WorldMatrix[:3, 3]).astype(np.int64)
+
+    def WorldKeys(Centers):
+        # one int per doubled world center, for centers within a million voxels of the scene's origin
+        Centers = Centers + 2**21
+        return Centers[:, 0] + (Centers[:, 1] << 22) + (Centers[:, 2] << 44)
+
+    def Keys(Positions):
+        # one int per position, positions from -1 to 256 on every axis (a neighbour just outside the model) never collide
+        Positions = Positions.astype(np.int64) + 1
+        return Positions[:, 0] + Positions[:, 1]*258 + Positions[:, 2]*258*258
+
+    def Outside(self):
+        #Flood fills the empty space from outside the model. Returns a grid, padded by 1 on every side, that's True where the
+        #outside reaches. Empty cells it can't reach are sealed cavities
+        Positions = self.voxels[:, :3].astype(np.int64) + 1
+        Solid = np.zeros(Positions.max(axis = 0) + 3, dtype = bool)
+        Solid[tuple(Positions.T)] = True
+
+        Reached = np.zeros_like(Solid)
+        Reached[0, :, :] = Reached[-1, :, :] = Reached[:, 0, :] = Reached[:, -1, :] = Reached[:, :, 0] = Reached[:, :, -1] = True
+        while True:
+            Grown = Reached.copy()
+            Grown[1:] |= Reached[:-1]
+            Grown[:-1] |= Reached[1:]
+            Grown[:, 1:] |= Reached[:, :-1]
+            Grown[:, :-1] |= Reached[:, 1:]
+            Grown[:, :, 1:] |= Reached[:, :, :-1]
+            Grown[:, :, :-1] |= Reached[:, :, 1:]
+            Grown &= ~Solid
+            if np.array_equal(Grown, Reached):
+                return Reached
+            Reached = Grown
+
+    def Hidden(self, culled = None, sealed = False):
+        #(6,N) mask of the voxel sides that can't be seen.
+        #culled is an optional (6,N) mask of the sides other models cover, sealed hides the sides inside closed cavities
+        Positions = self.voxels[:, :3].astype(np.int64)
+        Hidden = np.zeros((6, len(Positions)), dtype = bool)
+        Outside = self.Outside() if sealed else None
+
+        for Side, (Offset, Quad) in enumerate(VoxelObject.Sides):
+            Neighbours = VoxelObject.Keys(Positions + Offset)
+            Index = np.minimum(np.searchsorted(self.keys, Neighbours), len(self.keys) - 1)
+            Hidden[Side] = self.keys[Index] == Neighbours
+            if culled is not None: Hidden[Side] |= culled[Side]
+            if Outside is not None: Hidden[Side] |= ~Outside[tuple((Positions + Offset + 1).T)]
+
+        return Hidden
+
+    def Chunks(self, Size, culled = None, sealed = False):
+        #Splits the model into Size^3 pieces. Returns a list of (name, VoxelObject, (6,n) mask of its hidden sides), the masks
+        #worked out on the whole model so the sides between chunks aren't made
+        if len(self.voxels) == 0: return []
+        Hidden = self.Hidden(culled, sealed)
+
+        Cells = self.voxels[:, :3] // Size
+        Unique, First, Inverse, Counts = np.unique(VoxelObject.Keys(Cells), return_index = True, return_inverse = True, return_counts = True)
+        Groups = np.split(np.argsort(Inverse, kind = 'stable'), np.cumsum(Counts)[:-1])
+
+        Chunks = []
+        for Cell, Index in zip(Cells[First], Groups):
+            # the voxels stay in key order, so the mask lines up with them
+            Chunk = VoxelObject(self.voxels[Index], self.size)
+            Chunk.step = self.step
+            Chunks.append(("_".join(str(int(Value)) for Value in Cell), Chunk, Hidden[:, Index]))
+        return Chunks
+
+    def Faces(self, culled = None, sealed = False):
+        #The exposed faces, as integer corner positions (F,4,3) & the color index of every face (F)
+        Positions = self.voxels[:, :3].astype(np.int64)
+        Corners, Colors = [], []
+        Hidden = self.Hidden(culled, sealed)
+
+        for Side, (Offset, Quad) in enumerate(VoxelObject.Sides):
+            Exposed = ~Hidden[Side]
+            Corners.append(Positions[Exposed][:, None, :] + np.array(Quad))
+            Colors.append(self.voxels[Exposed, 3])
+
+        return np.concatenate(Corners), np.concatenate(Colors)
+
+    @VoxProfiler.Stage("Mesh")
+    def generate(self, file_name, tables, collections,TransformMatrix4x4, culled = None, sealed = False):
+        #Builds the model as a single object. Everything happens on the vertex arrays - the doubles are merged, the mesh is moved,
+        #scaled & given its origin before the mesh is made, so the cursor, selection & mode are left alone.
+        #sealed fills the model's cavities, chunks come with theirs already in culled
+        mytool = bpy.context.scene.vox_tool
         
         if len(self.used_colors) == 0: # Empty Object
             return
-        
-        for Col in self.used_colors: # Create an object for each color and then join them.
-            
-            mesh = bpy.data.meshes.new(file_name) # Create mesh
-            obj = bpy.data.objects.new(file_name, mesh) # Create object
-            
-            
-            # Link Object to Scene
-            if mesh_col == None:
-                bpy.context.scene.collection.objects.link(obj)
-            else:
-                mesh_col.objects.link(obj)
-            
-            objects.append(obj) # Keeps track of created objects for joining.
-            
-            verts = []
-            faces = []
-            
-            for key in self.voxels:
-                pos, colID = self.voxels[key]
-                x, y, z = pos.x, pos.y, pos.z
-                
-                if colID != Col:
-                    continue
-                
-    
-                            
-                if not self.compareVox(colID, Vec3(x+1, y, z)):
-                    verts.append( (x+1, y, z) )
-                    verts.append( (x+1, y+1, z) )
-                    verts.append( (x+1, y+1, z+1) )
-                    verts.append( (x+1, y, z+1) )
-                    
-                    faces.append( [len(verts)-4,
-                                    len(verts)-3,
-                                    len(verts)-2,
-                                    len(verts)-1] )
-                
-                if not self.compareVox(colID, Vec3(x, y+1, z)):
-                    verts.append( (x+1, y+1, z) )
-                    verts.append( (x+1, y+1, z+1) )
-                    verts.append( (x, y+1, z+1) )
-                    verts.append( (x, y+1, z) )
-                    
-                    faces.append( [len(verts)-4,
-                                    len(verts)-3,
-                                    len(verts)-2,
-                                    len(verts)-1] )
-                
-                if not self.compareVox(colID, Vec3(x, y, z+1)):
-                    verts.append( (x, y, z+1) )
-                    verts.append( (x, y+1, z+1) )
-                    verts.append( (x+1, y+1, z+1) )
-                    verts.append( (x+1, y, z+1) )
-                    
-                    faces.append( [len(verts)-4,
-                                    len(verts)-3,
-                                    len(verts)-2,
-                                    len(verts)-1] )
-                
-                if not self.compareVox(colID, Vec3(x-1, y, z)):
-                    verts.append( (x, y, z) )
-                    verts.append( (x, y+1, z) )
-                    verts.append( (x, y+1, z+1) )
-                    verts.append( (x, y, z+1) )
-                    
-                    faces.append( [len(verts)-4,
-                                    len(verts)-3,
-                                    len(verts)-2,
-                                    len(verts)-1] )
-                
-                if not self.compareVox(colID, Vec3(x, y-1, z)):
-                    verts.append( (x, y, z) )
-                    verts.append( (x, y, z+1) )
-                    verts.append( (x+1, y, z+1) )
-                    verts.append( (x+1, y, z) )
-                    
-                    faces.append( [len(verts)-4,
-                                    len(verts)-3,
-                                    len(verts)-2,
-                                    len(verts)-1] )
-                
-                if not self.compareVox(colID, Vec3(x, y, z-1)):
-                    verts.append( (x, y, z) )
-                    verts.append( (x+1, y, z) )
-                    verts.append( (x+1, y+1, z) )
-                    verts.append( (x, y+1, z) )
-                    
-                    faces.append( [len(verts)-4,
-                                    len(verts)-3,
-                                    len(verts)-2,
-                                    len(verts)-1] )
-                                        
-            mesh.from_pydata(verts, [], faces)
-            
-            # Add materials
-            if ImportVox.VMaterial == "NoMatNeeded" or ImportVox.VMaterial == None: pass
-            else: obj.data.materials.append(ImportVox.VMaterial)
 
-            
-            # Create Vertex Colors & add data
-            bpy.context.view_layer.objects.active = obj
-
-            # Add color attributes for all selected maps, and also make variables for em
-            if mytool.ImportColor:
-                bpy.ops.geometry.color_attribute_add(name = "Color", domain='CORNER', data_type='BYTE_COLOR')
-                ColorLayer = mesh.vertex_colors["Color"]
-                i = 0
-                for poly in mesh.polygons:
-                    for idx in poly.loop_indices:
-                        ColorLayer.data[i].color = palette[Col-1]
-                        i+=1 
-
-            if mytool.ImportRoughness:
-                bpy.ops.geometry.color_attribute_add(name = "Roughness", domain='CORNER', data_type='BYTE_COLOR')
-                RoughnessLayer = mesh.vertex_colors["Roughness"]
-                i = 0
-                for poly in mesh.polygons:
-                    for idx in poly.loop_indices:
-                        RoughnessLayer.data[i].color = [materials[Col-1][0], materials[Col-1][0], materials[Col-1][0], 1]
-                        i+=1 
-
-            if mytool.ImportMetallic:
-                bpy.ops.geometry.color_attribute_add(name = "Metallic", domain='CORNER', data_type='BYTE_COLOR')
-                MetallicLayer = mesh.vertex_colors["Metallic"]
-                i = 0
-                for poly in mesh.polygons:
-                    for idx in poly.loop_indices:
-                        MetallicLayer.data[i].color = [materials[Col-1][1], materials[Col-1][1], materials[Col-1][1], 1]
-                        i+=1 
-
-            if mytool.ImportEmission:
-                bpy.ops.geometry.color_attribute_add(name = "Emission", domain='CORNER', data_type='BYTE_COLOR')
-                EmissionLayer = mesh.vertex_colors["Emission"]
-                i = 0
-                for poly in mesh.polygons:
-                    for idx in poly.loop_indices:
-                        EmissionLayer.data[i].color = [materials[Col-1][2], materials[Col-1][2], materials[Col-1][2], 1]
-                        i+=1 
-
-            if mytool.ImportTransmission:
-                bpy.ops.geometry.color_attribute_add(name = "Transmission", domain='CORNER', data_type='BYTE_COLOR')
-                TransmissionLayer = mesh.vertex_colors["Transmission"]
-                i = 0
-                for poly in mesh.polygons:
-                    for idx in poly.loop_indices:
-                        TransmissionLayer.data[i].color = [materials[Col-1][3], materials[Col-1][3], materials[Col-1][3], 1]
-                        i+=1
-            '''
-            if mytool.ImportSubSurface:
-                bpy.ops.geometry.color_attribute_add(name = "SubSurface", domain='CORNER', data_type='BYTE_COLOR')
-                SSSLayer = mesh.vertex_colors["SubSurface"]
-                i = 0
-                for poly in mesh.polygons:
-                    for idx in poly.loop_indices:
-                        SSSLayer.data[i].color = [materials[Col-1][4], materials[Col-1][4], materials[Col-1][4], 1]
-                        i+=1
-'''
-            
+        Corners, FaceColors = self.Faces(culled, sealed)
+        if len(FaceColors) == 0: # Covered by other models
+            return
 
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj in objects:
-            obj.select_set(True) # Select all objects that were generated.
-        
-        obj = objects[0]
-        bpy.context.view_layer.objects.active = obj # Make the first one active.
-        bpy.ops.object.join() # Join selected objects.
-        
-        # Sets the origin of object to be the same as in MagicaVoxel so that its location can be set correctly.
-        bpy.context.scene.cursor.location = [0, 0, 0]
-        obj.location = [int(-self.size.x/2), int(-self.size.y/2), int(-self.size.z/2)]
-        bpy.ops.object.origin_set(type='ORIGIN_CURSOR', center='MEDIAN')
-        
-        # Set scale, position & rotation.
+        # merge the corners the faces share
+        Corners = Corners.reshape(-1, 3)
+        Unique, FirstCorner, Faces = np.unique(VoxelObject.Keys(Corners), return_index = True, return_inverse = True)
+        Vertices = Corners[FirstCorner].astype(np.float64) * self.step
+        Faces = Faces.reshape(-1, 4)
 
-        # Rescale value
+        # Origin in the model's center like in MagicaVoxel, so its location can be set correctly. Then rescaled
         RescaleValue = 0.1
+        Vertices += [int(-self.size.x/2), int(-self.size.y/2), int(-self.size.z/2)]
+        Vertices *= RescaleValue
 
-        TransformMatrix4x4[0][3] = TransformMatrix4x4[0][3]*RescaleValue
-        TransformMatrix4x4[1][3] = TransformMatrix4x4[1][3]*RescaleValue
-        TransformMatrix4x4[2][3] = TransformMatrix4x4[2][3]*RescaleValue
-        
-        obj.matrix_world = TransformMatrix4x4
-
-        bpy.ops.transform.resize(value=(RescaleValue, RescaleValue, RescaleValue))
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-
-        
+        # Position & rotation, the position rescaled as well
+        Rotation = np.array(TransformMatrix4x4)[:3, :3]
+        Location = np.array(TransformMatrix4x4)[:3, 3] * RescaleValue
 
-        # Remove Doubles & fix normals
-        bpy.ops.object.mode_set(mode = 'EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.remove_doubles()
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.normals_make_consistent(inside=False)
-        bpy.ops.object.mode_set(mode = 'OBJECT')
+        # Mirrored rotations go into the mesh, like applying a negative scale would. The faces get flipped so they still point out
+        if np.linalg.det(Rotation) < 0:
+            Rotation = -Rotation
+            Vertices = -Vertices
+            Faces = Faces[:, ::-1]
 
         #Origin to Bottom, if specified
         if mytool.OriginsAtBottom:
-            
-            def Find_Min_Max_Verts(obj):
-                bpy.ops.mesh.reveal()
-                bm = bmesh.from_edit_mesh(obj.data)
-                bm.verts.ensure_lookup_table()
-                
-                if len(bm.verts) == 0: result = None
-                else:
-                    min_co = (obj.matrix_world @ bm.verts[0].co)[2]
-                    for v in bm.verts:
-                        if (obj.matrix_world @ v.co)[2] < min_co:
-                            min_co = (obj.matrix_world @ v.co)[2]
-                return min_co	
-
-            # Save selected objects and current position of 3D Cursor
-            SelectedObjs = bpy.context.selected_objects
-            ActiveObj = bpy.context.active_object
-            CursorLoc = bpy.context.scene.cursor.location.copy()
+            Drop = (Vertices @ Rotation[2]).min()     # lowest world Z, from the origin
+            Vertices -= Rotation[2] * Drop
+            Location[2] += Drop
 
-            bpy.ops.object.mode_set(mode = 'OBJECT')
+        mesh = VoxMethods.MeshFromArrays(file_name, Vertices, np.arange(0, Faces.size, 4), Faces.ravel())
+        obj = bpy.data.objects.new(file_name, mesh)
+        obj.matrix_world = Matrix.LocRotScale(Vector(Location.tolist()), Matrix(Rotation.tolist()), None)
 
-            # Set origins to bottom
-            for Obj in SelectedObjs:
-                # Select only current object (for setting origin)
-                bpy.ops.object.select_all(action='DESELECT')
-                Obj.select_set(True);
-                bpy.context.view_layer.objects.active = Obj
-                # Save current origin and relocate 3D Cursor
-                OriginLoc = Obj.location.copy() 
-                if Obj.type == 'MESH':
-                    bpy.ops.object.mode_set(mode = 'EDIT')
-                    min_co = Find_Min_Max_Verts(Obj)
-                    if min_co == None:
-                        min_co = OriginLoc[2]
-                    
-                    bpy.ops.object.mode_set(mode = 'OBJECT')
-                    bpy.context.scene.cursor.location = [OriginLoc[0], OriginLoc[1], min_co]
-                    bpy.ops.object.origin_set(type='ORIGIN_CURSOR')
-                    
-                    # Reset 3D Cursor  
-                    bpy.context.scene.cursor.location = CursorLoc
-                    
-            # Select objects again
-            for Obj in SelectedObjs:
-                Obj.select_set(True);
-                
-            bpy.context.view_layer.objects.active = ActiveObj
+        # Link Object to Scene
+        if collections == None: bpy.context.scene.collection.objects.link(obj)
+        else: collections.objects.link(obj)
+
+        # Add materials
+        if ImportVox.VMaterial == "NoMatNeeded" or ImportVox.VMaterial == None: pass
+        else: obj.data.materials.append(ImportVox.VMaterial)
+
+        # Add color attributes for all selected maps, filled from the palette's lookup tables
+        for Map, Enabled in (("Color", mytool.ImportColor), ("Roughness", mytool.ImportRoughness), ("Metallic", mytool.ImportMetallic), ("Emission", mytool.ImportEmission), ("Transmission", mytool.ImportTransmission)):
+            if not Enabled: continue
+            Attribute = mesh.color_attributes.new(name = Map, type = 'BYTE_COLOR', domain = 'CORNER')
+            Attribute.data.foreach_set("color_srgb", np.repeat(tables[Map][FaceColors.astype(np.int64)-1], 4, axis = 0).ravel())
+
+        if len(mesh.color_attributes) > 0:
+            mesh.color_attributes.active_color_name = mesh.color_attributes[0].name
+            mesh.color_attributes.default_color_name = mesh.color_attributes[0].name
+
+        return obj
 
 
 class ImportVox(Operator, ImportHelper):
@@ -564,6 +757,8 @@ class ImportVox(Operator, ImportHelper):
 
     MaterialName = None
     VMaterial = None
+    RotationTable = None    # [rotation byte] = 3x3 rotation, built on the first import
+    PaletteCache = {}       # [palette hash + settings] = {"Tables": lookup tables of every map, "Material": CRMET material's name}
 
     files: CollectionProperty(name="File Path", description="File path used for importing the VOX file", type=bpy.types.OperatorFileListElement) # type: ignore
 
@@ -580,6 +775,8 @@ class ImportVox(Operator, ImportHelper):
         if not paths:
             paths.append(self.filepath)
             print("SELF.fp",paths)
+
+        if ImportVox.RotationTable is None: ImportVox.RotationTable = VoxMethods.RotationTable()
         
         def read_chunk(buffer):
             *name, h_size, h_children = struct.unpack('<4cii', buffer.read(12))
@@ -610,58 +807,51 @@ class ImportVox(Operator, ImportHelper):
             
             return dict
 
-        def import_vox(path):
-            
-            mytool = bpy.context.scene.vox_tool
-
-            def IntTo3x3Matrix(rotation):
-
-                RotMatrix = Matrix( ((0, 0, 0),
-                                    (0, 0, 0),
-                                    (0, 0, 0)) )
-
-                # Get indices of first, second and third=
-                first_index = rotation & 0b0011
-                second_index = (rotation & 0b1100) >> 2
-                array = [-1, -1, -1]
-                index = 0
-
-                array[first_index] = 0
-                array[second_index] = 0
-
-                for i in range(len(array)):
-                    if array[i] == -1:
-                        index = i
-                        break
-
-                third_index = index
+        def decode_materials(chunks, MaxMaps):
+            # [roughness, metallic, emission, glass] of every color index, from the MATL chunks
+            materials = np.zeros((256, 4), dtype = np.float32)
+
+            # [material type][key] = column the key's value goes in
+            Columns = {b'_metal': {b'_rough': 0, b'_metal': 1},
+                       b'_glass': {b'_rough': 0, b'_alpha': 3},
+                       b'_emit':  {b'_rough': 0, b'_emit': 2},
+                       b'_blend': {b'_rough': 0, b'_metal': 1, b'_alpha': 3}}
+
+            for content in chunks:
+                id, = struct.unpack('<i', read_content(content, 4))
+                if id > 255: continue # Why are there material values for id 256?
+                mat_dict = read_dict(content)
+                if len(mat_dict) == 0: continue
+
+                # materials without a type get the default roughness, diffuse ones keep all zeros
+                if next(iter(mat_dict)) != b'_type':
+                    materials[id-1][0] = StaticData.RoughnessDefault
+                    continue
+                type = mat_dict[b'_type']
+                if type not in Columns: continue
 
-                # Get negatives
-                negative_first = ((rotation & 0b0010000) >> 4) == 1
-                negative_second = ((rotation & 0b0100000) >> 5) == 1
-                negative_third = ((rotation & 0b1000000) >> 6) == 1
+                SubSurfaceType = False
+                for key, value in mat_dict.items():
+                    if key == b'_media_type' and type in (b'_glass', b'_blend'): SubSurfaceType = value == b'_sss'
 
-                print("rotation", rotation)
-                print("NEGATIVES", negative_first, negative_second, negative_third)
+                    Column = Columns[type].get(key)
+                    if Column == None or (Column == 3 and SubSurfaceType): continue
+                    # Max-out Material Properties sets emission & glass to 1
+                    materials[id-1][Column] = 1 if MaxMaps and Column in (2, 3) else float(value)
 
-                '''
-                for row in matrix.elements:
-                    print(' '.join(map(str, row)))
-                '''
-                RotMatrix[0][first_index] = -1 if negative_first else 1
-                RotMatrix[1][second_index] = -1 if negative_second else 1
-                RotMatrix[2][third_index] = -1 if negative_third else 1
-                
-                print("Matrix", RotMatrix)
+            return materials
 
-                return RotMatrix
+        @VoxProfiler.Stage("Import")
+        def import_vox(path):
             
+            mytool = bpy.context.scene.vox_tool
+
             with open(path, 'rb') as file:
                 file_name = os.path.basename(file.name).replace('.vox', '')
                 file_size = os.path.getsize(path)
 
-                palette = []
-                materials = [[0.0, 0.0, 0.0, 0.0] for _ in range(255)] # [roughness, metallic, emission, glass] * 255
+                PaletteData = None  # RGBA chunk
+                MaterialChunks = [] # MATL chunks, both only decoded for palettes that aren't in the palette cache
                 
                 # Makes sure it's supported vox file
                 VoxFileVersionData = struct.unpack('<4ci', file.read(8))
@@ -688,6 +878,8 @@ class ImportVox(Operator, ImportHelper):
                 GroupIDs = {}      # [gID] = tIDs
                 ShapeIDs = {}      # [sID] = mIDs
                 ModelIDs = {}      # [mID] = Model ie VoxelObject
+                ModelHashes = {}   # [mID] = hash of the model's SIZE & XYZI
+                PaletteHash = hashlib.sha1()
                 mID = 0
                 
 
@@ -697,19 +889,14 @@ class ImportVox(Operator, ImportHelper):
 
                     
                     if name == b'SIZE': # Size of object.
+                        SizeData = bytes(content[:12])
                         x, y, z = struct.unpack('<3i', read_content(content, 12))
                         size = Vec3(x, y, z)
                     
                     elif name == b'XYZI': # Location and color id of voxel.
-                        voxels = []
-                        
-                        num_voxels, = struct.unpack('<i', read_content(content, 4))
-                        for voxel in range(num_voxels):
-                            voxel_data = struct.unpack('<4B', read_content(content, 4))
-                            voxels.append(voxel_data)
-                        
-                        model = VoxelObject(voxels, size)
-                        ModelIDs[mID] = model
+                        # Hash for re-imports, the voxels are only read when the model is generated
+                        ModelHashes[mID] = hashlib.sha1(SizeData + bytes(content)).hexdigest()
+                        ModelIDs[mID] = (size, content)
                         #print("ModelID",mod_id)
                         #ModelData[mod_id] = {}
                         mID += 1
@@ -738,7 +925,7 @@ class ImportVox(Operator, ImportHelper):
                         TransformNodeAttributes = read_dict(content)
 
                         # initialise transform matrix
-                        TransformIDs[tID]["Transform"] = Matrix( ((1, 0, 0, 0),(0, 1, 0, 0),(0, 0, 1, 0),(0, 0, 0, 1)) )
+                        TransformIDs[tID]["Transform"] = np.identity(4)
 
                         if b'_name' in TransformNodeAttributes:
                             TransformIDs[tID]["Name"] = TransformNodeAttributes[b'_name'].decode('utf-8')
@@ -772,16 +959,7 @@ class ImportVox(Operator, ImportHelper):
 
                         # Rotation
                         if b'_r' in frames:
-                            value = frames[b'_r']
-                            RotMatrix3x3 = IntTo3x3Matrix(int(value))
-
-                            for i in range(3):
-                                TransformIDs[tID]["Transform"][i][0] = RotMatrix3x3[i][0]
-                                TransformIDs[tID]["Transform"][i][1] = RotMatrix3x3[i][1]
-                                TransformIDs[tID]["Transform"][i][2] = RotMatrix3x3[i][2]
-                            
-                            #Rot = Vec3(int(x), int(y), int(z))
-                        #TransformIDs[tID]["Rotation"] = RotMatrix4x4
+                            TransformIDs[tID]["Transform"][:3, :3] = ImportVox.RotationTable[int(frames[b'_r']) & 0x7f]
                     
                     elif name == b'nGRP':
                         gID, = struct.unpack('<i', read_content(content, 4))
@@ -811,111 +989,12 @@ class ImportVox(Operator, ImportHelper):
                         ShapeIDs[sID] = Connected_mIDs
 
                     elif name == b'RGBA':
-                        for _ in range(255):
-                            rgba = struct.unpack('<4B', read_content(content, 4))
-                            palette.append([float(col)/255 for col in rgba])
-                        del content[:4] # Contains a 256th color for some reason.
+                        PaletteHash.update(content)
+                        PaletteData = bytes(content[:1024])
                     
                     elif name == b'MATL':
-                        id, = struct.unpack('<i', read_content(content, 4))
-                        if id > 255: continue # Why are there material values for id 256?
-                        
-                        mat_dict = read_dict(content)
-                        
-                        type = None
-                        TypeDecided = False
-                        SubSurfaceType = False
-                        #OgId = -1000
-
-                        for key in mat_dict:
-                            value = mat_dict[key]
-                            
-                            #Fix on a type of material
-                            if TypeDecided== False:
-                                if key == b'_type':
-                                    # if type of material is from metal, glass, emit or blend, set type to it
-                                    if value == b'_metal' or value == b'_emit' or value == b'_glass' or value == b'_blend': 
-                                        type = value
-                                        TypeDecided = True
-                                    else:
-                                        type = b'_diffuse'
-                                        TypeDecided = True
-                                    
-                                else:
-                                    materials[id-1][0] = float(StaticData.RoughnessDefault) #default roughness value
-                                    TypeDecided = True
-
-                            # then assign different properties based on the type of the material, if type is decided
-                            if TypeDecided == True:
-                                    
-                                # Metal type material
-                                if type == b'_metal':
-
-                                    if key == b'_rough':
-                                        materials[id-1][0] = float(value) # Roughness
-                                    if key == b'_metal':
-                                        materials[id-1][1] = float(value) # Metalic
-                                        
-                                    
-                                # Glass type material
-                                elif type == b'_glass':
-                                    if key == b'_rough':
-                                        materials[id-1][0] = float(value) # Roughness
-
-                                    if key == b'_media_type':
-                                        if value == b'_sss': SubSurfaceType = True
-                                        else: SubSurfaceType = False
-
-                                    if key == b'_alpha':
-                                        k = 1 if mytool.MaxMaps == True else float(value)
-                                        if SubSurfaceType == False:
-                                            materials[id-1][3] = k # Glass
-                                        
-                                    
-                                    '''
-                                    Glass Keys b'_type' b'_glass'
-                                    Glass Keys b'_media_type' b'_sss'
-                                    Glass Keys b'_media' b'3'
-                                    Glass Keys b'_alpha' b'0.912209'
-                                    Glass Keys b'_trans' b'0.912209'
-                                    Glass Keys b'_rough' b'0.800245'
-                                    Glass Keys b'_ior' b'0.3'
-                                    Glass Keys b'_ri' b'1.3'
-                                    Glass Keys b'_g' b'0.47'
-                                    Glass Keys b'_d' b'0.017936'
-                                    '''
-
-
-                                # Emission type material
-                                elif type == b'_emit':
-                                    
-                                    if key == b'_rough':
-                                        materials[id-1][0] = float(value) # Roughness                                
-                                    
-                                    if key == b'_emit':
-                                        k = 1 if mytool.MaxMaps == True else float(value)
-                                        materials[id-1][2] = k # Emission value only
-                                        
-                                    if key == b'_flux':
-                                        P = float(value)
-                                        
-                                    
-                                # Blend type material
-                                elif type == b'_blend':
-                                    if key == b'_rough':
-                                        materials[id-1][0] = float(value) # Roughness                                
-                                    if key == b'_metal':
-                                        materials[id-1][1] = float(value) # Metalic
-                                    if key == b'_media_type':
-                                        if value == b'_sss':
-                                            SubSurfaceType = True
-                                        else:
-                                            SubSurfaceType = False
-
-                                    if key == b'_alpha':
-                                        k = 1 if mytool.MaxMaps == True else float(value)
-                                        if SubSurfaceType == False:
-                                            materials[id-1][3] = k # Glass
+                        PaletteHash.update(content)
+                        MaterialChunks.append(content)
 
             # Post process the acquired data
             for tID in TransformIDs:
@@ -932,43 +1011,180 @@ class ImportVox(Operator, ImportHelper):
 
                 
                         
-            # get a material made from the parameters provided
-            if any([mytool.ImportColor, mytool.ImportRoughness, mytool.ImportMetallic, mytool.ImportEmission, mytool.ImportTransmission]) == False: ImportVox.VMaterial = "NoMatNeeded"
-            else: ImportVox.VMaterial = VoxMethods.CreateCRMETS(context, mytool.ImportColor, mytool.ImportRoughness, mytool.ImportMetallic, mytool.ImportEmission, mytool.ImportTransmission)
+            # The lookup tables & CRMET material are shared by all the files with the same palette, materials & import settings
+            MapSettings = [mytool.ImportColor, mytool.ImportRoughness, mytool.ImportMetallic, mytool.ImportEmission, mytool.ImportTransmission]
+            PaletteKey = PaletteHash.hexdigest() + str(MapSettings + [mytool.MaxMaps])
+            Shared = ImportVox.PaletteCache.pop(PaletteKey, None)
+            if Shared == None:
+                Shared = {"Tables": VoxMethods.PaletteTables(PaletteData, decode_materials(MaterialChunks, mytool.MaxMaps)), "Material": None}
+
+            # get a material made from the parameters provided, unless it's still around. Kept by name, so it's safe across .blend files
+            if any(MapSettings) == False: ImportVox.VMaterial = "NoMatNeeded"
+            else:
+                ImportVox.VMaterial = bpy.data.materials.get(Shared["Material"]) if Shared["Material"] != None else None
+                if ImportVox.VMaterial == None: ImportVox.VMaterial = VoxMethods.CreateCRMETS(context, *MapSettings)
+                Shared["Material"] = ImportVox.VMaterial.name
+
+            # most recently used last
+            ImportVox.PaletteCache[PaletteKey] = Shared
+            while len(ImportVox.PaletteCache) > StaticData.PaletteCacheSize: del ImportVox.PaletteCache[next(iter(ImportVox.PaletteCache))]
                 
             # Create Collections
             collections = (None)
             if mytool.Organize:
-                FileCollection = bpy.data.collections.new(file_name)
-                bpy.context.scene.collection.children.link(FileCollection)
+                FileCollection = bpy.data.collections.get(file_name) if mytool.Reimport else None
+                if FileCollection == None:
+                    FileCollection = bpy.data.collections.new(file_name)
+                    bpy.context.scene.collection.children.link(FileCollection)
                 
                 collections = FileCollection
             
-            # TransformIDs[tID] = {"Name":name, "Visible":0/1, "lID":lID, "Transform":TransformMatrix4x, "ChildID":sID/gID}
-            # Defining the traverse function
-            def Traverse(tID, visible, TransformMatrix):
-                if TransformIDs[tID]["Type"] == "Group":
-                    if visible == True or mytool.ImportHidden == True: 
-                        for child in GroupIDs[TransformIDs[tID]["ChildID"]]:
-                            Traverse(child, visible and TransformIDs[child]["OverallVisibility"], TransformMatrix @ TransformIDs[child]["Transform"])
+            # Models of the last import of this file, for re-imports. Models are tagged with where they came from
+            SourcePath = os.path.realpath(path)
+            PreviousModels = {}     # [tID, LOD Level, Chunk] = Object
+            if mytool.Reimport:
+                for Obj in bpy.data.objects:
+                    if Obj.get("vox_source") == SourcePath and "vox_node" in Obj: PreviousModels[Obj["vox_node"], Obj.get("vox_lod", 0), Obj.get("vox_chunk", "")] = Obj
+
+            # anything that changes the generated mesh goes into the model hash
+            PaletteDigest = PaletteHash.hexdigest() + str([mytool.ImportColor, mytool.ImportRoughness, mytool.ImportMetallic, mytool.ImportEmission, mytool.ImportTransmission, mytool.OriginsAtBottom, mytool.MaxMaps, mytool.FillCavities, mytool.LODLevels > 0, mytool.ChunkSize])
+            Updates = {"Rebuilt": 0, "Moved": 0, "Kept": 0, "Removed": 0}
+
+            def GetModel(mID):
+                # read the voxels of a model the first time it's needed
+                if type(ModelIDs[mID]) == tuple:
+                    ModelSize, Content = ModelIDs[mID]
+                    num_voxels, = struct.unpack('<i', read_content(Content, 4))
+                    ModelIDs[mID] = VoxelObject(np.frombuffer(bytes(Content[:num_voxels*4]), dtype = np.uint8).reshape(-1, 4), ModelSize)
+                return ModelIDs[mID]
+
+            def ModelParts(mID, Culled):
+                # (LOD Level, chunk name, VoxelObject, culling mask) of every object a model is made of - the model & its LODs,
+                # each split into chunks if chunking's on. The culling mask is per voxel, so only the full resolution model uses it
+                Parts = []
+                ChunkSize = int(mytool.ChunkSize)
+                for Level in range(mytool.LODLevels + 1):
+                    Model = GetModel(mID) if Level == 0 else GetModel(mID).Downsample(2**Level)
+                    LevelCulled = Culled if Level == 0 else None
+                    if ChunkSize == 0:
+                        Parts.append((Level, "", Model, LevelCulled))
+                    else:
+                        # chunks are the same size in the scene at every level, so they line up
+                        for Name, Chunk, Hidden in Model.Chunks(max(ChunkSize // Model.step, 1), LevelCulled, mytool.FillCavities):
+                            Parts.append((Level, Name, Chunk, Hidden))
+                return Parts
+
+            def GenerateModel(tID, TransformMatrix, Culled = None):
+                # the model, followed by its LODs if any. Each level & chunk is an object of its own
+                mID = ShapeIDs[TransformIDs[tID]["ChildID"]][0]
+                Transform = [round(float(Value), 6) for Row in TransformMatrix for Value in Row]
+                BaseName = None
+
+                for Level, ChunkName, Model, LevelCulled in ModelParts(mID, Culled):
+                    ModelHash = hashlib.sha1((ModelHashes[mID] + PaletteDigest + (str(Level) if Level else "") + ChunkName).encode() + (b"" if LevelCulled is None else LevelCulled.tobytes())).hexdigest()
+
+                    CurrentName = None
+                    Previous = PreviousModels.pop((tID, Level, ChunkName), None)
+                    if Previous != None:
+                        if Previous.get("vox_model_hash") == ModelHash:
+                            OldTransform = list(Previous["vox_transform"])
+                            if OldTransform == Transform:
+                                Updates["Kept"] += 1
+                                continue
+
+                            # same rotation, just move it
+                            if all(OldTransform[i] == Transform[i] for i in (0,1,2,4,5,6,8,9,10,12,13,14,15)):
+                                Moved = Previous.matrix_world.copy()
+                                Moved.translation += Vector((Transform[3]-OldTransform[3], Transform[7]-OldTransform[7], Transform[11]-OldTransform[11])) * 0.1
+                                Previous.matrix_world = Moved
+                                Previous["vox_transform"] = Transform
+                                Updates["Moved"] += 1
+                                continue
+
+                        # changed, rebuild it under the same name
+                        CurrentName = Previous.name
+                        PreviousMesh = Previous.data
+                        bpy.data.objects.remove(Previous)
+                        if PreviousMesh != None and PreviousMesh.users == 0: bpy.data.meshes.remove(PreviousMesh)
+                        Updates["Rebuilt"] += 1
 
-                else:
-                    #generate model
-                    if visible == True or mytool.ImportHidden == True:
-                        #print(tID, TransformIDs[tID]["Name"], visible, pos)
-                        CurrentName = None
-                        # check if the name in the id is not XYZ
-                        if TransformIDs[tID]["Name"] != "XYZ":
-                            CurrentName = TransformIDs[tID]["Name"]
-                        else:
-                            FlowData.ImportNameIndex += 1
-                            CurrentName = file_name + "_" + str(FlowData.ImportNameIndex)
-                        
-                        # stuff to be intersected with the group attributes - Hidden, Pos, Rot
-                        ModelIDs[ShapeIDs[TransformIDs[tID]["ChildID"]][0]].generate(CurrentName, palette, materials, collections, TransformMatrix)
-            
-            # finally generating the models using traverse
-            Traverse(0, TransformIDs[0]["OverallVisibility"], TransformIDs[0]["Transform"])
+                    else:
+                        if BaseName == None:
+                            # check if the name in the id is not XYZ
+                            if TransformIDs[tID]["Name"] != "XYZ":
+                                BaseName = TransformIDs[tID]["Name"]
+                            else:
+                                FlowData.ImportNameIndex += 1
+                                BaseName = file_name + "_" + str(FlowData.ImportNameIndex)
+                        CurrentName = BaseName + ("_LOD" + str(Level) if mytool.LODLevels > 0 else "") + ("_Chunk_" + ChunkName if ChunkName else "")
+
+                    # stuff to be intersected with the group attributes - Hidden, Pos, Rot
+                    obj = Model.generate(CurrentName, Shared["Tables"], collections, Matrix(TransformMatrix.tolist()), LevelCulled, mytool.FillCavities and ChunkName == "")
+                    if obj != None:
+                        obj["vox_source"] = SourcePath
+                        obj["vox_node"] = tID
+                        obj["vox_model_hash"] = ModelHash
+                        obj["vox_transform"] = Transform
+                        if mytool.LODLevels > 0: obj["vox_lod"] = Level
+                        if ChunkName: obj["vox_chunk"] = ChunkName
+
+            # TransformIDs[tID] = {"Name":name, "Visible":0/1, "lID":lID, "Transform":TransformMatrix4x, "ChildID":sID/gID}
+            # Flattening the scene graph - the nodes in the order a depth first walk finds them, each with its parent & depth.
+            # Hidden groups aren't walked into, unless hidden models are imported as well
+            def FlattenSceneGraph():
+                Nodes, Parents, Depths, Visibility = [], [], [], []
+                Stack = [(0, -1, 0, TransformIDs[0]["OverallVisibility"])]
+                while Stack:
+                    tID, Parent, Depth, Visible = Stack.pop()
+                    Index = len(Nodes)
+                    Nodes.append(tID)
+                    Parents.append(Parent)
+                    Depths.append(Depth)
+                    Visibility.append(Visible)
+
+                    if TransformIDs[tID]["Type"] == "Group" and (Visible or mytool.ImportHidden):
+                        for Child in reversed(GroupIDs[TransformIDs[tID]["ChildID"]]):
+                            Stack.append((Child, Index, Depth + 1, Visible and TransformIDs[Child]["OverallVisibility"]))
+
+                # World matrices, one batched multiply per depth level
+                Parents, Depths = np.array(Parents), np.array(Depths)
+                WorldMatrices = np.array([TransformIDs[tID]["Transform"] for tID in Nodes])
+                for Depth in range(1, Depths.max() + 1):
+                    Level = np.nonzero(Depths == Depth)[0]
+                    WorldMatrices[Level] = WorldMatrices[Parents[Level]] @ WorldMatrices[Level]
+
+                return Nodes, Visibility, WorldMatrices
+
+            def CullBetweenModels(Instances):
+                # [tID] = (6,N) mask of the sides of the model's voxels that any voxel in the scene sits against.
+                # The model's own voxels are in there too, the sides they cover aren't exposed anyway
+                Centers = {tID: GetModel(ShapeIDs[TransformIDs[tID]["ChildID"]][0]).Centers(WorldMatrix) for tID, WorldMatrix in Instances}
+                SceneKeys = np.unique(np.concatenate([VoxelObject.WorldKeys(Doubled) for Doubled in Centers.values()]))
+
+                Culled = {}
+                for tID, WorldMatrix in Instances:
+                    Rotation = np.rint(WorldMatrix[:3, :3]).astype(np.int64)
+                    Culled[tID] = np.zeros((6, len(Centers[tID])), dtype = bool)
+                    for Side, (Offset, Quad) in enumerate(VoxelObject.Sides):
+                        Neighbours = VoxelObject.WorldKeys(Centers[tID] + 2*(Rotation @ Offset))
+                        Index = np.minimum(np.searchsorted(SceneKeys, Neighbours), len(SceneKeys) - 1)
+                        Culled[tID][Side] = SceneKeys[Index] == Neighbours
+                return Culled
+
+            # finally generating the models
+            with VoxProfiler.Measure("Generate"):
+                Nodes, Visibility, WorldMatrices = FlattenSceneGraph()
+                Instances = [(tID, WorldMatrices[Index]) for Index, tID in enumerate(Nodes) if TransformIDs[tID]["Type"] != "Group" and (Visibility[Index] or mytool.ImportHidden)]
+                Culled = CullBetweenModels(Instances) if mytool.CullBetweenModels and len(Instances) > 1 else {}
+                for tID, WorldMatrix in Instances:
+                    GenerateModel(tID, WorldMatrix, Culled.get(tID))
+
+            # models that aren't in the file anymore
+            for Obj in PreviousModels.values():
+                PreviousMesh = Obj.data
+                bpy.data.objects.remove(Obj)
+                if PreviousMesh != None and PreviousMesh.users == 0: bpy.data.meshes.remove(PreviousMesh)
+                Updates["Removed"] += 1
 
             # Print out the Import Summary in the console!
             print("\n")
@@ -1059,8 +1275,8 @@ class ImportVox(Operator, ImportHelper):
             VMaterial = None
 
 
-            palette = []
-            materials = [[0.0, 0.0, 0.0, 0.0] for _ in range(255)] # [roughness, metallic, glass, emission] * 255
+            PaletteData = None
+            MaterialChunks = []
             
             LayerIDs = {}      # [lID][Name] = "name", Visible = 1/0]
             TransformIDs = {}  # [tID][ChildID = sID/gID, Name = "name", Visible = 0/1, Transform = TransformMatrix4x4]
@@ -1072,10 +1288,13 @@ class ImportVox(Operator, ImportHelper):
             ShiftValues = {}
 
             stmt = "Magicavoxel File imported" if len(paths) == 1 else str(len(paths))+" Magicavoxel Files imported"
+            if mytool.Reimport:
+                stmt += " ("+", ".join(str(Count)+" "+Key.lower() for Key, Count in Updates.items())+")"
             self.report({'INFO'}, stmt)
 
         for path in paths:
             import_vox(path)
+        VoxProfiler.EndRun("Import")
         
         
         
@@ -1132,6 +1351,11 @@ class ImportVox(Operator, ImportHelper):
         col.prop(mytool, "OriginsAtBottom")
         col.prop(mytool, "Organize")
         col.prop(mytool, "MaxMaps")
+        col.prop(mytool, "Reimport")
+        col.prop(mytool, "CullBetweenModels")
+        col.prop(mytool, "FillCavities")
+        col.prop(mytool, "LODLevels")
+        col.prop(mytool, "ChunkSize")
 
 class VoxMethods():        
 
@@ -1144,6 +1368,11 @@ class VoxMethods():
         if bpy.context.mode == 'OBJECT': pass
         else: return "Enter object mode to clean","Enter object mode to clean","Enter object mode for exports"
 
+        # Check for a background clean running
+        if FlowData.BackgroundCleanStage != None:
+            k = "Cleaning in the background, Esc to cancel"
+            return k, k, k
+
         # Check for 2 step process running
         if FlowData.ProcessRunning == False: pass
         else: return "2 Step Process is running. Finish that first.", 1, "2 Step Process is running. Finish that first."
@@ -1184,9 +1413,11 @@ class VoxMethods():
             if mytool.CommonUV:TwoStep = len(bpy.context.selected_objects)
             else:TwoStep = "Select a single object or Enable Shared UVs"
 
-        return Lazy, TwoStep, len(bpy.context.selected_objects) if len(bpy.context.selected_objects) == 1 else "Please select a single object"
+        # Every selected mesh gets exported, a job per file
+        return Lazy, TwoStep, len(bpy.context.selected_objects)
         
         
+    @VoxProfiler.Stage("TypeCheck")
     def MrModelTypeChecker(ObjectList):
         #Checks and returns the model type for solo and list of models. Removes doubles and fixes normals in the process too! Not realtime.
 
@@ -1292,6 +1523,42 @@ class VoxMethods():
             name = name + "_Backup"
             return name
 
+    def RotationTable():
+        #3x3 matrices of all the 128 MagicaVoxel rotation bytes. Bits 0-1 & 2-3 are the columns of the 1 in the first & second row,
+        #the third row takes the column left over & bits 4-6 flip the rows. The 80 bytes that repeat a column aren't valid & stay unrotated
+        Table = np.tile(np.identity(3), (128, 1, 1))
+        for Byte in range(128):
+            First, Second = Byte & 0b11, (Byte >> 2) & 0b11
+            if First == Second or First > 2 or Second > 2: continue
+            Table[Byte] = 0
+            for Row, Column in enumerate((First, Second, 3 - First - Second)):
+                Table[Byte, Row, Column] = -1 if Byte & (0b10000 << Row) else 1
+        return Table
+
+    def PaletteTables(PaletteData, Materials):
+        #Color attribute values of every color index (index 0 is color 1) for every map, as (256,4) float32 tables.
+        #Files without a palette get a white one
+        Tables = {"Color": np.ones((256, 4), dtype = np.float32)}
+        if PaletteData != None: Tables["Color"] = np.frombuffer(PaletteData, dtype = np.uint8).reshape(256, 4).astype(np.float32)/255
+
+        for Column, Map in enumerate(("Roughness", "Metallic", "Emission", "Transmission")):
+            Tables[Map] = np.ones((256, 4), dtype = np.float32)
+            Tables[Map][:, :3] = Materials[:, Column, None]
+        return Tables
+
+    def MeshFromArrays(Name, Vertices, LoopStarts, LoopVertices, Smooth = None):
+        #A new mesh straight from numpy arrays, flat shaded unless Smooth says otherwise
+        Mesh = bpy.data.meshes.new(Name)
+        Mesh.vertices.add(len(Vertices))
+        Mesh.vertices.foreach_set("co", np.asarray(Vertices, dtype = np.float32).ravel())
+        Mesh.loops.add(len(LoopVertices))
+        Mesh.loops.foreach_set("vertex_index", np.asarray(LoopVertices, dtype = np.int32))
+        Mesh.polygons.add(len(LoopStarts))
+        Mesh.polygons.foreach_set("loop_start", np.asarray(LoopStarts, dtype = np.int32))
+        Mesh.polygons.foreach_set("use_smooth", np.zeros(len(LoopStarts), dtype = bool) if Smooth is None else Smooth)
+        Mesh.update(calc_edges = True)
+        return Mesh
+
     def TriangulateModel(context):
         bpy.ops.object.mode_set(mode = 'EDIT')
         bpy.ops.mesh.select_all(action='SELECT')
@@ -1382,6 +1649,7 @@ class VoxMethods():
         return VMaterial
 
 
+    @VoxProfiler.Stage("Join")
     def JoinModels(context):
         bpy.ops.object.mode_set(mode = 'OBJECT')
         ObjArray = bpy.context.selected_objects
@@ -1406,6 +1674,7 @@ class VoxMethods():
 
             #Set the cursor to the obj origin, store the location
             FlowData.CommonUVOrigins[str(Obj.name)] = [round(Obj.location.x,2),round(Obj.location.y,2),round(Obj.location.z,2)]
+            FlowData.CommonUVTags[str(Obj.name)] = {Key: Obj[Key] for Key in Obj.keys() if Key.startswith("vox_")}
 
         bpy.context.scene.cursor.location = OG3DCursorPos
 
@@ -1486,8 +1755,10 @@ class VoxMethods():
                 for slot in new_obj.material_slots:
                     if slot.name == "VCMat_0": new_obj.data.materials.pop(index = slot.slot_index)
             
-            # Rename the new object with the vertex group name
+            # Rename the new object with the vertex group name & give it back its import tags
             new_obj.name = VertGrupName
+            VoxMethods.ClearImportTags(new_obj)
+            for Key, Value in FlowData.CommonUVTags.get(VertGrupName, {}).items(): new_obj[Key] = Value
             SplitUpModels.append(new_obj)
 
         bpy.context.scene.cursor.location = OG3DCursorPos2
@@ -1500,6 +1771,7 @@ class VoxMethods():
 
         return SplitUpModels
     
+    @VoxProfiler.Stage("Split")
     def ApplySplitToBothObjects(context):
         scene = context.scene
         mytool = scene.vox_tool
@@ -1514,7 +1786,9 @@ class VoxMethods():
             
             # split & rename dupes & add it to the global dupes list
             ObjectsToBeRenamed = VoxMethods.SplitModels(context)
-            for obj in ObjectsToBeRenamed: obj.name = VoxMethods.NextNamePlease(obj.name)
+            for obj in ObjectsToBeRenamed:
+                obj.name = VoxMethods.NextNamePlease(obj.name)
+                VoxMethods.ClearImportTags(obj)
 
             FlowData.CommonUVDupeObjects = ObjectsToBeRenamed
             
@@ -1524,6 +1798,10 @@ class VoxMethods():
         bpy.context.view_layer.objects.active = FlowData.MainObj
         VoxMethods.SplitModels(Context)
 
+    def ClearImportTags(Obj):
+        # Backups shouldn't be picked up by re-imports
+        for Key in [Key for Key in Obj.keys() if Key.startswith("vox_")]: del Obj[Key]
+
     def ClearEmptyMaterialSlots(objekt):
         if len(objekt.material_slots) == 1:
             if objekt.material_slots[0].name == "": objekt.data.materials.clear()
@@ -1540,6 +1818,7 @@ class VoxMethods():
             if objekt.material_slots[0].name == "": objekt.data.materials.clear()
 
 
+    @VoxProfiler.Stage("ModelFixing")
     def ModelFixing(context):
         
         FlowData.ProcessRunning = True
@@ -1562,6 +1841,7 @@ class VoxMethods():
         #Backup Name calculation
         FlowData.DupeObj.name = VoxMethods.NextNamePlease(FlowData.MainObjName)
         FlowData.DupeObjName = FlowData.DupeObj.name
+        VoxMethods.ClearImportTags(FlowData.DupeObj)
 
         #Hide Dupe obj
         FlowData.DupeObj.hide_set(True)
@@ -1575,6 +1855,7 @@ class VoxMethods():
         FlowData.MainObj.select_set(True)
         bpy.context.view_layer.objects.active = FlowData.MainObj
 
+    @VoxProfiler.Stage("MaterialSetUp")
     def MaterialSetUp(context):
         
         scene = context.scene
@@ -1692,6 +1973,7 @@ class VoxMethods():
         # Link Set Default emit strength at the start
 
             
+    @VoxProfiler.Stage("UVProjection")
     def UVProjection(context):
 
         scene = context.scene
@@ -1773,57 +2055,16 @@ class VoxMethods():
         else:
             FlowData.FinalTextureSize = int(mytool.MCNVResolution)
 
-        # Generate textures & assign them their nodes, if image baking is enabled
+        # Generate textures & assign them their nodes, if image baking is enabled. Voxel models too big for one texture get
+        # UDIM tiles instead, made once the UVs are scaled & spread over the tiles
         if (FlowData.CleanType == "Lazy" and mytool.BakeTex == True) or (FlowData.CleanType == "2Step"):
-            #print("UV Proj", FlowData.CleanType, mytool.BakeTex)
-            for Map in FlowData.BakeList:
-                if Map == "Color":
-                    FlowData.GeneratedTex_Color = bpy.data.images.new(FlowData.MainObj.name + "_Color", int(FlowData.FinalTextureSize), int(FlowData.FinalTextureSize), alpha = mytool.AlphaBool)
-                    bpy.data.images[FlowData.MainObj.name + "_Color"].generated_color = (mytool.BaseColor[0],mytool.BaseColor[1],mytool.BaseColor[2],mytool.BaseColor[3])
-                    
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Color"].image = FlowData.GeneratedTex_Color
-
-                if Map == "Roughness":
-                    FlowData.GeneratedTex_Roughness = bpy.data.images.new(FlowData.MainObj.name + "_Roughness", int(FlowData.FinalTextureSize), int(FlowData.FinalTextureSize), alpha = False)
-                    bpy.data.images[FlowData.MainObj.name + "_Roughness"].generated_color = (0,0,0,1)
-                    
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Roughness"].image = FlowData.GeneratedTex_Roughness
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Roughness"].image.colorspace_settings.name = 'Non-Color'
-
-
-                if Map == "Metallic":
-                    FlowData.GeneratedTex_Metallic = bpy.data.images.new(FlowData.MainObj.name + "_Metallic", int(FlowData.FinalTextureSize), int(FlowData.FinalTextureSize), alpha = False)
-                    bpy.data.images[FlowData.MainObj.name + "_Metallic"].generated_color = (0,0,0,1)
-                    
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Metallic"].image = FlowData.GeneratedTex_Metallic
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Metallic"].image.colorspace_settings.name = 'Non-Color'
-
-                if Map == "Emission":
-                    FlowData.GeneratedTex_Emisson = bpy.data.images.new(FlowData.MainObj.name + "_Emission", int(FlowData.FinalTextureSize), int(FlowData.FinalTextureSize), alpha = False)
-                    bpy.data.images[FlowData.MainObj.name + "_Emission"].generated_color = (0,0,0,1)
-                    
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Emission"].image = FlowData.GeneratedTex_Emisson
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Emission"].image.colorspace_settings.name = 'Non-Color'
-                
-                if Map == "Transmission":
-                    FlowData.GeneratedTex_Transmission = bpy.data.images.new(FlowData.MainObj.name + "_Transmission", int(FlowData.FinalTextureSize), int(FlowData.FinalTextureSize), alpha = False)
-                    bpy.data.images[FlowData.MainObj.name + "_Transmission"].generated_color = (0,0,0,1)
-                    
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Transmission"].image = FlowData.GeneratedTex_Transmission
-                    FlowData.MainObj.data.materials[0].node_tree.nodes["Transmission"].image.colorspace_settings.name = 'Non-Color'
-
-
-        #  Pick an active texture to be put up in the uv editor
-            if FlowData.GeneratedTex_Color != None:
-                FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Color
-            elif FlowData.GeneratedTex_Roughness != None:
-                FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Roughness
-            elif FlowData.GeneratedTex_Metallic != None:
-                FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Metallic
-            elif FlowData.GeneratedTex_Emisson != None:
-                FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Emisson
-            elif FlowData.GeneratedTex_Transmission != None:
-                FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Transmission
+            VoxMethods.CheckBakeMemory(context)
+            if FlowData.ModelType == "Voxel" and FlowData.FinalTextureSize > int(mytool.MaxTileSize):
+                FlowData.TileSize = int(mytool.MaxTileSize)
+            else:
+                # a Lazy Cleaned voxel model's upscaled texels are all copies of its 1x texels, so it bakes at 1x & gets upscaled after
+                if FlowData.ModelType == "Voxel" and FlowData.CleanType == "Lazy": VoxMethods.CreateBakeImages(context, int(FlowData.AutoRes))
+                else: VoxMethods.CreateBakeImages(context, int(FlowData.FinalTextureSize))
 
         else:
             # No texture seems to be there
@@ -1839,6 +2080,142 @@ class VoxMethods():
                     else:
                         area.spaces.active.image = FlowData.GeneratedTex_Active
 
+    def BakeMemory(Size, Maps):
+        #Bytes a bake of Maps Size x Size maps takes - 8 bit RGBA images, plus Cycles' float RGBA buffer for the map being baked
+        return Size*Size*(Maps*4 + 16)
+
+    def CheckBakeMemory(context):
+        #Holds the bake to the memory budget before any image is made. Downscales FlowData.FinalTextureSize if it's allowed to,
+        #raises a RuntimeError if the bake still doesn't fit
+        mytool = context.scene.vox_tool
+        if mytool.MemoryBudget == 0: return
+
+        Budget = mytool.MemoryBudget*1024*1024
+        Maps = max(len(FlowData.BakeList), 1)
+
+        def BakeNeed():
+            # UDIM tiles are baked a map & a tile at a time, each saved & freed before the next
+            if FlowData.ModelType == "Voxel" and FlowData.FinalTextureSize > int(mytool.MaxTileSize):
+                return VoxMethods.BakeMemory(int(mytool.MaxTileSize), 1)
+            return VoxMethods.BakeMemory(int(FlowData.FinalTextureSize), Maps)
+
+        Need = BakeNeed()
+        print("Bake Memory: " + str(int(FlowData.FinalTextureSize)) + " px, " + str(Maps) + " maps, about " + str(round(Need/1048576)) + " MB of " + str(mytool.MemoryBudget) + " MB")
+        if Need <= Budget: return
+
+        if mytool.BudgetAction == "Downscale":
+            # Voxel textures stay a whole number of pixels per voxel
+            Smallest = FlowData.AutoRes if FlowData.ModelType == "Voxel" else 64
+            while Need > Budget and FlowData.FinalTextureSize // 2 >= Smallest:
+                FlowData.FinalTextureSize = int(FlowData.FinalTextureSize // 2)
+                Need = BakeNeed()
+            if Need <= Budget:
+                print("Bake Memory: downscaled to " + str(int(FlowData.FinalTextureSize)) + " px")
+                return
+
+        raise RuntimeError("The bake needs about " + str(round(Need/1048576)) + " MB, more than the " + str(mytool.MemoryBudget) + " MB budget")
+
+    def CreateBakeImages(context, Size):
+        #Makes the images the maps get baked into & puts them on the main model's material.
+        mytool = context.scene.vox_tool
+        Nodes = FlowData.MainObj.data.materials[0].node_tree.nodes
+
+        for Map in FlowData.BakeList:
+            Color = (mytool.BaseColor[0],mytool.BaseColor[1],mytool.BaseColor[2],mytool.BaseColor[3]) if Map == "Color" else (0,0,0,1)
+            Alpha = mytool.AlphaBool if Map == "Color" else False
+
+            Image = bpy.data.images.new(FlowData.MainObj.name + "_" + Map, Size, Size, alpha = Alpha)
+            Image.generated_color = Color
+            Nodes[Map].image = Image
+            if Map != "Color": Image.colorspace_settings.name = 'Non-Color'
+            setattr(FlowData, "GeneratedTex_" + ("Emisson" if Map == "Emission" else Map), Image)
+
+        #  Pick an active texture to be put up in the uv editor
+        if FlowData.GeneratedTex_Color != None:
+            FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Color
+        elif FlowData.GeneratedTex_Roughness != None:
+            FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Roughness
+        elif FlowData.GeneratedTex_Metallic != None:
+            FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Metallic
+        elif FlowData.GeneratedTex_Emisson != None:
+            FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Emisson
+        elif FlowData.GeneratedTex_Transmission != None:
+            FlowData.GeneratedTex_Active = FlowData.GeneratedTex_Transmission
+
+    @VoxProfiler.Stage("UDIMTiles")
+    def SpreadTiles(context):
+        #Moves the scaled, pixel perfect UV islands onto UDIM tiles of at most FlowData.TileSize pixels, by whole pixels.
+        #An island bigger than a tile gets a tile of its own that fits it. The tiles' images are made by BakeTiles, a tile at a time
+        Mesh = FlowData.MainObj.data
+        Size = int(FlowData.FinalTextureSize)
+        LoopIslands, UVs = VoxMethods.UVIslands(Mesh, Size)
+        Low, High = VoxMethods.IslandRectangles(LoopIslands, UVs, Size)
+
+        Placements, TileSizes = VoxMethods.ShelfPack([tuple(Rectangle) for Rectangle in (High - Low)], FlowData.TileSize)
+        Placements = np.array(Placements)
+        Tiles, X, Y = Placements[:, 0][LoopIslands], Placements[:, 1][LoopIslands], Placements[:, 2][LoopIslands]
+
+        # UVs in their tile, the tile's UDIM number being 1001 + column + 10*row
+        TileSizes = np.array(TileSizes)
+        UVs = (UVs - Low[LoopIslands] + np.column_stack((X, Y))) / TileSizes[Tiles][:, None] + np.column_stack((Tiles % 10, Tiles // 10))
+        Mesh.uv_layers.active.data.foreach_set("uv", UVs.astype(np.float32).ravel())
+        Mesh.update()
+
+        FlowData.Tiles = [(1001 + Tile % 10 + 10*(Tile // 10), int(TileSizes[Tile])) for Tile in range(len(TileSizes))]
+
+    def BakeTiles(context, Map, Node):
+        #Bakes Map into the UDIM tiles one at a time, each into a plain image of its own size with its UVs moved onto 0-1.
+        #Every tile is saved & freed before the next one, so only one tile is ever being baked in memory.
+        #The saved tiles then come back as one packed UDIM image on the node. Every bake gets its own temp folder, as models of the
+        #same name may be baking in other workers at the same time
+        mytool = context.scene.vox_tool
+        Mesh = FlowData.MainObj.data
+        UVData = Mesh.uv_layers.active.data
+        UVs = np.empty(len(UVData)*2, dtype = np.float32)
+        UVData.foreach_get("uv", UVs)
+
+        Color = (mytool.BaseColor[0],mytool.BaseColor[1],mytool.BaseColor[2],mytool.BaseColor[3]) if Map == "Color" else (0,0,0,1)
+        Alpha = mytool.AlphaBool if Map == "Color" else False
+        Name = FlowData.MainObj.name + "_" + Map
+        Folder = tempfile.mkdtemp(prefix = "VoxTiles_")
+
+        try:
+            try:
+                for Number, Size in FlowData.Tiles:
+                    Offset = np.array(((Number - 1001) % 10, (Number - 1001) // 10), dtype = np.float32)
+                    UVData.foreach_set("uv", (UVs.reshape(-1, 2) - Offset).ravel())
+                    Mesh.update()
+
+                    Image = bpy.data.images.new(Name + "_" + str(Number), Size, Size, alpha = Alpha)
+                    Image.generated_color = Color
+                    if Map != "Color": Image.colorspace_settings.name = 'Non-Color'
+                    Node.image = Image
+                    bpy.ops.object.bake(type='DIFFUSE')
+
+                    Image.file_format = 'PNG'
+                    Image.filepath_raw = os.path.join(Folder, Name + "." + str(Number) + ".png")
+                    Image.save()
+                    Node.image = None
+                    bpy.data.images.remove(Image)
+            finally:
+                UVData.foreach_set("uv", UVs)
+                Mesh.update()
+
+            Tiled = bpy.data.images.load(os.path.join(Folder, Name + "." + str(FlowData.Tiles[0][0]) + ".png"))
+            Tiled.source = 'TILED'
+            Tiled.filepath = os.path.join(Folder, Name + ".<UDIM>.png")
+            Tiled.name = Name
+            if Map != "Color": Tiled.colorspace_settings.name = 'Non-Color'
+            Tiled.pack()
+        finally:
+            # the tiles live in the blend file once packed
+            shutil.rmtree(Folder, ignore_errors = True)
+
+        Node.image = Tiled
+        setattr(FlowData, "GeneratedTex_" + ("Emisson" if Map == "Emission" else Map), Tiled)
+        if FlowData.GeneratedTex_Active == None: FlowData.GeneratedTex_Active = Tiled
+
+    @VoxProfiler.Stage("GeometryCleanUp")
     def GeometryCleanUp(context):
 
         if FlowData.ModelType == "Voxel" or "MC":
@@ -1887,6 +2264,7 @@ class VoxMethods():
            
         FlowData.VertexCountFinalX = len(FlowData.MainObj.data.vertices)
 
+    @VoxProfiler.Stage("UVScaling")
     def UVScaling(context):
         scene = context.scene
         mytool = scene.vox_tool
@@ -1970,33 +2348,202 @@ class VoxMethods():
 
 
         
-        # Snap UV islands to Pixels
-        bpy.ops.object.mode_set(mode = 'EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.object.mode_set(mode = 'OBJECT')
-        
-        CurrentAreaType  = bpy.context.area.type
-        CurrentUIType = bpy.context.area.ui_type
-
-        bpy.context.area.type = 'IMAGE_EDITOR'
-        bpy.context.area.ui_type = 'UV'
-
-        if(FlowData.GeneratedTex_Active != None):
-            bpy.context.area.spaces.active.image = FlowData.GeneratedTex_Active
-
-            bpy.ops.object.mode_set(mode = 'EDIT')
-            bpy.ops.uv.select_all(action='SELECT')
-            bpy.ops.uv.snap_selected(target='PIXELS')
+        # Snap UV islands to Pixels - same rounding as the UV editor's Snap Selected to Pixels, but without needing an editor area,
+        # so it works in background workers & timers too
+        if(FlowData.GeneratedTex_Active != None or FlowData.TileSize > 0):
+            Width, Height = FlowData.GeneratedTex_Active.size if FlowData.TileSize == 0 else (int(FlowData.FinalTextureSize),)*2
+
+            UVData = ob.data.uv_layers.active.data
+            UVs = np.empty(len(UVData)*2, dtype = np.float32)
+            UVData.foreach_get("uv", UVs)
+            UVs = UVs.reshape(-1, 2) * (Width, Height)
+            UVs = np.trunc(UVs + np.copysign(0.5, UVs)) / (Width, Height)
+            UVData.foreach_set("uv", UVs.astype(np.float32).ravel())
+            ob.data.update()
+
+            if FlowData.TileSize > 0: VoxMethods.SpreadTiles(context)
         else:
             #print("NO Texture")
             pass
-
-        bpy.context.area.type = CurrentAreaType
-        bpy.context.area.ui_type = CurrentUIType
-
-        bpy.ops.object.mode_set(mode = 'OBJECT')
         
+    def UVIslands(Mesh, Size):
+        #The UV island of every loop, islands being faces joined by loops that share both a vertex & a UV.
+        #Also returns the UVs in pixels, for a Size x Size texture
+        LoopCount = len(Mesh.loops)
+        Vertices = np.empty(LoopCount, dtype = np.int64)
+        Mesh.loops.foreach_get("vertex_index", Vertices)
+        UVs = np.empty(LoopCount*2, dtype = np.float64)
+        Mesh.uv_layers.active.data.foreach_get("uv", UVs)
+        UVs = UVs.reshape(-1, 2) * Size
+
+        Totals = np.empty(len(Mesh.polygons), dtype = np.int64)
+        Mesh.polygons.foreach_get("loop_total", Totals)
+        LoopFaces = np.repeat(np.arange(len(Totals)), Totals)
+
+        # the faces of a corner take the lowest face index among them until nothing changes
+        Pixels = np.rint(UVs).astype(np.int64)
+        Corners = np.unique(np.column_stack((Vertices, Pixels)), axis = 0, return_inverse = True)[1].ravel()
+        Labels = np.arange(len(Totals))
+        while True:
+            CornerLabels = np.full(Corners.max() + 1, len(Totals))
+            np.minimum.at(CornerLabels, Corners, Labels[LoopFaces])
+            NewLabels = Labels.copy()
+            np.minimum.at(NewLabels, LoopFaces, CornerLabels[Corners])
+            NewLabels = NewLabels[NewLabels]
+            if np.array_equal(NewLabels, Labels): break
+            Labels = NewLabels
+
+        Islands = np.unique(Labels, return_inverse = True)[1].ravel()
+        return Islands[LoopFaces], UVs
+
+    def IslandRectangles(LoopIslands, UVs, Size):
+        #The pixel rectangle every island covers, as the lowest & highest (x, y) corners
+        IslandCount = LoopIslands.max() + 1
+        Low, High = np.full((IslandCount, 2), Size), np.zeros((IslandCount, 2), dtype = np.int64)
+        np.minimum.at(Low, LoopIslands, np.clip(np.floor(UVs + 1e-4).astype(np.int64), 0, Size - 1))
+        np.maximum.at(High, LoopIslands, np.clip(np.ceil(UVs - 1e-4).astype(np.int64), 1, Size))
+        return Low, np.maximum(High, Low + 1)
+
+    @VoxProfiler.Stage("IslandCompaction")
+    def CompactIslands(context):
+        #Islands whose texels are all one color in every baked map are squeezed into a single texel, shared by all the islands of
+        #that color. Islands with the same texels share one spot. The rest keep their texels & move by whole pixels, so the UVs
+        #stay pixel perfect. The maps shrink to fit
+        mytool = context.scene.vox_tool
+        Mesh = FlowData.MainObj.data
+        Nodes = Mesh.materials[0].node_tree.nodes
+        Images = [Nodes[Map].image for Map in FlowData.BakeList if Map in Nodes and Nodes[Map].image != None]
+        if len(Images) == 0 or Mesh.uv_layers.active == None: return
+
+        Size = Images[0].size[0]
+        Maps = [VoxMethods.ReadImagePixels(Image)[0] for Image in Images]
+        LoopIslands, UVs = VoxMethods.UVIslands(Mesh, Size)
+
+        Low, High = VoxMethods.IslandRectangles(LoopIslands, UVs, Size)
+        IslandCount = len(Low)
+
+        # flat islands share a texel with the other islands of the same color, repeated islands share their rectangle
+        Rectangles, Sources, Texels, Patterns = [], [], {}, {}
+        IslandRectangles = np.empty(IslandCount, dtype = np.int64)
+        Collapsed = np.zeros(IslandCount, dtype = bool)
+        for Island in range(IslandCount):
+            (X0, Y0), (X1, Y1) = Low[Island], High[Island]
+            Regions = [Map[Y0:Y1, X0:X1] for Map in Maps]
+            if mytool.CollapseIslands and all((Region == Region[0, 0]).all() for Region in Regions):
+                Color = b"".join(Region[0, 0].tobytes() for Region in Regions)
+                if Color not in Texels:
+                    Texels[Color] = len(Rectangles)
+                    Rectangles.append((1, 1))
+                    Sources.append((X0, Y0))
+                IslandRectangles[Island] = Texels[Color]
+                Collapsed[Island] = True
+            elif mytool.ShareIslands:
+                Pattern = (X1 - X0, Y1 - Y0) + tuple(Region.tobytes() for Region in Regions)
+                if Pattern not in Patterns:
+                    Patterns[Pattern] = len(Rectangles)
+                    Rectangles.append((X1 - X0, Y1 - Y0))
+                    Sources.append((X0, Y0))
+                IslandRectangles[Island] = Patterns[Pattern]
+            else:
+                IslandRectangles[Island] = len(Rectangles)
+                Rectangles.append((X1 - X0, Y1 - Y0))
+                Sources.append((X0, Y0))
+
+        Placements, AtlasSizes = VoxMethods.ShelfPack(Rectangles, Size)
+        if len(AtlasSizes) > 1 or AtlasSizes[0] >= Size: return
+        NewSize = AtlasSizes[0]
+
+        # UVs moved with their island, onto their shared rectangle's spot, collapsed islands onto the middle of their texel
+        Offsets = np.array([(X, Y) for _, X, Y in Placements])[IslandRectangles] - Low
+        NewUVs = UVs + Offsets[LoopIslands]
+        Flat = Collapsed[LoopIslands]
+        NewUVs[Flat] = np.array([(X, Y) for _, X, Y in Placements])[IslandRectangles[LoopIslands[Flat]]] + 0.5
+        Mesh.uv_layers.active.data.foreach_set("uv", (NewUVs / NewSize).astype(np.float32).ravel())
+        Mesh.update()
+
+        # the texels, copied over to their new spots
+        for Image, Map in zip(Images, Maps):
+            Pixels = np.zeros((NewSize, NewSize, 4), dtype = np.float32)
+            Pixels[:, :, 3] = 1
+            for (Width, Height), (X0, Y0), (_, X, Y) in zip(Rectangles, Sources, Placements):
+                Pixels[Y:Y + Height, X:X + Width] = Map[Y0:Y0 + Height, X0:X0 + Width]
+            Image.scale(NewSize, NewSize)
+            Image.pixels.foreach_set(Pixels.ravel())
+
+        FlowData.FinalTextureSize = NewSize
+
+    @VoxProfiler.Stage("Upscale")
+    def UpscaleBakedMaps(context):
+        #Brings the maps baked at 1x up to FlowData.FinalTextureSize, every texel repeated into a block like nearest neighbour scaling
+        Nodes = FlowData.MainObj.data.materials[0].node_tree.nodes
+        Size = int(FlowData.FinalTextureSize)
+        for Map in FlowData.BakeList:
+            if Map not in Nodes or Nodes[Map].image == None: continue
+            Image = Nodes[Map].image
+            Width, Height = Image.size
+            if Width >= Size: continue
+
+            Factor = Size // Width
+            Pixels = VoxMethods.ReadImagePixels(Image)[0].repeat(Factor, axis = 0).repeat(Factor, axis = 1)
+            Image.scale(Width*Factor, Height*Factor)
+            Image.pixels.foreach_set(Pixels.ravel())
+
+    @VoxProfiler.Stage("PackORM")
+    def PackORM(context):
+        #Packs the baked Roughness, Metallic & Transmission maps into one ORM image, wired in through a Separate Color node.
+        #The separate maps & their nodes are removed
+        Material = FlowData.MainObj.data.materials[0]
+        Nodes, Links = Material.node_tree.nodes, Material.node_tree.links
+        Maps = [Map for Map in StaticData.ORMChannels if Map in Nodes and Nodes[Map].type == 'TEX_IMAGE' and Nodes[Map].image != None]
+        if len(Maps) == 0 or any(Nodes[Map].image.source == 'TILED' for Map in Maps): return
+
+        Sources = {Map: VoxMethods.ReadImagePixels(Nodes[Map].image)[0] for Map in Maps}
+        Height, Width = Sources[Maps[0]].shape[:2]
+        Pixels = np.zeros((Height, Width, 4), dtype = np.float32)
+        Pixels[:, :, 0] = 1     # nothing's occluded
+        Pixels[:, :, 3] = 1     # opaque, unless Transmission takes the alpha
+        for Map in Maps: Pixels[:, :, StaticData.ORMChannels[Map]] = Sources[Map][:, :, 0]
+
+        Image = bpy.data.images.new(FlowData.MainObj.name + "_ORM", Width, Height, alpha = "Transmission" in Maps)
+        Image.colorspace_settings.name = 'Non-Color'
+        Image.alpha_mode = 'CHANNEL_PACKED'
+        Image.pixels.foreach_set(Pixels.ravel())
+
+        ORMNode = Nodes.new(type = 'ShaderNodeTexImage')
+        ORMNode.name = "ORM"
+        ORMNode.interpolation = 'Closest'
+        ORMNode.location = (-434,281)
+        ORMNode.image = Image
+
+        SplitNode = Nodes.new(type = 'ShaderNodeSeparateColor')
+        SplitNode.name = "ORMSplit"
+        SplitNode.location = (-115,281)
+        Links.new(ORMNode.outputs[0], SplitNode.inputs[0])
+
+        PrincipledBSDF = Nodes.get('Principled BSDF')
+        Outputs = {"Roughness": SplitNode.outputs[1], "Metallic": SplitNode.outputs[2], "Transmission": ORMNode.outputs[1]}
+        Inputs = {"Roughness": PrincipledBSDF.inputs[2], "Metallic": PrincipledBSDF.inputs[1], "Transmission": PrincipledBSDF.inputs[17]}
+        for Map in Maps:
+            OldImage = Nodes[Map].image
+            Nodes.remove(Nodes[Map])
+            if OldImage.users == 0: bpy.data.images.remove(OldImage)
+            setattr(FlowData, "GeneratedTex_" + Map, None)
+            Links.new(Outputs[Map], Inputs[Map])
+
+    @VoxProfiler.Stage("TextureBake")
     def TextureBake(context):
+        for Map in VoxMethods.BakeSlices(context): pass
+
+    def BakeSlices(context):
+        # The rasterizer when it's picked & can read every source of the Dupe, Cycles otherwise
+        mytool = context.scene.vox_tool
+        if mytool.BakeDevice == "RASTER" and FlowData.ModelType != "Voxel" and VoxMethods.RasterSources(FlowData.DupeObj.data) != None:
+            return VoxMethods.RasterizeSlices(context)
+        return VoxMethods.TextureBakeSlices(context)
+
+    def TextureBakeSlices(context):
+        # Yields the name of every map right before baking it, so the modal Lazy Clean can stop in between.
+        # Closing it early still puts the Dupe's materials back
 
         #No material on Dupe - bake aise hi
         #Some random material on Dupe - bake diffuse aise hi
@@ -2010,7 +2557,7 @@ class VoxMethods():
 
         # set bake settings
         bpy.context.scene.render.engine = 'CYCLES'
-        bpy.context.scene.cycles.device = 'GPU'
+        bpy.context.scene.cycles.device = 'CPU' if mytool.BakeDevice == "RASTER" else mytool.BakeDevice
 
         bpy.context.scene.cycles.bake_type = 'EMIT'
         bpy.context.scene.render.bake.use_pass_color = True
@@ -2120,43 +2667,352 @@ class VoxMethods():
                     except: pass
             
             # Diffuse Bake
-            bpy.ops.object.bake(type='DIFFUSE')
+            if FlowData.TileSize > 0: VoxMethods.BakeTiles(context, Map, NodeTree.nodes[Map])
+            else: bpy.ops.object.bake(type='DIFFUSE')
 
-        # 3. Bake - Baking all the maps using the function
-        for Key in FlowData.BakeList:
-            HandleBothTheMaterialsAndBake(Key)
-
-        def LoadGivenDatainGivenMaterialMap(GivenData, DestinationMap):
-            if type(SourceData[mat.name][GivenData]) == list : MatNodes['Principled BSDF'].inputs[DestinationMap].default_value = SourceData[mat.name][GivenData]    # Plug in a Vec4
-            elif type(SourceData[mat.name][GivenData]) == float : MatNodes['Principled BSDF'].inputs[DestinationMap].default_value = SourceData[mat.name][GivenData]   # Plug in a float
-            else:
-                try: MatLinks.new(SourceData[mat.name][GivenData],  MatNodes['Principled BSDF'].inputs[DestinationMap])     # plug in a bpyNode
-                except: pass
-                
-        # 4. Reset - Load all the data from the dictiomary, plug those values back in the diffuse channel. Do this for all materials
-        for mat in FlowData.DupeObj.data.materials:
-            MatLinks = mat.node_tree.links
-            MatNodes = mat.node_tree.nodes
-
-            LoadGivenDatainGivenMaterialMap("Color", "Base Color")
-            LoadGivenDatainGivenMaterialMap("Roughness", "Roughness")
-            LoadGivenDatainGivenMaterialMap("Metallic", "Metallic")
-            LoadGivenDatainGivenMaterialMap("Emission", "Emission Strength")
-            LoadGivenDatainGivenMaterialMap("Transmission", "Transmission Weight")
-
-        #Pack the images for safety
+        # 3. Bake - Baking all the maps using the function, a map at a time
         try:
-            for Node in NodeTree.nodes:
-                if Node.name in FlowData.BakeList:
-                    Node.image.pack()
-        except:
-            pass
+            for Key in FlowData.BakeList:
+                yield Key
+                HandleBothTheMaterialsAndBake(Key)
+
+        finally:
+            def LoadGivenDatainGivenMaterialMap(GivenData, DestinationMap):
+                if type(SourceData[mat.name][GivenData]) == list : MatNodes['Principled BSDF'].inputs[DestinationMap].default_value = SourceData[mat.name][GivenData]    # Plug in a Vec4
+                elif type(SourceData[mat.name][GivenData]) == float : MatNodes['Principled BSDF'].inputs[DestinationMap].default_value = SourceData[mat.name][GivenData]   # Plug in a float
+                else:
+                    try: MatLinks.new(SourceData[mat.name][GivenData],  MatNodes['Principled BSDF'].inputs[DestinationMap])     # plug in a bpyNode
+                    except: pass
+                
+            # 4. Reset - Load all the data from the dictiomary, plug those values back in the diffuse channel. Do this for all materials
+            for mat in FlowData.DupeObj.data.materials:
+                MatLinks = mat.node_tree.links
+                MatNodes = mat.node_tree.nodes
 
-        # Hide the Dupe
-        FlowData.DupeObj.hide_set(True)
-        
-        bpy.context.scene.render.engine = RenderEngine
+                LoadGivenDatainGivenMaterialMap("Color", "Base Color")
+                LoadGivenDatainGivenMaterialMap("Roughness", "Roughness")
+                LoadGivenDatainGivenMaterialMap("Metallic", "Metallic")
+                LoadGivenDatainGivenMaterialMap("Emission", "Emission Strength")
+                LoadGivenDatainGivenMaterialMap("Transmission", "Transmission Weight")
+
+            #Pack the images for safety. UDIM tiles are packed already, their files are gone
+            try:
+                for Node in NodeTree.nodes:
+                    if Node.name in FlowData.BakeList and Node.image.packed_file == None:
+                        Node.image.pack()
+            except:
+                pass
+
+            # Hide the Dupe
+            FlowData.DupeObj.hide_set(True)
         
+            bpy.context.scene.render.engine = RenderEngine
+
+    def RasterSources(Mesh):
+        #Where each baked map gets its color from on every Dupe material: ("Attribute", name) or ("Constant", linear RGBA).
+        #None when some material has anything else plugged in, which only Cycles can work out
+        Inputs = {"Color": "Base Color", "Roughness": "Roughness", "Metallic": "Metallic", "Emission": "Emission Strength", "Transmission": "Transmission Weight"}
+        if len(Mesh.materials) == 0: return None
+
+        Sources = {}
+        for Map in FlowData.BakeList:
+            Sources[Map] = []
+            for Material in Mesh.materials:
+                if Material == None or Material.node_tree == None or 'Principled BSDF' not in Material.node_tree.nodes: return None
+                Input = Material.node_tree.nodes['Principled BSDF'].inputs[Inputs[Map]]
+
+                if len(Input.links) == 0:
+                    Value = Input.default_value
+                    Sources[Map].append(("Constant", (Value[0], Value[1], Value[2], 1.0) if Map == "Color" else (Value, Value, Value, 1.0)))
+                    continue
+
+                Node = Input.links[0].from_node
+                if Node.type != 'VERTEX_COLOR': return None
+                Name = Node.layer_name
+                if Name == "" and Mesh.color_attributes.active_color != None: Name = Mesh.color_attributes.active_color.name
+                if Name not in Mesh.color_attributes: return None
+                Sources[Map].append(("Attribute", Name))
+        return Sources
+
+    def LoopTriangles(Mesh):
+        #The mesh's triangulation as (T,3) loop indices & the polygon each triangle came from
+        Mesh.calc_loop_triangles()
+        Count = len(Mesh.loop_triangles)
+        Loops = np.empty(Count*3, dtype = np.int64)
+        Mesh.loop_triangles.foreach_get("loops", Loops)
+        Polygons = np.empty(Count, dtype = np.int64)
+        Mesh.loop_triangles.foreach_get("polygon_index", Polygons)
+        return Loops.reshape(-1, 3), Polygons
+
+    def LoopVertices(Mesh):
+        Vertices = np.empty(len(Mesh.loops), dtype = np.int64)
+        Mesh.loops.foreach_get("vertex_index", Vertices)
+        return Vertices
+
+    def VertexPositions(Mesh):
+        Positions = np.empty(len(Mesh.vertices)*3, dtype = np.float64)
+        Mesh.vertices.foreach_get("co", Positions)
+        return Positions.reshape(-1, 3)
+
+    def CornerColors(Mesh, Name, Linear):
+        #The attribute's color on every loop, linear or sRGB encoded
+        Attribute = Mesh.color_attributes[Name]
+        Colors = np.empty(len(Attribute.data)*4, dtype = np.float32)
+        Attribute.data.foreach_get("color" if Linear else "color_srgb", Colors)
+        Colors = Colors.reshape(-1, 4)
+        if Attribute.domain == 'POINT': Colors = Colors[VoxMethods.LoopVertices(Mesh)]
+        return Colors
+
+    def RasterizeTriangles(Corners, Width, Height, Batch = 1 << 22):
+        #Finds the texel centers covered by the triangles, given as (T,3,2) corners in pixels.
+        #Returns the flat index of every covered texel, the triangle covering it & its barycentric weights (N,3).
+        #Candidates come from each triangle's bounding box, a batch of triangles at a time to keep the arrays in check
+        Low = np.clip(np.ceil(Corners.min(axis = 1) - 0.5), 0, [Width - 1, Height - 1]).astype(np.int64)
+        High = np.clip(np.floor(Corners.max(axis = 1) - 0.5), -1, [Width - 1, Height - 1]).astype(np.int64)
+        Spans = np.maximum(High - Low + 1, 0)
+        Counts = Spans[:,0]*Spans[:,1]
+
+        A, B, C = Corners[:,0], Corners[:,1], Corners[:,2]
+        Area = (B[:,0] - A[:,0])*(C[:,1] - A[:,1]) - (C[:,0] - A[:,0])*(B[:,1] - A[:,1])
+        Counts[np.abs(Area) < 1e-12] = 0
+
+        Texels, Triangles, Weights = [], [], []
+        Ends = np.cumsum(Counts)
+        Start = 0
+        while Start < len(Corners):
+            # Whole triangles per batch, at least one
+            Stop = max(int(np.searchsorted(Ends, (Ends[Start - 1] if Start > 0 else 0) + Batch, side = 'right')), Start + 1)
+            Indices = np.arange(Start, Stop)
+            Start = Stop
+
+            Repeats = Counts[Indices]
+            if Repeats.sum() == 0: continue
+            Triangle = np.repeat(Indices, Repeats)
+            Offset = np.arange(len(Triangle)) - np.repeat(np.cumsum(Repeats) - Repeats, Repeats)
+            X = Low[Triangle, 0] + Offset % Spans[Triangle, 0]
+            Y = Low[Triangle, 1] + Offset // Spans[Triangle, 0]
+
+            # Barycentric weights of the texel centers
+            PX, PY = X + 0.5 - A[Triangle, 0], Y + 0.5 - A[Triangle, 1]
+            E1X, E1Y = B[Triangle, 0] - A[Triangle, 0], B[Triangle, 1] - A[Triangle, 1]
+            E2X, E2Y = C[Triangle, 0] - A[Triangle, 0], C[Triangle, 1] - A[Triangle, 1]
+            U = (PX*E2Y - E2X*PY)/Area[Triangle]
+            V = (E1X*PY - PX*E1Y)/Area[Triangle]
+            W = 1.0 - U - V
+
+            Inside = (U >= -1e-9) & (V >= -1e-9) & (W >= -1e-9)
+            Texels.append((Y*Width + X)[Inside])
+            Triangles.append(Triangle[Inside])
+            Weights.append(np.stack((W, U, V), axis = 1)[Inside])
+
+        if len(Texels) == 0: return np.zeros(0, dtype = np.int64), np.zeros(0, dtype = np.int64), np.zeros((0, 3))
+        return np.concatenate(Texels), np.concatenate(Triangles), np.concatenate(Weights)
+
+    def ClosestOnTriangles(Points, Corners):
+        #Barycentric weights (N,3) of the closest spot on each of the (N,3,3) triangles to its point, by the triangle's
+        #Voronoi regions - a corner, an edge or the inside. Degenerate triangles take their first corner
+        A, B, C = Corners[:,0], Corners[:,1], Corners[:,2]
+        AB, AC = B - A, C - A
+        AP, BP, CP = Points - A, Points - B, Points - C
+        D1, D2 = (AB*AP).sum(1), (AC*AP).sum(1)
+        D3, D4 = (AB*BP).sum(1), (AC*BP).sum(1)
+        D5, D6 = (AB*CP).sum(1), (AC*CP).sum(1)
+        VA, VB, VC = D3*D6 - D5*D4, D5*D2 - D1*D6, D1*D4 - D3*D2
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            Denominator = VA + VB + VC
+            V, W = VB/Denominator, VC/Denominator
+            Weights = np.stack((1.0 - V - W, V, W), axis = 1)
+
+            # the edges & corners, later ones win as the regions are checked corner A first
+            EdgeBC = (D4 - D3)/((D4 - D3) + (D5 - D6))
+            EdgeAC = D2/(D2 - D6)
+            EdgeAB = D1/(D1 - D3)
+            Zero, One = np.zeros_like(D1), np.ones_like(D1)
+            Regions = ((VA <= 0) & (D4 - D3 >= 0) & (D5 - D6 >= 0), np.stack((Zero, 1.0 - EdgeBC, EdgeBC), axis = 1)), \
+                      ((VB <= 0) & (D2 >= 0) & (D6 <= 0), np.stack((1.0 - EdgeAC, Zero, EdgeAC), axis = 1)), \
+                      ((D6 >= 0) & (D5 <= D6), np.stack((Zero, Zero, One), axis = 1)), \
+                      ((VC <= 0) & (D1 >= 0) & (D3 <= 0), np.stack((1.0 - EdgeAB, EdgeAB, Zero), axis = 1)), \
+                      ((D3 >= 0) & (D4 <= D3), np.stack((Zero, One, Zero), axis = 1)), \
+                      ((D1 <= 0) & (D2 <= 0), np.stack((One, Zero, Zero), axis = 1))
+            for Mask, Region in Regions:
+                Weights[Mask] = Region[Mask]
+
+        Weights[~np.isfinite(Weights).all(axis = 1)] = (1.0, 0.0, 0.0)
+        return Weights
+
+    def ClosestTriangles(Points, Corners, Batch = 1 << 14):
+        #The closest of the (T,3,3) triangles to every point & the barycentric weights of the closest spot on it.
+        #The triangles go in a grid of cells about a triangle wide, each listed in every cell within half a cell of it, so a
+        #point only checks the ones listed in its own cell. That's exact when the closest one's within half a cell, which it
+        #is for a surface taken off a decimated copy of the mesh. Also returns the points it couldn't be sure about
+        Low = Corners.reshape(-1, 3).min(axis = 0)
+        Cell = max(float(np.median((Corners.max(axis = 1) - Corners.min(axis = 1)).max(axis = 1))), 1e-6)
+        Margin = Cell/2
+        Dims = ((Corners.reshape(-1, 3).max(axis = 0) - Low)/Cell).astype(np.int64) + 1
+
+        # every triangle in every cell within the margin of it, sorted by cell
+        TriangleLow = np.clip(np.floor((Corners.min(axis = 1) - Margin - Low)/Cell).astype(np.int64), 0, Dims - 1)
+        TriangleHigh = np.clip(np.floor((Corners.max(axis = 1) + Margin - Low)/Cell).astype(np.int64), 0, Dims - 1)
+        Spans = TriangleHigh - TriangleLow + 1
+        Counts = Spans.prod(axis = 1)
+        Triangle = np.repeat(np.arange(len(Corners)), Counts)
+        Offset = np.arange(len(Triangle)) - np.repeat(np.cumsum(Counts) - Counts, Counts)
+        X = TriangleLow[Triangle, 0] + Offset % Spans[Triangle, 0]
+        Y = TriangleLow[Triangle, 1] + (Offset // Spans[Triangle, 0]) % Spans[Triangle, 1]
+        Z = TriangleLow[Triangle, 2] + Offset // (Spans[Triangle, 0]*Spans[Triangle, 1])
+        Keys = X + Y*Dims[0] + Z*Dims[0]*Dims[1]
+        Order = np.argsort(Keys, kind = 'stable')
+        Keys, Listed = Keys[Order], Triangle[Order]
+        Centroids, Lowest, Highest = Corners.mean(axis = 1), Corners.min(axis = 1), Corners.max(axis = 1)
+
+        Hit = np.zeros(len(Points), dtype = np.int64)
+        Weights = np.zeros((len(Points), 3))
+        Unsure = np.ones(len(Points), dtype = bool)
+
+        # the points go cell by cell, so the points of a batch mostly share their cells' lists
+        Cells = np.floor((Points - Low)/Cell).astype(np.int64)
+        Inside = ((Cells >= 0) & (Cells < Dims)).all(axis = 1)
+        PointKeys = np.where(Inside, Cells[:, 0] + Cells[:, 1]*Dims[0] + Cells[:, 2]*Dims[0]*Dims[1], -1)
+        Sorted = np.argsort(PointKeys, kind = 'stable')
+
+        for Start in range(0, len(Points), Batch):
+            Batched = Sorted[Start:Start + Batch]
+            P, Key = Points[Batched], PointKeys[Batched]
+            First = np.searchsorted(Keys, Key, side = 'left')
+            Count = np.where(Key >= 0, np.searchsorted(Keys, Key, side = 'right') - First, 0)
+            if Count.sum() == 0: continue
+
+            # every point against the triangles listed in its cell. The nearest centroid's distance is as far as the closest
+            # spot can be, so only the triangles with their bounds closer than that get the full check
+            Starts = np.cumsum(Count) - Count
+            Point = np.repeat(np.arange(len(P)), Count)
+            Candidate = Listed[np.repeat(First, Count) + np.arange(len(Point)) - np.repeat(Starts, Count)]
+            Farthest = np.minimum.reduceat(((P[Point] - Centroids[Candidate])**2).sum(axis = 1), Starts[Count > 0])
+            Nearest = ((np.maximum(Lowest[Candidate] - P[Point], 0) + np.maximum(P[Point] - Highest[Candidate], 0))**2).sum(axis = 1)
+            Keep = Nearest <= np.repeat(Farthest, Count[Count > 0])
+            Point, Candidate = Point[Keep], Candidate[Keep]
+            Count = np.bincount(Point, minlength = len(P))
+            Starts = np.cumsum(Count) - Count
+
+            Found = VoxMethods.ClosestOnTriangles(P[Point], Corners[Candidate])
+            Distance = ((P[Point] - (Found[:, :, None]*Corners[Candidate]).sum(axis = 1))**2).sum(axis = 1)
+            Best = np.lexsort((Distance, Point))[Starts[Count > 0]]
+
+            Index = Batched[Count > 0]
+            Hit[Index], Weights[Index] = Candidate[Best], Found[Best]
+            Unsure[Index] = Distance[Best] > Margin*Margin
+
+        return Hit, Weights, np.nonzero(Unsure)[0]
+
+    def Barycentric(Points, Corners):
+        #Barycentric weights (N,3) of points lying on the (N,3,3) triangles. Degenerate triangles take their first corner
+        E1, E2, P = Corners[:,1] - Corners[:,0], Corners[:,2] - Corners[:,0], Points - Corners[:,0]
+        D11, D12, D22 = (E1*E1).sum(1), (E1*E2).sum(1), (E2*E2).sum(1)
+        DP1, DP2 = (P*E1).sum(1), (P*E2).sum(1)
+        Denominator = D11*D22 - D12*D12
+        Valid = np.abs(Denominator) > 1e-20
+        Denominator = np.where(Valid, Denominator, 1.0)
+        V = np.where(Valid, (D22*DP1 - D12*DP2)/Denominator, 0.0)
+        W = np.where(Valid, (D11*DP2 - D12*DP1)/Denominator, 0.0)
+        return np.stack((1.0 - V - W, V, W), axis = 1)
+
+    def BleedPixels(Pixels, Filled, Steps):
+        #Grows the filled texels into the empty ones around them, a texel per step, like the bake's Extend margin
+        Filled = Filled.copy()
+        for _ in range(Steps):
+            Grown = Filled.copy()
+            for Target, Source in (((slice(1, None), slice(None)), (slice(None, -1), slice(None))),
+                                   ((slice(None, -1), slice(None)), (slice(1, None), slice(None))),
+                                   ((slice(None), slice(1, None)), (slice(None), slice(None, -1))),
+                                   ((slice(None), slice(None, -1)), (slice(None), slice(1, None)))):
+                Take = Filled[Source] & ~Grown[Target]
+                Pixels[Target][Take] = Pixels[Source][Take]
+                Grown[Target] |= Take
+            if Grown.sum() == Filled.sum(): break
+            Filled = Grown
+        return Pixels
+
+    def RasterizeSlices(context):
+        # Yields the name of every map right before filling it, like TextureBakeSlices.
+        # The maps get the Dupe's vertex colors without Cycles: the Main's texels are found by rasterizing its UVs, then colored
+        # from the same triangle on the Dupe when the topology's untouched, or from the closest point on the Dupe otherwise.
+        # Only the rare texels ClosestTriangles isn't sure about go through mathutils' BVH, a point at a time
+        from mathutils.bvhtree import BVHTree
+
+        Main, Dupe = FlowData.MainObj.data, FlowData.DupeObj.data
+        Sources = VoxMethods.RasterSources(Dupe)
+        Nodes = FlowData.MainObj.material_slots[0].material.node_tree.nodes
+        FlowData.Bleed = int(int(FlowData.FinalTextureSize)/128)
+
+        Width, Height = Nodes[FlowData.BakeList[0]].image.size
+        Triangles, _ = VoxMethods.LoopTriangles(Main)
+        UVs = np.empty(len(Main.loops)*2, dtype = np.float64)
+        Main.uv_layers.active.data.foreach_get("uv", UVs)
+        UVs = UVs.reshape(-1, 2)*(Width, Height)
+        Texels, Triangle, Weights = VoxMethods.RasterizeTriangles(UVs[Triangles], Width, Height)
+
+        # Where each texel lands on the Dupe - the triangle & the weights there
+        DupeTriangles, DupePolygons = VoxMethods.LoopTriangles(Dupe)
+        MainLoops, DupeLoops = VoxMethods.LoopVertices(Main), VoxMethods.LoopVertices(Dupe)
+        SameTopology = np.array_equal(MainLoops, DupeLoops) and np.array_equal(Triangles, DupeTriangles)
+        if SameTopology:
+            Hit, HitWeights = Triangle, Weights
+        else:
+            Positions = VoxMethods.VertexPositions(Main)[MainLoops]
+            Points = (Weights[:,:,None]*Positions[Triangles[Triangle]]).sum(axis = 1)
+            ToDupe = np.array(FlowData.DupeObj.matrix_world.inverted() @ FlowData.MainObj.matrix_world)
+            Points = Points @ ToDupe[:3,:3].T + ToDupe[:3,3]
+
+            DupePositions = VoxMethods.VertexPositions(Dupe)
+            Corners = DupeLoops[DupeTriangles]
+            Hit, HitWeights, Unsure = VoxMethods.ClosestTriangles(Points, DupePositions[Corners])
+
+            # the few points too far from the Dupe for the grid, like ones over its holes
+            if len(Unsure) > 0:
+                Tree = BVHTree.FromPolygons(DupePositions.tolist(), Corners.tolist(), all_triangles = True)
+                Nearest = [Tree.find_nearest(Point) for Point in Points[Unsure].tolist()]
+                Hit[Unsure] = [Found[2] for Found in Nearest]
+                Locations = np.array([Found[0] for Found in Nearest], dtype = np.float64).reshape(-1, 3)
+                HitWeights[Unsure] = VoxMethods.Barycentric(Locations, DupePositions[Corners[Hit[Unsure]]])
+
+        MaterialIndices = np.empty(len(Dupe.polygons), dtype = np.int64)
+        Dupe.polygons.foreach_get("material_index", MaterialIndices)
+        HitMaterials = np.minimum(MaterialIndices[DupePolygons[Hit]], len(Dupe.materials) - 1)
+
+        try:
+            for Map in FlowData.BakeList:
+                yield Map
+                Image = Nodes[Map].image
+                Linear = Image.is_float or Image.colorspace_settings.name != 'sRGB'
+
+                Colors = np.ones((len(Texels), 4), dtype = np.float32)
+                for Slot, (Kind, Value) in enumerate(Sources[Map]):
+                    Mask = HitMaterials == Slot
+                    if Kind == "Constant":
+                        Color = np.array(Value, dtype = np.float32)
+                        if not Linear: Color[:3] = VoxMethods.LinearToSRGB(Color[:3])
+                        Colors[Mask] = Color
+                    else:
+                        Corner = VoxMethods.CornerColors(Dupe, Value, Linear)
+                        Colors[Mask] = (HitWeights[Mask][:,:,None]*Corner[DupeTriangles[Hit[Mask]]]).sum(axis = 1)
+                Colors[:,3] = 1.0
+
+                Pixels = VoxMethods.ReadImagePixels(Image)[0]
+                Filled = np.zeros(Width*Height, dtype = bool)
+                Pixels.reshape(-1, 4)[Texels] = Colors
+                Filled[Texels] = True
+                Pixels = VoxMethods.BleedPixels(Pixels, Filled.reshape(Height, Width), FlowData.Bleed)
+                Image.pixels.foreach_set(Pixels[:,:,:Image.channels].ravel())
+        finally:
+            #Pack the images for safety
+            try:
+                for Map in FlowData.BakeList:
+                    Nodes[Map].image.pack()
+            except:
+                pass
+            FlowData.DupeObj.hide_set(True)
+
     def EndProcess(context):
 
         scene = context.scene
@@ -2249,6 +3105,7 @@ class VoxMethods():
         FlowData.CommonUVObjects = []
         FlowData.CommonUVDupeObjects = []
         FlowData.CommonUVOrigins = {}
+        FlowData.CommonUVTags = {}
 
         FlowData.VertexCountInitialX = 0
         FlowData.VertexCountFinalX = 0
@@ -2265,6 +3122,8 @@ class VoxMethods():
         FlowData.ApproxLen = 0.0
         FlowData.AutoRes = 0
         FlowData.FinalTextureSize = 0.0
+        FlowData.TileSize = 0
+        FlowData.Tiles = []
         FlowData.Bleed = 0.0
 
         FlowData.MaterialMaps = []
@@ -2283,18 +3142,339 @@ class VoxMethods():
         FlowData.TwoStepCommonUV = False
         FlowData.ProcessRunning = False
         FlowData.MissingActors = False
+
+        VoxProfiler.EndRun()
         
 
-    def GetTextures(context):
-        #Get a list of exportable textures on a model ready. No duplicates. 
+    def LazyCleanCheck(Operator, context):
+        #Checks if Lazy Clean can run, returns the mode ("Shared", "Solo" or None after reporting why not) & the model type.
+        #The type's only checked for a Shared set here, the check fixes the models too so LazyCleanSteps takes it as is
+        mytool = context.scene.vox_tool
+        CleanStatus,StepStatus,ExportStatus = VoxMethods.MrChecker(context)
         
-        NodeList = []
+        if type(CleanStatus) != int:
+            Operator.report({'WARNING'}, CleanStatus)
+            return None, None
+
+        if CleanStatus > 1 & mytool.CommonUV == True:
+            #Check for a mixed model set
+            ModelType = VoxMethods.MrModelTypeChecker(context.selected_objects)
+            if ModelType == "Mixed":
+                Operator.report({'WARNING'}, "Mixed model set, select only one type of models")
+                return None, None
+            return "Shared", ModelType
+
+        return "Solo", None
+
+    def LazyCleanSteps(Operator, context, Mode, ModelType = None):
+        # The whole Lazy Clean. Yields (Progress, Stage) before every stage, so the modal Lazy Clean can update the UI & stop in between.
+        # Running it to the end is the same as the plain Lazy Clean.
+        # Only whole stages are sliced, so the UI only stays responsive between them. The slow loops (UV scaling, the type check)
+        # walk an edit mode bmesh, which the UI would free under them if they yielded halfway
         mytool = context.scene.vox_tool
+        FlowData.CleanType = "Lazy"
+        CacheKey = None
 
-        def CheckforTexturesWithinModels(obj,MapKey):
-            try:
-                if obj.data.materials[0] != None:
-                    if obj.data.materials[0].node_tree.nodes[MapKey] != None:
+        if Mode == "Shared":
+            # lazy Common UV
+            FlowData.CommonUVObjects = [obj.name for obj in context.selected_objects]
+            FlowData.ModelType = ModelType if ModelType != None else VoxMethods.MrModelTypeChecker(context.selected_objects)
+
+            yield 0.0, "Joining models"
+            VoxMethods.JoinModels(context)
+            bpy.ops.object.mode_set(mode = 'EDIT')
+            bpy.ops.object.mode_set(mode = 'OBJECT')
+        else:
+            # solo clean
+            ObjArray = bpy.context.selected_objects
+
+            # deselect everything
+            bpy.ops.object.select_all(action='DESELECT')
+            bpy.context.view_layer.objects.active = None
+            
+            #select the obj
+            bpy.context.view_layer.objects.active = ObjArray[0]
+            ObjArray[0].select_set(True)
+
+            # a model cleaned before with the same settings comes straight out of the cache
+            if mytool.UseCache:
+                CacheKey = VoxCache.Key(context, ObjArray[0])
+                Cached = VoxCache.Load(CacheKey)
+                if Cached != None:
+                    yield 0.05, "Loading from the cache"
+                    VoxCache.Restore(context, Cached)
+                    PercentageCleaning = round(100-(FlowData.VertexCountFinalX*100/FlowData.VertexCountInitialX),1)
+                    VoxMethods.EndProcess(context)
+
+                    bpy.ops.object.select_all(action='DESELECT')
+                    bpy.context.view_layer.objects.active = ObjArray[0]
+                    ObjArray[0].select_set(True)
+
+                    Operator.report({'INFO'}, "Model cleaned from the cache! "+str(PercentageCleaning)+"% vertex reduction!")
+                    return
+
+            FlowData.ModelType = VoxMethods.MrModelTypeChecker(context.selected_objects)
+
+        # clean Selected Object ie Object Set 
+        yield 0.05, "Fixing the model"
+        VoxMethods.ModelFixing(context)
+
+        if mytool.BakeTex == True:
+            yield 0.1, "Setting up materials"
+            VoxMethods.MaterialSetUp(context)
+        
+        if FlowData.ModelType == "Voxel":
+            yield 0.15, "Projecting UVs"
+            VoxMethods.UVProjection(context)
+
+            if mytool.CleanGeo == True:
+                yield 0.3, "Cleaning geometry"
+                VoxMethods.GeometryCleanUp(context)
+            
+            yield 0.4, "Scaling UVs"
+            VoxMethods.UVScaling(context)
+        else:
+            if mytool.CleanGeo == True:
+                yield 0.15, "Cleaning geometry"
+                VoxMethods.GeometryCleanUp(context)
+
+            yield 0.3, "Projecting UVs"
+            VoxMethods.UVProjection(context)
+            
+        #Get a vert count dammit
+        FlowData.VertexCountFinalX = len(FlowData.MainObj.data.vertices)
+
+        # Bake a map at a time, baking takes most of the time
+        if mytool.BakeTex == True:
+            with VoxProfiler.Measure("TextureBake"):
+                Slices = VoxMethods.BakeSlices(context)
+                try:
+                    for Map in Slices:
+                        yield 0.45 + 0.5*FlowData.BakeList.index(Map)/len(FlowData.BakeList), "Baking " + Map
+                finally:
+                    Slices.close()
+
+            if FlowData.GeneratedTex_Active != None and FlowData.TileSize == 0 and FlowData.GeneratedTex_Active.size[0] < FlowData.FinalTextureSize:
+                yield 0.93, "Upscaling textures"
+                VoxMethods.UpscaleBakedMaps(context)
+
+        if mytool.BakeTex == True and (mytool.CollapseIslands or mytool.ShareIslands) and FlowData.ModelType == "Voxel" and FlowData.TileSize == 0:
+            yield 0.95, "Compacting textures"
+            VoxMethods.CompactIslands(context)
+
+        if CacheKey != None and FlowData.TileSize == 0: VoxCache.Store(context, CacheKey)
+
+        # after storing, the cache keeps the maps apart & packs them again when restoring
+        if mytool.BakeTex == True and mytool.PackORM:
+            yield 0.95, "Packing the ORM map"
+            VoxMethods.PackORM(context)
+
+        PercentageCleaning = round(100-(FlowData.VertexCountFinalX*100/FlowData.VertexCountInitialX),1)
+        ModelType = FlowData.ModelType
+
+        if Mode == "Shared":
+            # Split both the objects
+            yield 0.95, "Splitting models"
+            VoxMethods.ApplySplitToBothObjects(context)
+
+            #Give out a feedback
+            if ModelType == "Voxel": stmnt = "Model Set cleaned! "+str(PercentageCleaning)+"% avg vertex reduction!"
+            else: stmnt = str(ModelType)+" Model Set cleaned! "+str(PercentageCleaning)+"% avg vertex reduction!"
+            
+            #Clean The Plate
+            VoxMethods.EndProcess(context)
+        else:
+            VoxMethods.EndProcess(context)
+
+            # select the object
+            bpy.context.view_layer.objects.active = None
+            bpy.context.view_layer.objects.active = ObjArray[0]
+            bpy.ops.object.select_all(action='DESELECT')
+            ObjArray[0].select_set(True)
+
+            #Give out a feedback
+            if ModelType == "Voxel": stmnt = "Model cleaned! "+str(PercentageCleaning)+"% vertex reduction!"
+            else: stmnt = str(ModelType)+" Model cleaned! "+str(PercentageCleaning)+"% vertex reduction!"
+
+        Operator.report({'INFO'}, stmnt)
+
+    def RollBackClean(context):
+        # Undoes an unfinished Lazy Clean - removes the half cleaned model & brings back the untouched Dupe in its place
+        if bpy.context.mode != 'OBJECT': bpy.ops.object.mode_set(mode = 'OBJECT')
+
+        Restored = []
+        if FlowData.DupeObj:
+            MainMesh = FlowData.MainObj.data
+            MainTags = {Key: FlowData.MainObj[Key] for Key in FlowData.MainObj.keys() if Key.startswith("vox_")}
+
+            # the material & images made for the bake
+            if len(FlowData.BakeList) > 0:
+                for Material in list(MainMesh.materials):
+                    if Material is None: continue
+                    if Material.node_tree is not None:
+                        for Node in Material.node_tree.nodes:
+                            if Node.type == 'TEX_IMAGE' and Node.name in FlowData.BakeList and Node.image is not None: bpy.data.images.remove(Node.image)
+                    bpy.data.materials.remove(Material)
+
+            bpy.data.objects.remove(FlowData.MainObj)
+            if MainMesh.users == 0: bpy.data.meshes.remove(MainMesh)
+            FlowData.MainObj = None
+
+            FlowData.DupeObj.hide_set(False)
+            bpy.ops.object.select_all(action='DESELECT')
+            FlowData.DupeObj.select_set(True)
+            bpy.context.view_layer.objects.active = FlowData.DupeObj
+
+            # the Dupe of a Shared UV clean is the joined set, split it back into the models
+            if len(FlowData.CommonUVOrigins) > 0: Restored = VoxMethods.SplitModels(context)
+            else:
+                FlowData.DupeObj.name = FlowData.MainObjName
+                for Key, Value in MainTags.items(): FlowData.DupeObj[Key] = Value
+                Restored = [FlowData.DupeObj]
+
+        elif len(FlowData.CommonUVOrigins) > 0:
+            # cancelled right after joining, the set is still active
+            Restored = VoxMethods.SplitModels(context)
+
+        # no backup handling in EndProcess, there's nothing cleaned to back up
+        FlowData.CleanType = "Cancelled"
+        VoxMethods.EndProcess(context)
+
+        bpy.ops.object.select_all(action='DESELECT')
+        for Obj in Restored: Obj.select_set(True)
+        if len(Restored) > 0: bpy.context.view_layer.objects.active = Restored[0]
+
+    def SettingsToDict(mytool):
+        #All the Vox Cleaner settings as plain values, for handing them to background workers
+        Settings = {}
+        for Property in mytool.bl_rna.properties:
+            if Property.identifier == "rna_type" or Property.type in ('POINTER', 'COLLECTION'): continue
+            Value = getattr(mytool, Property.identifier)
+            if Property.type == 'ENUM' and Property.is_enum_flag: Value = sorted(Value)
+            elif getattr(Property, "is_array", False): Value = list(Value)
+            Settings[Property.identifier] = Value
+        return Settings
+
+    def SettingsFromDict(mytool, Settings):
+        for Key, Value in Settings.items():
+            if Key not in mytool.bl_rna.properties: continue
+            Property = mytool.bl_rna.properties[Key]
+            try: setattr(mytool, Key, set(Value) if Property.type == 'ENUM' and Property.is_enum_flag else Value)
+            except Exception as e: print("Setting Error", Key, e)
+
+    def ResetScene():
+        #Removes everything a processed file left behind. Only for background workers, this empties the whole file
+        if bpy.context.object != None and bpy.context.object.mode != 'OBJECT': bpy.ops.object.mode_set(mode = 'OBJECT')
+        for Collection in (bpy.data.objects, bpy.data.meshes, bpy.data.materials, bpy.data.images, bpy.data.collections):
+            for Block in list(Collection): Collection.remove(Block)
+        bpy.data.orphans_purge(do_recursive = True)
+
+    def ProcessFile(context, InputPath, OutputDirectory, Formats):
+        #Import, Lazy Clean & export all the models of a .vox or .blend file with the current settings, into OutputDirectory.
+        #Used by the background workers. Returns a summary of the models & files
+        mytool = context.scene.vox_tool
+        Start, StartTime = time.perf_counter(), time.time()
+        os.makedirs(OutputDirectory, exist_ok = True)
+
+        if bpy.context.object != None and bpy.context.object.mode != 'OBJECT': bpy.ops.object.mode_set(mode = 'OBJECT')
+        ObjectsBefore = set(bpy.data.objects.keys())
+
+        # Import
+        if InputPath.lower().endswith(".vox"):
+            Directory, FileName = os.path.split(InputPath)
+            if 'FINISHED' not in bpy.ops.voxcleaner.importvox(filepath = InputPath, directory = Directory, files = [{"name": FileName}]):
+                raise RuntimeError("Import failed")
+        else:
+            with bpy.data.libraries.load(InputPath, link = False) as (DataFrom, DataTo):
+                DataTo.objects = list(DataFrom.objects)
+            for Obj in DataTo.objects:
+                if Obj != None and Obj.type == 'MESH': context.scene.collection.objects.link(Obj)
+
+        ModelNames = [Obj.name for Obj in context.scene.objects if Obj.name not in ObjectsBefore and Obj.type == 'MESH']
+        if len(ModelNames) == 0: raise RuntimeError("No models in the file")
+        VerticesBefore = {Name: len(bpy.data.objects[Name].data.vertices) for Name in ModelNames}
+
+        def SelectOnly(Objects):
+            bpy.ops.object.select_all(action='DESELECT')
+            for Obj in Objects: Obj.select_set(True)
+            bpy.context.view_layer.objects.active = Objects[0]
+
+        def SpreadChain(Chain):
+            # the levels of a chain sit on top of each other & get joined in place, so the selected to active bake would pick up
+            # the colors of the other levels. Line them up along X, a chain width apart, while they're cleaned
+            Boxes = np.concatenate([np.array(Obj.bound_box) @ np.array(Obj.matrix_world)[:3, :3].T + np.array(Obj.matrix_world)[:3, 3] for Obj in Chain])
+            Step = float(Boxes[:, 0].max() - Boxes[:, 0].min()) + 1
+            Moved = {}
+            for Index, Obj in enumerate(Chain):
+                Obj.location.x += Index * Step
+                Moved[Obj.name] = Index * Step
+            return Moved
+
+        def GatherChain(Moved, Spread, ObjectsBefore):
+            # put the cleaned levels back. The backups come out of the split where their level was, so they're found by location
+            for Name, Offset in Moved.items():
+                if bpy.data.objects.get(Name) != None: bpy.data.objects[Name].location.x -= Offset
+            for Obj in [Obj for Obj in bpy.data.objects if Obj.name not in ObjectsBefore and Obj.type == 'MESH']:
+                Offset = Spread.get(tuple(round(Value, 2) for Value in Obj.location))
+                if Offset != None: Obj.location.x -= Offset
+
+        def Clean():
+            # a clean that stops, like one over the memory budget, fails the file instead of exporting uncleaned models
+            if 'FINISHED' not in bpy.ops.voxcleaner.lazyclean(): raise RuntimeError(FlowData.CleanError or "Lazy Clean failed")
+
+        # Lazy Clean, all together with Shared UVs or one by one. A model & its LODs are cleaned together on Shared UVs,
+        # so the chain gets one texture. The cleaned models keep their names
+        if mytool.CleanGeo or mytool.BakeTex:
+            if mytool.CommonUV and len(ModelNames) > 1:
+                SelectOnly([bpy.data.objects[Name] for Name in ModelNames])
+                Clean()
+            else:
+                SharedUVs, Chains = mytool.CommonUV, {}
+                for Name in ModelNames:
+                    Obj = bpy.data.objects[Name]
+                    Chains.setdefault((Obj.get("vox_source"), Obj.get("vox_node"), Obj.get("vox_chunk")) if "vox_lod" in Obj else Name, []).append(Obj)
+                try:
+                    for Chain in Chains.values():
+                        mytool.CommonUV = len(Chain) > 1
+                        if not mytool.CommonUV:
+                            SelectOnly(Chain)
+                            Clean()
+                            continue
+                        Moved = SpreadChain(Chain)
+                        Spread = {tuple(round(Value, 2) for Value in Obj.location): Moved[Obj.name] for Obj in Chain}
+                        ChainBefore = set(bpy.data.objects.keys())
+                        SelectOnly(Chain)
+                        try: Clean()
+                        finally: GatherChain(Moved, Spread, ChainBefore)
+                finally:
+                    mytool.CommonUV = SharedUVs
+
+        # Export every model on its own
+        mytool.ExportLocation = OutputDirectory
+        Models = []
+        for Name in ModelNames:
+            Obj = bpy.data.objects.get(Name)
+            if Obj == None: continue
+            Models.append({"Name": Name, "VerticesBefore": VerticesBefore[Name], "VerticesAfter": len(Obj.data.vertices)})
+            for Format in Formats:
+                SelectOnly([Obj])
+                # an export that's cancelled or loses a file fails the job, like a failed clean does
+                if 'FINISHED' not in getattr(bpy.ops.voxcleaner, "export" + Format.lower())() or FlowData.ExportError != None:
+                    raise RuntimeError(FlowData.ExportError or Format + " export of " + Name + " failed")
+
+        Files = sorted(File for File in os.listdir(OutputDirectory) if os.path.getmtime(os.path.join(OutputDirectory, File)) >= StartTime - 1)
+        return {"Models": Models, "Files": Files, "Seconds": round(time.perf_counter() - Start, 3)}
+
+    def GetTextures(context):
+        #Get a list of exportable textures on a model ready. No duplicates. 
+        
+        NodeList = []
+        mytool = context.scene.vox_tool
+
+        def CheckforTexturesWithinModels(obj,MapKey):
+            try:
+                if obj.data.materials[0] != None:
+                    if obj.data.materials[0].node_tree.nodes[MapKey] != None:
                         if obj.data.materials[0].node_tree.nodes[MapKey].type == 'TEX_IMAGE':
                             if obj.data.materials[0].node_tree.nodes[MapKey].image != None:
                                 NodeList.append(obj.data.materials[0].node_tree.nodes[MapKey])
@@ -2316,32 +3496,1043 @@ class VoxMethods():
             if mytool.ExportTransmission == True:
                 CheckforTexturesWithinModels(obj,"Transmission")
 
+            if mytool.ExportRoughness or mytool.ExportMetallic or mytool.ExportTransmission:
+                CheckforTexturesWithinModels(obj,"ORM")
+
         return list(set(NodeList))
 
+    @VoxProfiler.Stage("TextureExport")
     def TextureExport(context):
+        #Pulls the pixels of every exportable texture on the main thread & hands them to the TextureWriter pool, which encodes & writes the PNGs.
+        #Doesn't wait for the files, call TextureWriter.Wait() once the meshes are exported.
+        #Returns the number of textures & how many of them couldn't be handed over
 
         scene = context.scene
         mytool = scene.vox_tool
 
         NodeList = VoxMethods.GetTextures(context)
-        
+        ExportDirectory = os.path.realpath(bpy.path.abspath(mytool.ExportLocation))
 
+        Failed = 0
         for Node in NodeList:
             try:
-                #TargetNode = bpy.context.active_object.active_material.node_tree.nodes[MapKey]
                 ObjectTexture = Node.image
-                ObjectTexture.alpha_mode = 'STRAIGHT'
-                FilePath = os.path.join(mytool.ExportLocation, str(ObjectTexture.name)+".png")
+                if ObjectTexture.alpha_mode != 'CHANNEL_PACKED': ObjectTexture.alpha_mode = 'STRAIGHT'
+
+                # UDIMs are written by Blender, a file per tile
+                if ObjectTexture.source == 'TILED':
+                    ObjectTexture.file_format = 'PNG'
+                    ObjectTexture.filepath_raw = os.path.join(ExportDirectory, str(ObjectTexture.name) + ".<UDIM>.png")
+                    ObjectTexture.save()
+                    continue
+
+                FilePath = os.path.join(ExportDirectory, str(ObjectTexture.name)+".png")
+
+                # Point the image to the exported file, so the OBJ's mtl can find it
                 ObjectTexture.file_format='PNG'
-                AreaType = bpy.context.area.type
-                bpy.context.area.type = 'IMAGE_EDITOR'
-                bpy.context.area.spaces.active.image = ObjectTexture 
-                bpy.ops.image.save_as(save_as_render=False, copy=False, filepath=FilePath,show_multiview=False, use_multiview=False)
-                bpy.context.area.type = AreaType
-            except error as e:
+                ObjectTexture.filepath_raw = FilePath
+
+                Pixels, IsLinear = VoxMethods.ReadImagePixels(ObjectTexture)
+                TextureWriter.Submit(FilePath, Pixels, IsLinear)
+            except Exception as e:
                 print("Texture Export Error",e)
-        
-        return len(NodeList)
+                Failed += 1
+
+        return len(NodeList), Failed
+
+    def ShelfPack(Sizes, AtlasSize):
+        #Packs (width, height) rectangles, tallest first, into rows of square atlases. Returns the (atlas, x, y) of every
+        #rectangle in the given order & the size of every atlas, shrunk to the smallest power of 2 that fits.
+        #A rectangle bigger than AtlasSize gets an atlas of its own
+        Placements = [None]*len(Sizes)
+        Atlases = []    # [Width used, Height used, Shelf x, Shelf y, Shelf height]
+        for Index in sorted(range(len(Sizes)), key = lambda i: (-Sizes[i][1], -Sizes[i][0])):
+            Width, Height = Sizes[Index]
+            if len(Atlases) > 0:
+                Atlas = Atlases[-1]
+                if Atlas[2] + Width > AtlasSize: Atlas[2], Atlas[3], Atlas[4] = 0, Atlas[3] + Atlas[4], 0
+                if Atlas[2] + Width > AtlasSize or Atlas[3] + Height > AtlasSize: Atlas = None
+            if len(Atlases) == 0 or Atlas == None:
+                Atlas = [0, 0, 0, 0, 0]
+                Atlases.append(Atlas)
+
+            Placements[Index] = (len(Atlases) - 1, Atlas[2], Atlas[3])
+            Atlas[2] += Width
+            Atlas[4] = max(Atlas[4], Height)
+            Atlas[0], Atlas[1] = max(Atlas[0], Atlas[2]), max(Atlas[1], Atlas[3] + Atlas[4])
+
+        return Placements, [2**math.ceil(math.log2(max(Atlas[0], Atlas[1]))) for Atlas in Atlases]
+
+    def PackAtlas(context, Objects):
+        #Moves the baked maps of cleaned models into shared atlases, at whole pixel offsets so the UVs stay pixel perfect.
+        #Every atlas gets one material that all its models use. Only models with the same baked maps share atlases, so every
+        #model keeps its own values for the maps it doesn't have. Returns the number of models & atlases
+        mytool = context.scene.vox_tool
+        Maps = ("Color", "Roughness", "Metallic", "Emission", "Transmission", "ORM")
+
+        # the models with baked maps, one per mesh
+        Models, Meshes = [], set()
+        for Obj in Objects:
+            if Obj.type != 'MESH' or Obj.data in Meshes or len(Obj.data.materials) == 0 or Obj.data.materials[0] == None: continue
+            if Obj.data.uv_layers.active == None or Obj.data.materials[0].node_tree == None: continue
+            Nodes = Obj.data.materials[0].node_tree.nodes
+            Images = {Map: Nodes[Map].image for Map in Maps if Map in Nodes and Nodes[Map].type == 'TEX_IMAGE' and Nodes[Map].image != None}
+            if len(Images) == 0 or any(Image.source == 'TILED' for Image in Images.values()): continue
+            Meshes.add(Obj.data)
+            Models.append((Obj, Images, tuple(max(Image.size[Axis] for Image in Images.values()) for Axis in (0, 1))))
+        if len(Models) == 0: return 0, 0
+
+        OldImages = {Image for Obj, Images, Size in Models for Image in Images.values()}
+        OldMaterials = {Obj.data.materials[0] for Obj, Images, Size in Models}
+
+        # models with the same maps, like ones with & without Emission or an ORM, go in atlases of their own
+        Groups = {}
+        for Model in Models: Groups.setdefault(tuple(sorted(Model[1])), []).append(Model)
+
+        AtlasCount = 0
+        for Group in Groups.values():
+            Placements, AtlasSizes = VoxMethods.ShelfPack([Size for Obj, Images, Size in Group], int(mytool.AtlasSize))
+            AtlasCount += len(AtlasSizes)
+
+            for AtlasIndex, AtlasSize in enumerate(AtlasSizes):
+                Members = [(Model, Placement) for Model, Placement in zip(Group, Placements) if Placement[0] == AtlasIndex]
+                AtlasName = Members[0][0][0].name + "_Atlas" + ("" if len(AtlasSizes) == 1 else "_" + str(AtlasIndex + 1))
+
+                Material = Members[0][0][0].data.materials[0].copy()
+                Material.name = AtlasName
+                for Map in Maps:
+                    Sources = [(Images[Map], Placement) for (Obj, Images, Size), Placement in Members if Map in Images]
+                    if len(Sources) == 0: continue
+
+                    Pixels = np.zeros((AtlasSize, AtlasSize, 4), dtype = np.float32)
+                    Pixels[:, :, 3] = 1
+                    for Image, (_, X, Y) in Sources:
+                        Source, IsLinear = VoxMethods.ReadImagePixels(Image)
+                        Pixels[Y:Y + Source.shape[0], X:X + Source.shape[1]] = Source
+
+                    First = Sources[0][0]
+                    Atlas = bpy.data.images.new(AtlasName + "_" + Map, AtlasSize, AtlasSize, alpha = mytool.AlphaBool if Map == "Color" else Map == "ORM", float_buffer = First.is_float)
+                    Atlas.colorspace_settings.name = First.colorspace_settings.name
+                    Atlas.alpha_mode = First.alpha_mode
+                    Atlas.pixels.foreach_set(Pixels.ravel())
+                    Atlas.pack()
+                    Material.node_tree.nodes[Map].image = Atlas
+
+                # UVs moved into the model's spot, whole pixels only
+                for (Obj, Images, (Width, Height)), (_, X, Y) in Members:
+                    UVLayer = Obj.data.uv_layers.active
+                    UVs = np.empty(len(UVLayer.data)*2, dtype = np.float64)
+                    UVLayer.data.foreach_get("uv", UVs)
+                    UVs = UVs.reshape(-1, 2)
+                    UVs[:, 0] = (UVs[:, 0]*Width + X) / AtlasSize
+                    UVs[:, 1] = (UVs[:, 1]*Height + Y) / AtlasSize
+                    UVLayer.data.foreach_set("uv", UVs.ravel())
+                    Obj.data.materials[0] = Material
+
+        # the per model maps & materials aren't needed anymore
+        for Material in OldMaterials:
+            if Material.users == 0: bpy.data.materials.remove(Material)
+        for Image in OldImages:
+            if Image.users == 0: bpy.data.images.remove(Image)
+
+        return len(Models), AtlasCount
+
+    def ExportModel(context, Objects, ExportDirectory, Format):
+        #Exports the given objects into one file named after the first object. Returns the file path.
+        #Triangulation is left to the exporters, which do it on the evaluated mesh, so the scene never gets any temporary duplicates.
+        mytool = context.scene.vox_tool
+
+        bpy.ops.object.select_all(action='DESELECT')
+        for Obj in Objects:
+            Obj.select_set(True)
+        bpy.context.view_layer.objects.active = Objects[0]
+
+        if Format == "OBJ":
+            TargetFile = os.path.join(ExportDirectory, Objects[0].name+'.obj')
+            bpy.ops.wm.obj_export(filepath=TargetFile, 
+                                    check_existing=True, 
+                                    forward_axis='NEGATIVE_Z', up_axis ='Y', 
+                                    filter_glob="*.obj;*.mtl", 
+                                    export_selected_objects =True, 
+                                    export_animation=False, 
+                                    apply_modifiers=True, 
+                                    export_normals=True, 
+                                    export_materials=True, 
+                                    export_triangulated_mesh=mytool.TriangulatedExport, 
+                                    export_vertex_groups=False, 
+                                    export_object_groups=False, 
+                                    global_scale=1, 
+                                    path_mode='AUTO')
+        elif Format == "GLB":
+            TargetFile = os.path.join(ExportDirectory, Objects[0].name+'.glb')
+            VoxMethods.WriteGLB(context, Objects, TargetFile)
+        else:
+            TargetFile = os.path.join(ExportDirectory, Objects[0].name+'.fbx')
+            bpy.ops.export_scene.fbx(filepath=str(TargetFile), use_selection=True, apply_scale_options = 'FBX_SCALE_ALL', use_mesh_modifiers = True, use_triangles = mytool.TriangulatedExport)
+
+        return TargetFile
+
+    @VoxProfiler.Stage("Export")
+    def ExportModels(context, Jobs, ExportDirectory, Format):
+        #Exports every job (a list of objects going in one file). Returns the number of failed jobs.
+        #Multiple jobs get spread across background workers if parallel exports are enabled.
+        mytool = context.scene.vox_tool
+
+        WorkerCount = min(mytool.WorkerCount, len(Jobs))
+        if mytool.ParallelExport and WorkerCount > 1:
+            WorkerJobs = [{"Objects": [Obj.name for Obj in Objects], "Directory": ExportDirectory, "Format": Format} for Objects in Jobs]
+            return VoxWorkers.RunJobs("export", WorkerJobs, WorkerCount, SceneCopy = True)
+
+        Failed = 0
+        for Objects in Jobs:
+            try: VoxMethods.ExportModel(context, Objects, ExportDirectory, Format)
+            except Exception as e:
+                print("Export Error",e)
+                Failed += 1
+        return Failed
+
+    def ReadImagePixels(Image):
+        #Copies the image's pixels in one go into a float32 (height, width, 4) array. Rows are bottom to top, like in Blender.
+        #Also tells if the values are linear & need an sRGB conversion before being written as 8 bit color.
+        Width, Height = Image.size
+        Channels = Image.channels
+
+        Buffer = np.empty(Width*Height*Channels, dtype = np.float32)
+        Image.pixels.foreach_get(Buffer)
+        Buffer = Buffer.reshape(Height, Width, Channels)
+
+        # Gray & RGB images get padded up to RGBA
+        if Channels == 1: Buffer = np.repeat(Buffer, 3, axis = 2)
+        if Buffer.shape[2] == 3: Buffer = np.concatenate((Buffer, np.ones((Height, Width, 1), dtype = np.float32)), axis = 2)
+
+        IsLinear = Image.is_float and Image.colorspace_settings.name not in ('Non-Color', 'Linear Rec.709', 'Linear')
+        return Buffer, IsLinear
+
+    def LinearToSRGB(Linear):
+        Linear = np.clip(Linear, 0.0, 1.0)
+        return np.where(Linear <= 0.0031308, Linear*12.92, 1.055*np.power(Linear, 1/2.4) - 0.055)
+
+    def EncodePNG(Pixels):
+        #Encodes a top to bottom (height, width, 4) uint8 array as PNG bytes.
+        #Images with 256 colors or less are written palette indexed, opaque images are written without the alpha channel.
+        Height, Width = Pixels.shape[:2]
+
+        def Chunk(Name, Data):
+            return struct.pack('>I', len(Data)) + Name + Data + struct.pack('>I', zlib.crc32(Name + Data) & 0xffffffff)
+
+        Opaque = bool(np.all(Pixels[:, :, 3] == 255))
+
+        PackedColors = np.ascontiguousarray(Pixels).view(np.uint32).reshape(-1)
+        UniqueColors, Indices = np.unique(PackedColors, return_inverse = True)
+
+        Extra = b''
+        if len(UniqueColors) <= 256:
+            ColorType = 3
+            Palette = UniqueColors.view(np.uint8).reshape(-1, 4)
+            Extra = Chunk(b'PLTE', Palette[:, :3].tobytes())
+            if not Opaque:
+                Alphas = Palette[:, 3]
+                LastTransparent = np.nonzero(Alphas != 255)[0][-1]
+                Extra += Chunk(b'tRNS', Alphas[:LastTransparent+1].tobytes())
+            Rows = Indices.astype(np.uint8).reshape(Height, Width)
+        elif Opaque:
+            ColorType = 2
+            Rows = Pixels[:, :, :3].reshape(Height, Width*3)
+        else:
+            ColorType = 6
+            Rows = Pixels.reshape(Height, Width*4)
+
+        # Every scanline starts with a filter byte, 0 = no filter
+        Scanlines = np.concatenate((np.zeros((Height, 1), dtype = np.uint8), Rows), axis = 1)
+
+        Header = struct.pack('>2I5B', Width, Height, 8, ColorType, 0, 0, 0)
+        return b'\x89PNG\r\n\x1a\n' + Chunk(b'IHDR', Header) + Extra + Chunk(b'IDAT', zlib.compress(Scanlines.tobytes(), 6)) + Chunk(b'IEND', b'')
+
+    def PixelsTo8Bit(Pixels, IsLinear = False):
+        #Converts the float pixels from ReadImagePixels to a top to bottom uint8 array
+        if IsLinear: Pixels = np.concatenate((VoxMethods.LinearToSRGB(Pixels[:, :, :3]), Pixels[:, :, 3:]), axis = 2)
+        return np.clip(Pixels*255.0 + 0.5, 0, 255).astype(np.uint8)[::-1]     # Blender stores the bottom row first
+
+    def WritePNG(FilePath, Pixels, IsLinear = False):
+        #Writes the float pixels from ReadImagePixels as a PNG. Safe to run off the main thread.
+        with open(FilePath, 'wb') as PNGFile:
+            PNGFile.write(VoxMethods.EncodePNG(VoxMethods.PixelsTo8Bit(Pixels, IsLinear)))
+        return FilePath
+
+    def WriteGLB(context, Objects, FilePath):
+        #Writes the objects & their baked CRMET textures into one binary glTF (.glb) file, textures embedded as PNGs.
+        #Mesh arrays come straight from the evaluated meshes through foreach_get & are streamed into the file's binary chunk as is.
+        mytool = context.scene.vox_tool
+        Depsgraph = context.evaluated_depsgraph_get()
+
+        Gltf = {"asset": {"version": "2.0", "generator": "Vox Cleaner V3"}, "scene": 0, "scenes": [{"nodes": []}],
+                "nodes": [], "meshes": [], "materials": [], "textures": [], "images": [], "samplers": [], "accessors": [], "bufferViews": [], "buffers": [], "extensionsUsed": []}
+        Blobs = []      # Pieces of the binary chunk, in order
+        Offset = 0
+        PendingImages = []      # [image index, future of the encoded PNG]
+        MaterialIndices = {}
+
+        def AddView(Data, Target = None):
+            nonlocal Offset
+            Length = memoryview(Data).nbytes
+            View = {"buffer": 0, "byteOffset": Offset, "byteLength": Length}
+            if Target != None: View["target"] = Target
+            Blobs.append(Data)
+            Padding = (-Length) % 4
+            if Padding > 0: Blobs.append(bytes(Padding))
+            Offset += Length + Padding
+            Gltf["bufferViews"].append(View)
+            return len(Gltf["bufferViews"]) - 1
+
+        def AddAccessor(Array, Type, Target):
+            ComponentTypes = {np.dtype(np.float32): 5126, np.dtype(np.uint16): 5123, np.dtype(np.uint32): 5125}
+            Array = np.ascontiguousarray(Array)
+            Accessor = {"bufferView": AddView(Array, Target), "componentType": ComponentTypes[Array.dtype], "count": len(Array), "type": Type}
+            if Type == "VEC3":
+                Accessor["min"] = Array.min(axis = 0).tolist()
+                Accessor["max"] = Array.max(axis = 0).tolist()
+            Gltf["accessors"].append(Accessor)
+            return len(Gltf["accessors"]) - 1
+
+        def AddTexture(Pixels, Nearest):
+            # PNGs are encoded on the TextureWriter pool while the meshes are being read
+            if len(Gltf["samplers"]) == 0:
+                Gltf["samplers"] = [{"magFilter": 9728, "minFilter": 9728}, {"magFilter": 9729, "minFilter": 9987}]
+            Gltf["images"].append({"mimeType": "image/png"})
+            PendingImages.append([len(Gltf["images"]) - 1, TextureWriter.Run(VoxMethods.EncodePNG, Pixels)])
+            Gltf["textures"].append({"source": len(Gltf["images"]) - 1, "sampler": 0 if Nearest else 1})
+            return {"index": len(Gltf["textures"]) - 1}
+
+        def UseExtension(Name):
+            if Name not in Gltf["extensionsUsed"]: Gltf["extensionsUsed"].append(Name)
+
+        def AddMaterial(Material):
+            if Material.name in MaterialIndices: return MaterialIndices[Material.name]
+
+            Nodes = Material.node_tree.nodes if Material.use_nodes else {}
+
+            def MapPixels(MapKey, Export):
+                Node = Nodes.get(MapKey)
+                # only the first tile of a UDIM image could be read, with the UVs wrapping over it
+                if Export and Node != None and Node.type == 'TEX_IMAGE' and Node.image != None and Node.image.source == 'TILED':
+                    raise RuntimeError(Material.name + " has UDIM textures, which a GLB can't hold. Export it as OBJ or FBX")
+                if Export and Node != None and Node.type == 'TEX_IMAGE' and Node.image != None:
+                    return VoxMethods.PixelsTo8Bit(*VoxMethods.ReadImagePixels(Node.image)), Node.interpolation == 'Closest'
+
+                # maps packed in an ORM image, there if their channel's wired in
+                Node, Channel = Nodes.get("ORM"), StaticData.ORMChannels.get(MapKey)
+                if Export and Channel != None and Node != None and Node.image != None and "ORMSplit" in Nodes:
+                    if (Nodes["ORMSplit"].outputs[Channel].is_linked if Channel < 3 else Node.outputs[1].is_linked):
+                        Packed = VoxMethods.PixelsTo8Bit(*VoxMethods.ReadImagePixels(Node.image))
+                        Gray = np.repeat(Packed[:, :, Channel:Channel + 1], 4, axis = 2)
+                        Gray[:, :, 3] = 255
+                        return Gray, Node.interpolation == 'Closest'
+                return None, True
+
+            Color, ColorNearest = MapPixels("Color", mytool.ExportColor)
+            Roughness, RoughnessNearest = MapPixels("Roughness", mytool.ExportRoughness)
+            Metallic, MetallicNearest = MapPixels("Metallic", mytool.ExportMetallic)
+            Emission, EmissionNearest = MapPixels("Emission", mytool.ExportEmission)
+            Transmission, TransmissionNearest = MapPixels("Transmission", mytool.ExportTransmission)
+
+            PBR = {"baseColorFactor": [1.0, 1.0, 1.0, 1.0], "metallicFactor": 0.0, "roughnessFactor": 0.5}
+            GltfMaterial = {"name": Material.name, "pbrMetallicRoughness": PBR}
+
+            if Color is not None:
+                PBR["baseColorTexture"] = AddTexture(Color, ColorNearest)
+                if mytool.AlphaBool: GltfMaterial["alphaMode"] = "BLEND"
+
+            # glTF wants roughness in G & metallic in B of a single texture
+            if Roughness is not None or Metallic is not None:
+                Size = (Roughness if Roughness is not None else Metallic).shape[:2]
+                Packed = np.full(Size + (4,), 255, dtype = np.uint8)
+                Packed[:, :, 1] = Roughness[:, :, 0] if Roughness is not None else 128
+                Packed[:, :, 2] = Metallic[:, :, 0] if Metallic is not None else 0
+                PBR["metallicRoughnessTexture"] = AddTexture(Packed, RoughnessNearest and MetallicNearest)
+                PBR["metallicFactor"] = 1.0
+                PBR["roughnessFactor"] = 1.0
+
+            # Emission in Vox Cleaner materials is the color masked by the emission map
+            if Emission is not None:
+                Emissive = Emission.copy()
+                if Color is not None and Color.shape == Emission.shape:
+                    Emissive[:, :, :3] = (Color[:, :, :3].astype(np.uint16) * Emission[:, :, :1] // 255).astype(np.uint8)
+                Emissive[:, :, 3] = 255
+                GltfMaterial["emissiveTexture"] = AddTexture(Emissive, EmissionNearest)
+                GltfMaterial["emissiveFactor"] = [1.0, 1.0, 1.0]
+
+                Multiplier = Nodes.get("EmissionMultiplier")
+                Strength = Multiplier.inputs[1].default_value if Multiplier != None else mytool.EmitStrength
+                if Strength != 1.0:
+                    UseExtension("KHR_materials_emissive_strength")
+                    GltfMaterial.setdefault("extensions", {})["KHR_materials_emissive_strength"] = {"emissiveStrength": Strength}
+
+            if Transmission is not None:
+                UseExtension("KHR_materials_transmission")
+                GltfMaterial.setdefault("extensions", {})["KHR_materials_transmission"] = {"transmissionFactor": 1.0, "transmissionTexture": AddTexture(Transmission, TransmissionNearest)}
+
+            Gltf["materials"].append(GltfMaterial)
+            MaterialIndices[Material.name] = len(Gltf["materials"]) - 1
+            return MaterialIndices[Material.name]
+
+        for Obj in Objects:
+            # Blender is Z up, glTF is Y up
+            Location, Rotation, Scale = Obj.matrix_world.decompose()
+            Node = {"name": Obj.name, "translation": [Location.x, Location.z, -Location.y], "rotation": [Rotation.x, Rotation.z, -Rotation.y, Rotation.w], "scale": [Scale.x, Scale.z, Scale.y]}
+            Gltf["nodes"].append(Node)
+            Gltf["scenes"][0]["nodes"].append(len(Gltf["nodes"]) - 1)
+
+            if Obj.type != 'MESH': continue
+
+            EvaluatedObj = Obj.evaluated_get(Depsgraph)
+            Mesh = EvaluatedObj.to_mesh()
+            try:
+                Mesh.calc_loop_triangles()
+                if len(Mesh.loop_triangles) == 0: continue
+
+                TriangleLoops = np.empty(len(Mesh.loop_triangles)*3, dtype = np.int32)
+                Mesh.loop_triangles.foreach_get("loops", TriangleLoops)
+
+                LoopVerts = np.empty(len(Mesh.loops), dtype = np.int32)
+                Mesh.loops.foreach_get("vertex_index", LoopVerts)
+
+                Positions = np.empty(len(Mesh.vertices)*3, dtype = np.float32)
+                Mesh.vertices.foreach_get("co", Positions)
+                Positions = Positions.reshape(-1, 3)[LoopVerts]
+
+                Normals = np.empty(len(Mesh.loops)*3, dtype = np.float32)
+                Mesh.corner_normals.foreach_get("vector", Normals)
+                Normals = Normals.reshape(-1, 3)
+
+                Corners = [Positions[:, [0, 2, 1]] * (1, 1, -1), Normals[:, [0, 2, 1]] * (1, 1, -1)]
+                if Mesh.uv_layers.active != None:
+                    UVs = np.empty(len(Mesh.loops)*2, dtype = np.float32)
+                    Mesh.uv_layers.active.data.foreach_get("uv", UVs)
+                    UVs = UVs.reshape(-1, 2)
+                    Corners.append(np.stack((UVs[:, 0], 1.0 - UVs[:, 1]), axis = 1))
+
+                # Corners sharing position, normal & uv become one glTF vertex
+                Vertices, Inverse = np.unique(np.concatenate(Corners, axis = 1).astype(np.float32), axis = 0, return_inverse = True)
+                Indices = Inverse.reshape(-1)[TriangleLoops].astype(np.uint16 if len(Vertices) < 65536 else np.uint32)
+
+                Attributes = {"POSITION": AddAccessor(Vertices[:, 0:3], "VEC3", 34962), "NORMAL": AddAccessor(Vertices[:, 3:6], "VEC3", 34962)}
+                if Vertices.shape[1] > 6: Attributes["TEXCOORD_0"] = AddAccessor(Vertices[:, 6:8], "VEC2", 34962)
+
+                Primitive = {"attributes": Attributes, "indices": AddAccessor(Indices, "SCALAR", 34963), "mode": 4}
+                if len(Obj.data.materials) > 0 and Obj.data.materials[0] != None:
+                    Primitive["material"] = AddMaterial(Obj.data.materials[0])
+
+                Gltf["meshes"].append({"name": Obj.data.name, "primitives": [Primitive]})
+                Node["mesh"] = len(Gltf["meshes"]) - 1
+            finally:
+                EvaluatedObj.to_mesh_clear()
+
+        for ImageIndex, Encoded in PendingImages:
+            Gltf["images"][ImageIndex]["bufferView"] = AddView(Encoded.result())
+
+        if Offset > 0: Gltf["buffers"] = [{"byteLength": Offset}]
+        Gltf = {Key: Value for Key, Value in Gltf.items() if Value != []}
+
+        JsonChunk = json.dumps(Gltf, separators = (',', ':')).encode('utf-8')
+        JsonChunk += b' ' * ((-len(JsonChunk)) % 4)
+
+        with open(FilePath, 'wb') as GLBFile:
+            GLBFile.write(struct.pack('<4sII', b'glTF', 2, 12 + 8 + len(JsonChunk) + (8 + Offset if Offset > 0 else 0)))
+            GLBFile.write(struct.pack('<I4s', len(JsonChunk), b'JSON'))
+            GLBFile.write(JsonChunk)
+            if Offset > 0:
+                GLBFile.write(struct.pack('<I4s', Offset, b'BIN\x00'))
+                for Blob in Blobs:
+                    GLBFile.write(Blob)
+
+        return len(PendingImages)
+
+
+class TextureWriter:
+    #Thread pool for writing the exported textures. Encoding happens in worker threads while the main thread carries on with the mesh exports.
+    Pool = None
+    Pending = []
+
+    def Run(Function, *Args):
+        #Runs any function on the pool, returns it's future
+        if TextureWriter.Pool is None:
+            TextureWriter.Pool = ThreadPoolExecutor(max_workers = os.cpu_count() or 4, thread_name_prefix = "VoxTextureWriter")
+        return TextureWriter.Pool.submit(Function, *Args)
+
+    def Submit(FilePath, Pixels, IsLinear = False):
+        TextureWriter.Pending.append(TextureWriter.Run(VoxMethods.WritePNG, FilePath, Pixels, IsLinear))
+
+    def Wait():
+        #Blocks until every submitted texture is written. Returns the number of textures that failed.
+        Failed = 0
+        for Job in TextureWriter.Pending:
+            try: Job.result()
+            except Exception as e:
+                print("Texture Export Error",e)
+                Failed += 1
+        TextureWriter.Pending = []
+        return Failed
+
+    def Shutdown():
+        if TextureWriter.Pool is not None:
+            TextureWriter.Wait()
+            TextureWriter.Pool.shutdown(wait = True)
+            TextureWriter.Pool = None
+
+
+class VoxWorkers:
+    #Runs Vox Cleaner tasks in background Blender processes (blender --background), so the heavy work can be spread across cores.
+    #Each worker gets a task name & a JSON file with its share of the jobs. The tasks it understands are listed in Main().
+
+    # Loads the add-on in the worker (from the installed extension if possible, else straight from this file) & hands over to VoxWorkers.Main
+    Bootstrap = "\n".join([
+        "import sys, importlib, importlib.util, bpy",
+        "try: Module = importlib.import_module(%r)",
+        "except ImportError:",
+        "    Spec = importlib.util.spec_from_file_location('vox_cleaner_worker', %r)",
+        "    Module = importlib.util.module_from_spec(Spec)",
+        "    sys.modules['vox_cleaner_worker'] = Module",
+        "    Spec.loader.exec_module(Module)",
+        "if not hasattr(bpy.types.Scene, 'vox_tool'): Module.register()",
+        "sys.exit(Module.VoxWorkers.Main(sys.argv[sys.argv.index('--')+1:]))"])
+
+    def Command(Task, JobFile, BlendFile = None):
+        Command = [bpy.app.binary_path, "--background"]
+        if BlendFile != None: Command.append(BlendFile)
+        Command += ["--python-exit-code", "1", "--python-expr", VoxWorkers.Bootstrap % (__name__, os.path.abspath(__file__)), "--", Task, JobFile]
+        return Command
+
+    def RunJobs(Task, Jobs, WorkerCount, SceneCopy = False):
+        #Splits the jobs into one shard per worker, runs them all at once & waits. Returns the number of jobs in shards that failed.
+        #With SceneCopy, the workers open a copy of the current file (saved as is, the open file isn't touched).
+        WorkDirectory = tempfile.mkdtemp(prefix = "VoxCleaner_")
+        try:
+            BlendFile = None
+            if SceneCopy:
+                BlendFile = os.path.join(WorkDirectory, "Scene.blend")
+                bpy.ops.wm.save_as_mainfile(filepath = BlendFile, copy = True, check_existing = False)
+
+            Processes = []
+            for Index in range(WorkerCount):
+                Shard = Jobs[Index::WorkerCount]
+                if len(Shard) == 0: continue
+
+                JobFile = os.path.join(WorkDirectory, Task+"_"+str(Index)+".json")
+                with open(JobFile, 'w') as File:
+                    json.dump(Shard, File)
+                Processes.append((subprocess.Popen(VoxWorkers.Command(Task, JobFile, BlendFile)), Shard))
+
+            Failed = 0
+            for Process, Shard in Processes:
+                if Process.wait() != 0:
+                    Failed += len(Shard)
+            return Failed
+        finally:
+            shutil.rmtree(WorkDirectory, ignore_errors = True)
+
+    def Main(Argv):
+        #Entry point inside a worker. Returns the exit code for the process.
+        Task, JobFile = Argv[0], Argv[1]
+        with open(JobFile) as File:
+            Jobs = json.load(File)
+
+        if Task == "export": return VoxWorkers.ExportTask(Jobs)
+        if Task == "clean": return VoxWorkers.CleanTask(Jobs)
+        if Task == "watch": return VoxWatcher.Run(bpy.context, Jobs["Folder"], Jobs["Output"], Jobs["Formats"])
+
+        print("Unknown Vox Cleaner worker task:", Task)
+        return 1
+
+    def ExportTask(Jobs):
+        Failed = 0
+        for Job in Jobs:
+            try:
+                Objects = [bpy.data.objects[Name] for Name in Job["Objects"]]
+                print("Exported", VoxMethods.ExportModel(bpy.context, Objects, Job["Directory"], Job["Format"]))
+            except Exception as e:
+                print("Export Error",Job["Objects"],e)
+                Failed += 1
+        return 1 if Failed > 0 else 0
+
+    def CleanTask(Config):
+        #Batch worker - keeps taking files from the farm's queue until it's empty
+        mytool = bpy.context.scene.vox_tool
+        VoxMethods.SettingsFromDict(mytool, Config["Settings"])
+        mytool.ParallelExport = False
+
+        # share the cores with the other workers
+        bpy.context.scene.render.threads_mode = 'FIXED'
+        bpy.context.scene.render.threads = Config["Threads"]
+
+        while True:
+            Job = VoxFarm.Claim(Config["Farm"])
+            if Job == None: return 0
+
+            print("Cleaning", Job["Input"])
+            try:
+                Result = VoxMethods.ProcessFile(bpy.context, Job["Input"], Job["Output"], Job["Formats"])
+                VoxFarm.Complete(Config["Farm"], Job, "Done", Result)
+            except Exception as e:
+                traceback.print_exc()
+                VoxFarm.Complete(Config["Farm"], Job, "Failed", {"Error": str(e)})
+
+            VoxMethods.ResetScene()
+
+
+class VoxWatcher:
+    #Watches a folder & runs every new or changed .vox/.blend file through ProcessFile, in a single warm background Blender,
+    #with the settings saved in the .blend it was started with. From the command line:
+    #   blender --background settings.blend --python-expr "import bpy; bpy.ops.voxcleaner.watchfolder()"
+    #What has been processed is kept in watch_state.json in the output folder, so a restarted watcher only picks up what changed.
+    #A file is marked Processing there before it's cleaned, one that takes the watcher down with it is failed on the restart,
+    #instead of being picked up again until it's changed.
+    Process = None          # watcher started from the UI
+    WorkDirectory = None
+
+    Interval = 1.0          # seconds between scans
+    SettleTime = 2.0        # a file has to stay the same this long before it's picked up, so half copied files are left alone
+
+    def Run(context, Folder, Output, Formats):
+        mytool = context.scene.vox_tool
+        mytool.ParallelExport = False
+
+        os.makedirs(Output, exist_ok = True)
+        StateFile = os.path.join(Output, "watch_state.json")
+        State = {}
+        if os.path.exists(StateFile):
+            with open(StateFile) as File: State = json.load(File)
+
+        # whatever was being cleaned when the last watcher died, killed it
+        Crashed = [Entry for Entry in State.values() if Entry.get("Status") == "Processing"]
+        for Entry in Crashed:
+            Entry["Status"] = "Failed"
+            Entry["Error"] = "The watcher crashed while cleaning it"
+        if len(Crashed) > 0: VoxFarm.WriteJob(StateFile, State)
+
+        print("Watching", Folder, "->", Output)
+        Changing = {}   # [path] = (signature, time it was first seen like that)
+        while True:
+            Now = time.time()
+            for Root, Folders, Files in os.walk(Folder):
+                for FileName in sorted(Files):
+                    if not FileName.lower().endswith(VoxFarm.Extensions): continue
+                    Input = os.path.join(Root, FileName)
+
+                    try: Stat = os.stat(Input)
+                    except OSError: continue
+                    Signature = [Stat.st_size, Stat.st_mtime_ns]
+                    if State.get(Input, {}).get("Signature") == Signature: continue
+
+                    # wait until the file stops changing
+                    if Input not in Changing or Changing[Input][0] != Signature:
+                        Changing[Input] = (Signature, Now)
+                        continue
+                    if Now - Changing[Input][1] < VoxWatcher.SettleTime: continue
+                    del Changing[Input]
+
+                    Entry = State.setdefault(Input, {})
+                    Entry["Signature"] = Signature
+
+                    # only touched, nothing to do
+                    with open(Input, 'rb') as File: Digest = hashlib.sha1(File.read()).hexdigest()
+                    if Entry.get("SHA1") == Digest:
+                        VoxFarm.WriteJob(StateFile, State)
+                        continue
+                    Entry["SHA1"] = Digest
+
+                    # written before the clean, so a file that crashes the watcher isn't retried forever
+                    Entry["Status"] = "Processing"
+                    VoxFarm.WriteJob(StateFile, State)
+
+                    print("Cleaning", Input)
+                    try:
+                        Entry.update(VoxMethods.ProcessFile(context, Input, os.path.join(Output, os.path.splitext(os.path.relpath(Input, Folder))[0]), Formats))
+                        Entry["Status"] = "Done"
+                        Entry.pop("Error", None)
+                    except Exception as e:
+                        traceback.print_exc()
+                        Entry["Status"] = "Failed"
+                        Entry["Error"] = str(e)
+                    Entry["Processed"] = time.strftime("%Y-%m-%d %H:%M:%S")
+
+                    VoxMethods.ResetScene()
+                    VoxFarm.WriteJob(StateFile, State)
+
+            time.sleep(VoxWatcher.Interval)
+
+    def Running():
+        return VoxWatcher.Process != None and VoxWatcher.Process.poll() == None
+
+    def Stop():
+        if VoxWatcher.Running():
+            VoxWatcher.Process.terminate()
+            VoxWatcher.Process.wait()
+        VoxWatcher.Process = None
+        if VoxWatcher.WorkDirectory != None: shutil.rmtree(VoxWatcher.WorkDirectory, ignore_errors = True)
+        VoxWatcher.WorkDirectory = None
+
+
+class VoxFarm:
+    #Batch cleaning of a folder of .vox & .blend files on background workers, through a job queue made of files:
+    #queue/ -> running/ (claimed by a worker with an atomic rename) -> done/ or failed/
+    #A worker that crashes leaves its job in running/. That job goes back into the queue, until it's out of retries.
+    Directory = None    # Farm directory while a batch is running
+    InputFolder = None
+    OutputFolder = None
+    WorkerCount = 1
+    Retries = 0
+    Processes = []
+    Started = None
+    Finished = 0        # jobs in done/ & failed/ the last time it was polled
+    StartFailures = 0   # workers in a row that exited without getting through a job
+
+    Total = 0
+    Done = 0
+    Failed = 0
+
+    Extensions = (".vox", ".blend")
+
+    def Start(context, InputFolder, OutputFolder, Formats, WorkerCount, Retries):
+        #Queues every file in InputFolder (& its sub folders) & starts the workers. Returns the number of files.
+        mytool = context.scene.vox_tool
+
+        Inputs = []
+        for Root, Folders, Files in os.walk(InputFolder):
+            Folders.sort()
+            for File in sorted(Files):
+                if File.lower().endswith(VoxFarm.Extensions): Inputs.append(os.path.join(Root, File))
+        if len(Inputs) == 0: return 0
+
+        VoxFarm.Directory = tempfile.mkdtemp(prefix = "VoxFarm_")
+        for Folder in ("queue", "running", "done", "failed"):
+            os.makedirs(os.path.join(VoxFarm.Directory, Folder))
+
+        # every file gets its own output folder, mirroring the input folders
+        for Index, Input in enumerate(Inputs):
+            Output = os.path.join(OutputFolder, os.path.splitext(os.path.relpath(Input, InputFolder))[0])
+            Job = {"ID": str(Index).zfill(6), "Input": Input, "Output": Output, "Formats": sorted(Formats), "Attempts": 0}
+            VoxFarm.WriteJob(os.path.join(VoxFarm.Directory, "queue", Job["ID"] + ".json"), Job)
+
+        Config = {"Farm": VoxFarm.Directory, "Settings": VoxMethods.SettingsToDict(mytool), "Threads": max(1, (os.cpu_count() or 1)//WorkerCount)}
+        VoxFarm.WriteJob(os.path.join(VoxFarm.Directory, "config.json"), Config)
+
+        VoxFarm.InputFolder, VoxFarm.OutputFolder = InputFolder, OutputFolder
+        VoxFarm.WorkerCount, VoxFarm.Retries = WorkerCount, Retries
+        VoxFarm.Processes = []
+        VoxFarm.Started = time.strftime("%Y-%m-%d %H:%M:%S")
+        VoxFarm.Finished, VoxFarm.StartFailures = 0, 0
+        VoxFarm.Total, VoxFarm.Done, VoxFarm.Failed = len(Inputs), 0, 0
+
+        VoxFarm.Poll()
+        return len(Inputs)
+
+    def Poll():
+        #Requeues the jobs of crashed workers, keeps enough workers running & counts the finished jobs.
+        #Workers that keep exiting before they get to a job, like when the add-on can't load in them, fail the rest of the queue.
+        #Returns True while the batch is running.
+        Farm = VoxFarm.Directory
+        if Farm == None: return False
+
+        def QueuedJobs():
+            return [Name for Name in os.listdir(os.path.join(Farm, "queue")) if Name.endswith(".json")]
+
+        Finished = len(os.listdir(os.path.join(Farm, "done"))) + len(os.listdir(os.path.join(Farm, "failed")))
+        for Process in list(VoxFarm.Processes):
+            if Process.poll() == None: continue
+            VoxFarm.Processes.remove(Process)
+            Claimed = False
+
+            # whatever the worker was still on when it exited, it crashed on
+            for Name in os.listdir(os.path.join(Farm, "running")):
+                ID, PID = Name.split(".")[:2]
+                if int(PID) != Process.pid: continue
+                Claimed = True
+
+                RunningFile = os.path.join(Farm, "running", Name)
+                with open(RunningFile) as File: Job = json.load(File)
+                Job["Attempts"] += 1
+                Job["Error"] = "Worker crashed (exit code " + str(Process.returncode) + ")"
+
+                Target = "queue" if Job["Attempts"] <= VoxFarm.Retries else "failed"
+                if Target == "failed": Job["Status"] = "Failed"
+                VoxFarm.WriteJob(os.path.join(Farm, Target, ID + ".json"), Job)
+                os.remove(RunningFile)
+                print("Worker crashed on", Job["Input"], "- retrying" if Target == "queue" else "- out of retries")
+
+            # a worker leaves with jobs still queued only if it never got going
+            if not Claimed and Finished == VoxFarm.Finished and len(QueuedJobs()) > 0:
+                VoxFarm.StartFailures += 1
+                print("Worker exited without taking a job (exit code " + str(Process.returncode) + ")")
+
+        if Finished != VoxFarm.Finished: VoxFarm.Finished, VoxFarm.StartFailures = Finished, 0
+
+        if VoxFarm.StartFailures > VoxFarm.Retries:
+            for Name in QueuedJobs():
+                with open(os.path.join(Farm, "queue", Name)) as File: Job = json.load(File)
+                Job["Status"], Job["Error"] = "Failed", "Workers failed to start"
+                VoxFarm.WriteJob(os.path.join(Farm, "failed", Name), Job)
+                os.remove(os.path.join(Farm, "queue", Name))
+            print("Workers failed to start", VoxFarm.StartFailures, "times in a row, stopping the batch")
+
+        # a worker for every queued job, up to the worker count
+        Queued = len(QueuedJobs())
+        while Queued > len(VoxFarm.Processes) and len(VoxFarm.Processes) < VoxFarm.WorkerCount:
+            VoxFarm.Processes.append(subprocess.Popen(VoxWorkers.Command("clean", os.path.join(Farm, "config.json"))))
+
+        VoxFarm.Done = len(os.listdir(os.path.join(Farm, "done")))
+        VoxFarm.Failed = len(os.listdir(os.path.join(Farm, "failed")))
+        return len(VoxFarm.Processes) > 0 or Queued > 0
+
+    def Claim(Farm):
+        #Worker side. Takes the next job from the queue, None if it's empty
+        Queue = os.path.join(Farm, "queue")
+        for Name in sorted(os.listdir(Queue)):
+            if not Name.endswith(".json"): continue     # a requeue still being written
+            RunningFile = os.path.join(Farm, "running", Name[:-5] + "." + str(os.getpid()) + ".json")
+            try: os.rename(os.path.join(Queue, Name), RunningFile)
+            except OSError: continue    # another worker got it first
+
+            with open(RunningFile) as File: Job = json.load(File)
+            Job["RunningFile"] = RunningFile
+            return Job
+        return None
+
+    def Complete(Farm, Job, Status, Result):
+        #Worker side. Moves the job to done/ or failed/ with its results
+        RunningFile = Job.pop("RunningFile")
+        Job.pop("Error", None)    # from an earlier crash
+        Job.update(Result)
+        Job["Status"] = Status
+        Job["Attempts"] += 1
+        VoxFarm.WriteJob(os.path.join(Farm, Status.lower(), Job["ID"] + ".json"), Job)
+        os.remove(RunningFile)
+
+    def WriteJob(FilePath, Job):
+        # write & rename, so nobody ever reads half a file
+        with open(FilePath + ".tmp", 'w') as File: json.dump(Job, File, indent = 1)
+        os.replace(FilePath + ".tmp", FilePath)
+
+    def Finish(Cancelled = False):
+        #Stops the workers if needed, merges all the jobs into manifest.json in the output folder & clears the farm.
+        #Returns the manifest's path
+        Farm = VoxFarm.Directory
+        for Process in VoxFarm.Processes: Process.terminate()
+        for Process in VoxFarm.Processes: Process.wait()
+        VoxFarm.Processes = []
+
+        Jobs = []
+        for Folder in ("done", "failed", "running", "queue"):
+            for Name in sorted(os.listdir(os.path.join(Farm, Folder))):
+                if not Name.endswith(".json"): continue
+                with open(os.path.join(Farm, Folder, Name)) as File: Job = json.load(File)
+                if Folder in ("running", "queue"): Job["Status"] = "Cancelled"
+                Jobs.append(Job)
+        Jobs.sort(key = lambda Job: Job["ID"])
+
+        Manifest = {"Input": VoxFarm.InputFolder, "Output": VoxFarm.OutputFolder, "Started": VoxFarm.Started, "Finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "Workers": VoxFarm.WorkerCount, "Cancelled": Cancelled, "Total": len(Jobs),
+                    "Done": sum(Job["Status"] == "Done" for Job in Jobs), "Failed": sum(Job["Status"] == "Failed" for Job in Jobs), "Jobs": Jobs}
+
+        with open(os.path.join(Farm, "config.json")) as File: Manifest["Settings"] = json.load(File)["Settings"]
+
+        ManifestFile = os.path.join(VoxFarm.OutputFolder, "manifest.json")
+        os.makedirs(VoxFarm.OutputFolder, exist_ok = True)
+        VoxFarm.WriteJob(ManifestFile, Manifest)
+
+        shutil.rmtree(Farm, ignore_errors = True)
+        VoxFarm.Directory = None
+        return ManifestFile
+
+
+class VoxCache:
+    #Cleaned models on disk, one .npz per model in the extension's user folder, with the cleaned mesh, its UVs & the baked maps.
+    #Keyed by a hash of the model's mesh, color attributes & materials, plus the clean settings. Files get touched whenever they're used,
+    #& the ones unused the longest are removed once the cache is bigger than CacheSize. Safe to share between background workers.
+    Version = 1         # bump when cleaning changes, so older results aren't used
+    Hits = 0
+    Misses = 0
+
+    Settings = ("ResolutionSet", "TextureScaleMultiplier", "MaxTileSize", "MemoryBudget", "BudgetAction", "BakeDevice", "MCNVResolution", "NVDecimation", "UVMethod", "RotateUV", "CollapseIslands", "ShareIslands", "CleanGeo", "BakeTex", "BaseColor", "AlphaBool")
+
+    def Folder():
+        try: return bpy.utils.extension_path_user(__package__, path = "CleanCache", create = True)
+        except Exception:
+            # installed as a legacy add-on
+            Folder = os.path.join(tempfile.gettempdir(), "VoxCleanerCache")
+            os.makedirs(Folder, exist_ok = True)
+            return Folder
+
+    def GetArray(Collection, Attribute, Size, DataType):
+        Array = np.empty(len(Collection)*Size, dtype = DataType)
+        Collection.foreach_get(Attribute, Array)
+        return Array
+
+    def Plain(Value):
+        # JSON friendly version of Blender's vectors, colors & the like
+        if Value is None or isinstance(Value, (str, int, float, bool)): return Value
+        try: return [round(Item, 6) for Item in Value]
+        except TypeError: return str(Value)
+
+    def MaterialSignature(Material):
+        #Everything about a material that changes what gets baked from it
+        if Material is None: return None
+        if Material.node_tree is None: return [Material.name, VoxCache.Plain(Material.diffuse_color)]
+
+        Nodes = []
+        for Node in Material.node_tree.nodes:
+            Image = getattr(Node, "image", None)
+            if Image is not None: Image = [Image.name, list(Image.size), Image.filepath, Image.packed_file.size if Image.packed_file else None]
+            Inputs = [VoxCache.Plain(Input.default_value) for Input in Node.inputs if hasattr(Input, "default_value")]
+            Nodes.append([Node.bl_idname, Node.name, Node.mute, getattr(Node, "layer_name", None), Image, Inputs])
+
+        Links = [[Link.from_node.name, Link.from_socket.identifier, Link.to_node.name, Link.to_socket.identifier] for Link in Material.node_tree.links]
+        return [Material.name, Nodes, Links]
+
+    def Key(context, Obj):
+        mytool = context.scene.vox_tool
+        Mesh = Obj.data
+        Hash = hashlib.sha1()
+
+        Hash.update(VoxCache.GetArray(Mesh.vertices, "co", 3, np.float32).tobytes())
+        Hash.update(VoxCache.GetArray(Mesh.polygons, "loop_start", 1, np.int32).tobytes())
+        Hash.update(VoxCache.GetArray(Mesh.loops, "vertex_index", 1, np.int32).tobytes())
+        for Attribute in Mesh.color_attributes:
+            Hash.update((Attribute.name + Attribute.domain + Attribute.data_type).encode())
+            Hash.update(VoxCache.GetArray(Attribute.data, "color", 4, np.float32).tobytes())
+
+        # moving the model doesn't change the clean, rotating or scaling it might
+        Info = {"Version": VoxCache.Version, "Blender": bpy.app.version_string,
+                "Transform": [VoxCache.Plain(Row) for Row in Obj.matrix_world.to_3x3()],
+                "Materials": [VoxCache.MaterialSignature(Material) for Material in Mesh.materials],
+                "Settings": {Name: getattr(mytool, Name) for Name in VoxCache.Settings}}
+        Hash.update(json.dumps(Info, default = VoxCache.Plain).encode())
+        return Hash.hexdigest()
+
+    def Load(Key):
+        #The cached clean of Key, None if there's none
+        FilePath = os.path.join(VoxCache.Folder(), Key + ".npz")
+        try:
+            with np.load(FilePath) as Data: Cached = {Name: Data[Name] for Name in Data.files}
+            os.utime(FilePath)    # most recently used
+        except Exception:
+            VoxCache.Misses += 1
+            return None
+
+        Cached["Meta"] = json.loads(str(Cached["Meta"]))
+        VoxCache.Hits += 1
+        return Cached
+
+    @VoxProfiler.Stage("CacheStore")
+    def Store(context, Key):
+        #Saves the cleaned MainObj, after the bake
+        mytool = context.scene.vox_tool
+        Mesh = FlowData.MainObj.data
+
+        Arrays = {"Vertices": VoxCache.GetArray(Mesh.vertices, "co", 3, np.float32),
+                  "LoopStarts": VoxCache.GetArray(Mesh.polygons, "loop_start", 1, np.int32),
+                  "LoopVertices": VoxCache.GetArray(Mesh.loops, "vertex_index", 1, np.int32),
+                  "Smooth": VoxCache.GetArray(Mesh.polygons, "use_smooth", 1, bool)}
+
+        UVName = None
+        if Mesh.uv_layers.active != None:
+            UVName = Mesh.uv_layers.active.name
+            Arrays["UVs"] = VoxCache.GetArray(Mesh.uv_layers.active.data, "uv", 2, np.float32)
+
+        Maps = []
+        if mytool.BakeTex and len(Mesh.materials) > 0 and Mesh.materials[0] is not None:
+            Nodes = Mesh.materials[0].node_tree.nodes
+            for Map in FlowData.BakeList:
+                Node = Nodes.get(Map)
+                if Node is None or Node.image is None: continue
+                Arrays["Map" + Map] = np.clip(np.round(VoxMethods.ReadImagePixels(Node.image)[0]*255), 0, 255).astype(np.uint8)
+                Maps.append(Map)
+
+        Meta = {"ModelType": FlowData.ModelType, "FinalTextureSize": FlowData.FinalTextureSize, "UVName": UVName, "Maps": Maps}
+        Arrays["Meta"] = np.array(json.dumps(Meta))
+
+        # write & rename, so other workers never load half a file
+        FilePath = os.path.join(VoxCache.Folder(), Key + ".npz")
+        TempPath = FilePath + "." + str(os.getpid()) + ".tmp"
+        try:
+            with open(TempPath, 'wb') as File: np.savez_compressed(File, **Arrays)
+            os.replace(TempPath, FilePath)
+        except OSError as e:
+            print("Cache Error", e)
+            if os.path.exists(TempPath): os.remove(TempPath)
+
+        VoxCache.Trim(mytool.CacheSize*2**20)
+
+    @VoxProfiler.Stage("CacheRestore")
+    def Restore(context, Cached):
+        #Does to the active model what the Lazy Clean stages would have, with the cleaned mesh & maps from the cache
+        mytool = context.scene.vox_tool
+        Meta = Cached["Meta"]
+
+        FlowData.ModelType = Meta["ModelType"]
+        FlowData.VertexCountInitialX = len(bpy.context.active_object.data.vertices)
+        VoxMethods.ModelFixing(context)
+        if mytool.BakeTex: VoxMethods.MaterialSetUp(context)
+        else: FlowData.MainObj.data.materials.clear()
+
+        # the cleaned mesh takes the model's mesh's place
+        OldMesh = FlowData.MainObj.data
+        Mesh = VoxMethods.MeshFromArrays(OldMesh.name, Cached["Vertices"].reshape(-1, 3), Cached["LoopStarts"], Cached["LoopVertices"], Cached["Smooth"])
+
+        if Meta["UVName"] != None: Mesh.uv_layers.new(name = Meta["UVName"]).data.foreach_set("uv", Cached["UVs"])
+        for Material in OldMesh.materials: Mesh.materials.append(Material)
+
+        FlowData.MainObj.data = Mesh
+        if OldMesh.users == 0:
+            MeshName = OldMesh.name
+            bpy.data.meshes.remove(OldMesh)
+            Mesh.name = MeshName
+
+        # the baked maps
+        if mytool.BakeTex and len(Mesh.materials) > 0:
+            Nodes = Mesh.materials[0].node_tree.nodes
+            for Map in Meta["Maps"]:
+                Node = Nodes.get(Map)
+                if Node is None: continue
+                Pixels = Cached["Map" + Map]
+                Image = bpy.data.images.new(FlowData.MainObj.name + "_" + Map, Pixels.shape[1], Pixels.shape[0], alpha = mytool.AlphaBool if Map == "Color" else False)
+                if Map != "Color": Image.colorspace_settings.name = 'Non-Color'
+                Image.pixels.foreach_set((Pixels.astype(np.float32)/255).ravel())
+                Image.pack()
+                Node.image = Image
+            if mytool.PackORM: VoxMethods.PackORM(context)
+
+        FlowData.FinalTextureSize = Meta["FinalTextureSize"]
+        FlowData.VertexCountFinalX = len(Mesh.vertices)
+
+    def Entries():
+        # (last used, size, path) of every cached model
+        Folder = VoxCache.Folder()
+        Entries = []
+        for Name in os.listdir(Folder):
+            FilePath = os.path.join(Folder, Name)
+            try: Stat = os.stat(FilePath)
+            except OSError: continue    # removed by another worker
+            if Name.endswith(".npz"): Entries.append((Stat.st_mtime, Stat.st_size, FilePath))
+            elif Name.endswith(".tmp") and Stat.st_mtime < time.time() - 3600:
+                # left behind by a crashed worker
+                try: os.remove(FilePath)
+                except OSError: pass
+        return Entries
+
+    def Trim(Limit):
+        #Removes the least recently used models until the cache fits in Limit bytes
+        Entries = VoxCache.Entries()
+        Total = sum(Entry[1] for Entry in Entries)
+        for LastUsed, Size, FilePath in sorted(Entries):
+            if Total <= Limit: break
+            try: os.remove(FilePath)
+            except OSError: pass
+            Total -= Size
+
+    def Clear():
+        VoxCache.Trim(0)
+        VoxCache.Hits, VoxCache.Misses = 0, 0
+
 
 class ApplyVColors(bpy.types.Operator):
     """Apply the mesh's vertex colors as the base color.
@@ -2388,149 +4579,108 @@ class LazyClean(bpy.types.Operator):
 
     def execute(self, context):
         
-        mytool = context.scene.vox_tool
-        CleanStatus,StepStatus,ExportStatus = VoxMethods.MrChecker(context)
-        
-        if type(CleanStatus) == int:
-            pass
-        else:
-            self.report({'WARNING'}, CleanStatus)
-            return {'CANCELLED'}
+        Mode, ModelType = VoxMethods.LazyCleanCheck(self, context)
+        if Mode == None: return {'CANCELLED'}
 
+        # run all the stages in one go. A clean that can't go on raises a RuntimeError & gets rolled back
+        FlowData.CleanError = None
+        try:
+            for Progress, Stage in VoxMethods.LazyCleanSteps(self, context, Mode, ModelType): pass
+        except RuntimeError as e:
+            VoxMethods.RollBackClean(context)
+            FlowData.CleanError = str(e)
+            self.report({'WARNING'}, str(e) + ", models restored")
+            return {'CANCELLED'}
+        
+        return {'FINISHED'}
 
-        if CleanStatus > 1 & mytool.CommonUV == True:
-            
-            #Check for a mixed model set
-            ModelType = VoxMethods.MrModelTypeChecker(context.selected_objects)
-            if ModelType == "Mixed":
-                self.report({'WARNING'}, "Mixed model set, select only one type of models")
-                return {'CANCELLED'}
-            
-            # lazy Common UV
-            FlowData.CleanType = "Lazy"
-            FlowData.CommonUVObjects = [obj.name for obj in context.selected_objects]
-
-            # continue Common UV
-            FlowData.ModelType = ModelType
-            VoxMethods.JoinModels(context)
-            bpy.ops.object.mode_set(mode = 'EDIT')
-            bpy.ops.object.mode_set(mode = 'OBJECT')
-
-            # clean Selected Object ie Object Set 
-            VoxMethods.ModelFixing(context)
-
-            if mytool.BakeTex == True:
-                VoxMethods.MaterialSetUp(context)
-            
-            if FlowData.ModelType == "Voxel":
-                VoxMethods.UVProjection(context)
 
-                if mytool.CleanGeo == True:
-                    VoxMethods.GeometryCleanUp(context)
-                
-                VoxMethods.UVScaling(context)
-            else:
-                if mytool.CleanGeo == True:
-                    VoxMethods.GeometryCleanUp(context)
+class LazyCleanModal(bpy.types.Operator):
+    """Lazy Clean selected models in the background, a stage at a time.
+Blender stays usable in between the stages, not while a long one like a bake runs. Press Esc to cancel & get the models back"""
+    bl_idname = "voxcleaner.lazycleanmodal"
+    bl_label = "Easy Clean (Background)"
+    bl_options = {'UNDO'}
 
-                VoxMethods.UVProjection(context)
-                
-            #Get a vert count dammit
-            FlowData.VertexCountFinalX = len(FlowData.MainObj.data.vertices)
+    def invoke(self, context, event):
 
-            if mytool.BakeTex == True:
-                VoxMethods.TextureBake(context)
+        Mode, ModelType = VoxMethods.LazyCleanCheck(self, context)
+        if Mode == None: return {'CANCELLED'}
 
-            # Split both the objects
-            VoxMethods.ApplySplitToBothObjects(context)
+        self.Steps = VoxMethods.LazyCleanSteps(self, context, Mode, ModelType)
+        self.Selection = None
+        FlowData.BackgroundCleanStage = "Starting"
 
-            #Give out a feedback
-            PercentageCleaning = round(100-(FlowData.VertexCountFinalX*100/FlowData.VertexCountInitialX),1)
-            if FlowData.ModelType == "Voxel": stmnt = "Model Set cleaned! "+str(PercentageCleaning)+"% avg vertex reduction!"
-            else: stmnt = str(FlowData.ModelType)+" Model Set cleaned! "+str(PercentageCleaning)+"% avg vertex reduction!"
-            self.report({'INFO'}, stmnt)
-            
-            #Clean The Plate
-            VoxMethods.EndProcess(context)
-            
-            return {'FINISHED'}
+        WindowManager = context.window_manager
+        WindowManager.progress_begin(0, 100)
+        self.Timer = WindowManager.event_timer_add(StaticData.BackgroundCleanInterval, window = context.window)
+        WindowManager.modal_handler_add(self)
         
-    
-        else:
-            # solo clean
-
-            CleanPercentageArray = []
-            ModelTypeSet = set()
-            ObjArray = bpy.context.selected_objects
-            if len(ObjArray)==1:
-                
-                FlowData.CleanType = "Lazy"
-
-                # deselect everything
-                bpy.ops.object.select_all(action='DESELECT')
-                bpy.context.view_layer.objects.active = None
-                
-                #select ith obj
-                bpy.context.view_layer.objects.active = ObjArray[0]
-                ObjArray[0].select_set(True)
-                FlowData.ModelType = VoxMethods.MrModelTypeChecker(context.selected_objects)
-                
-                # clean Selected Object
-                VoxMethods.ModelFixing(context)
-                ModelTypeSet.add(FlowData.ModelType)
+        return {'RUNNING_MODAL'}
 
-                if mytool.BakeTex == True:
-                    print("Material Set Up")
-                    VoxMethods.MaterialSetUp(context)
-                
-                if FlowData.ModelType == "Voxel":
-                    VoxMethods.UVProjection(context)
+    def modal(self, context, event):
 
-                    if mytool.CleanGeo == True:
-                        VoxMethods.GeometryCleanUp(context)
-                    
-                    VoxMethods.UVScaling(context)
-                else:
-                    if mytool.CleanGeo == True:
-                        VoxMethods.GeometryCleanUp(context)
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.report({'INFO'}, "Cleaning cancelled, models restored")
+            return self.Finish(context, Cancelled = True)
 
-                    VoxMethods.UVProjection(context)
-                
-                if mytool.BakeTex == True:
-                    VoxMethods.TextureBake(context)
-                
-                #Get a vert count dammit
-                FlowData.VertexCountFinalX = len(FlowData.MainObj.data.vertices)
+        # undo would pull the models out from under the clean
+        if event.type == 'Z' and (event.ctrl or event.oskey): return {'RUNNING_MODAL'}
 
-                CleanPercentageArray.append(round(100-(FlowData.VertexCountFinalX*100/FlowData.VertexCountInitialX),1))
+        # let Blender handle everything else
+        if event.type != 'TIMER' or event.timer != self.Timer: return {'PASS_THROUGH'}
 
-                VoxMethods.EndProcess(context)
+        try:
+            # the stages work on the selection, put it back the way the last stage left it
+            self.RestoreSelection(context)
+            Progress, Stage = next(self.Steps)
+        except StopIteration:
+            return self.Finish(context)
+        except Exception as e:
+            print("Background Clean Error", e)
+            if type(e) == RuntimeError: self.report({'WARNING'}, str(e) + ", models restored")
+            else: self.report({'WARNING'}, "Cleaning failed while " + FlowData.BackgroundCleanStage.lower() + ", models restored. Check the console")
+            return self.Finish(context, Cancelled = True)
+
+        self.Selection = (context.view_layer.objects.active, list(context.selected_objects))
+        FlowData.BackgroundCleanStage = Stage
+
+        context.window_manager.progress_update(int(Progress*100))
+        context.workspace.status_text_set(Stage + "...   (Esc to cancel)")
+        for Area in context.screen.areas: Area.tag_redraw()
+
+        return {'RUNNING_MODAL'}
+
+    def RestoreSelection(self, context):
+        if self.Selection == None: return
+        Active, Selected = self.Selection
+        if context.mode != 'OBJECT': bpy.ops.object.mode_set(mode = 'OBJECT')
+
+        for Obj in context.selected_objects:
+            if Obj not in Selected: Obj.select_set(False)
+        for Obj in Selected: Obj.select_set(True)
+        context.view_layer.objects.active = Active
+
+    def Finish(self, context, Cancelled = False):
+        WindowManager = context.window_manager
+        WindowManager.event_timer_remove(self.Timer)
+        WindowManager.progress_end()
+        context.workspace.status_text_set(None)
+        FlowData.BackgroundCleanStage = None
+
+        if Cancelled:
+            try:
+                self.Steps.close()
+                self.RestoreSelection(context)
+                VoxMethods.RollBackClean(context)
+            except Exception as e:
+                print("Roll Back Error", e)
+                if FlowData.ProcessRunning: VoxMethods.EndProcess(context)
 
-            # select the object
-            bpy.context.view_layer.objects.active = None
-            bpy.context.view_layer.objects.active = ObjArray[0]
-            bpy.ops.object.select_all(action='DESELECT')
-            ObjArray[0].select_set(True)
-                
+        for Area in context.screen.areas: Area.tag_redraw()
+        return {'CANCELLED'} if Cancelled else {'FINISHED'}
 
-            #Give out a feedback
-            if len(CleanPercentageArray) == 1:     #Only one object was there
-                PercentageCleaning = round(sum(CleanPercentageArray)/len(CleanPercentageArray),2)
-                if list(ModelTypeSet)[0] == "Voxel": stmnt = "Model cleaned! "+str(PercentageCleaning)+"% vertex reduction!"
-                else: stmnt = str(list(ModelTypeSet)[0])+" Model cleaned! "+str(PercentageCleaning)+"% vertex reduction!"
-                self.report({'INFO'}, stmnt)
-                return {'FINISHED'}
 
-            elif len(CleanPercentageArray) > 1:    #Multiple objects were there
-                AverageCleaning = round(sum(CleanPercentageArray)/len(CleanPercentageArray),1)
-                if len(ModelTypeSet) >1: stmnt = "All Models cleaned! "+str(AverageCleaning)+"% avg vertex reduction!"
-                else:
-                    if list(ModelTypeSet)[0] == "Voxel": stmnt = "Models cleaned! "+str(AverageCleaning)+"% avg vertex reduction!"
-                    else: stmnt = str(list(ModelTypeSet)[0]) + " Models cleaned! "+str(AverageCleaning)+"% avg vertex reduction!"
-                    self.report({'INFO'}, stmnt)
-            
-            return {'FINISHED'}
-            
 class PrepareForBake(bpy.types.Operator):
     """Clean the model geometry, set-up a material and generate a new image texture and finally project pixel-perfect UVs"""
     
@@ -2581,18 +4731,21 @@ class PrepareForBake(bpy.types.Operator):
 
             VoxMethods.MaterialSetUp(context)
             
-            if FlowData.ModelType == "Voxel":
-                VoxMethods.UVProjection(context)
+            try:
+                if FlowData.ModelType == "Voxel":
+                    VoxMethods.UVProjection(context)
 
-                if mytool.CleanGeo == True:
-                    VoxMethods.GeometryCleanUp(context)
-                
-                VoxMethods.UVScaling(context)
-            else:
-                if mytool.CleanGeo == True:
-                    VoxMethods.GeometryCleanUp(context)
+                    if mytool.CleanGeo == True:
+                        VoxMethods.GeometryCleanUp(context)
+                    
+                    VoxMethods.UVScaling(context)
+                else:
+                    if mytool.CleanGeo == True:
+                        VoxMethods.GeometryCleanUp(context)
 
-                VoxMethods.UVProjection(context)
+                    VoxMethods.UVProjection(context)
+            except RuntimeError as e:
+                return self.RollBack(context, e)
                 
             #Get a vert count dammit
             FlowData.VertexCountFinalX = len(FlowData.MainObj.data.vertices)
@@ -2619,13 +4772,16 @@ class PrepareForBake(bpy.types.Operator):
             VoxMethods.ModelFixing(context)
             VoxMethods.MaterialSetUp(context)
             
-            if FlowData.ModelType == "Voxel":
-                VoxMethods.UVProjection(context)
-                if mytool.CleanGeo == True: VoxMethods.GeometryCleanUp(context)
-                VoxMethods.UVScaling(context)
-            else:
-                if mytool.CleanGeo == True: VoxMethods.GeometryCleanUp(context)
-                VoxMethods.UVProjection(context)
+            try:
+                if FlowData.ModelType == "Voxel":
+                    VoxMethods.UVProjection(context)
+                    if mytool.CleanGeo == True: VoxMethods.GeometryCleanUp(context)
+                    VoxMethods.UVScaling(context)
+                else:
+                    if mytool.CleanGeo == True: VoxMethods.GeometryCleanUp(context)
+                    VoxMethods.UVProjection(context)
+            except RuntimeError as e:
+                return self.RollBack(context, e)
             
             FlowData.VertexCountFinalX = len(FlowData.MainObj.data.vertices)
 
@@ -2641,6 +4797,13 @@ class PrepareForBake(bpy.types.Operator):
             self.report({'INFO'}, stmnt)
             return {'FINISHED'}
 
+    def RollBack(self, context, Error):
+        # a bake that can't fit the memory budget, put the models back & end the 2 Step Process
+        VoxMethods.RollBackClean(context)
+        FlowData.CleanError = str(Error)
+        self.report({'WARNING'}, str(Error) + ", models restored")
+        return {'CANCELLED'}
+
 class PostUVBake(bpy.types.Operator):
     """Bake the texture from the Source model to the Target model.
 Might take some time depending on the model's voxel density"""
@@ -2683,11 +4846,16 @@ class VoxTerminate(bpy.types.Operator):
     bl_options = {'UNDO'}
 
     def execute(self, context):
+        mytool = context.scene.vox_tool
         
         # warnings & errors
         if not FlowData.ProcessRunning:
             self.report({'WARNING'}, "2-Step Process is not running!")
             return {'CANCELLED'}
+
+        # Shrink the textures once no more bakes are coming, before a Shared set is split
+        if FlowData.BakeTimes > 0 and FlowData.MissingActors == False and (mytool.CollapseIslands or mytool.ShareIslands) and FlowData.ModelType == "Voxel" and FlowData.TileSize == 0:
+            VoxMethods.CompactIslands(context)
         
         if FlowData.TwoStepCommonUV and FlowData.MissingActors == False:
             # Split models and make a Dupe Set as well - errors possible due to missing objects
@@ -2705,6 +4873,28 @@ class VoxTerminate(bpy.types.Operator):
         
             
         
+class PackAtlas(bpy.types.Operator):
+    """Pack the baked textures of the selected cleaned models into shared atlases.
+The models keep their Pixel-Perfect UVs & don't need to be joined"""
+    bl_idname = "voxcleaner.packatlas"
+    bl_label = "Pack Texture Atlas"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        if bpy.context.object != None and bpy.context.object.mode != 'OBJECT': bpy.ops.object.mode_set(mode = 'OBJECT')
+
+        if len(context.selected_objects) < 2:
+            self.report({'WARNING'}, 'Select at least two cleaned models')
+            return {'CANCELLED'}
+
+        Models, Atlases = VoxMethods.PackAtlas(context, context.selected_objects)
+        if Models == 0:
+            self.report({'WARNING'}, 'None of the selected models have baked textures')
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, str(Models) + " models packed into " + str(Atlases) + (" atlas" if Atlases == 1 else " atlases"))
+        return {'FINISHED'}
+
 class OpenExportFolder(bpy.types.Operator):
     """Open The specified Export Folder in OS"""
     bl_idname = "voxcleaner.openexportfolder"
@@ -2767,65 +4957,45 @@ class ExportOBJ(bpy.types.Operator):
 
         #Mr Checker Checks
         CleanStatus,StepStatus,ExportStatus = VoxMethods.MrChecker(context)
+        FlowData.ExportError = None
         
         if type(ExportStatus) == int:
             ExportObjArray = bpy.context.selected_objects
 
             #export all Obj textures
-            t=0
+            t, TexturesFailed = 0, 0
             try:
-                TextueresExportedForThisObject = VoxMethods.TextureExport(context)
-                t+=TextueresExportedForThisObject
+                t, TexturesFailed = VoxMethods.TextureExport(context)
             except Exception as e:
-                print(e)
-                pass
+                # couldn't even list them, count it as a failed one
+                print("Texture Export Error",e)
+                TexturesFailed = 1
         
-            #deselect everything
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.context.view_layer.objects.active = None
-            
-            #select ith obj
-            bpy.context.view_layer.objects.active = ExportObjArray[0]
-            ExportObjArray[0].select_set(True)
-
-            #Generate file names
-            FileNameOBJ=ExportObjArray[0].name+'.obj'
-            #ImageFileName=ExportObjArray[i].name+'.png'
-
-            
-            
-            #export Obj
-            TargetFile = os.path.join(ExportDirectory, FileNameOBJ)
-            bpy.ops.wm.obj_export(filepath=TargetFile, 
-                                    check_existing=True, 
-                                    forward_axis='NEGATIVE_Z', up_axis ='Y', 
-                                    filter_glob="*.obj;*.mtl", 
-                                    export_selected_objects =True, 
-                                    export_animation=False, 
-                                    apply_modifiers=True, 
-                                    #use_edges=True, 
-                                    #keep_smooth_curves=False, 
-                                    #use_smooth_groups_bitflags=False,
-                                    export_normals=True, 
-                                    #use_uvs=True, 
-                                    export_materials=True, 
-                                    export_triangulated_mesh=mytool.TriangulatedExport, 
-                                    export_vertex_groups=False, 
-                                    #use_blen_objects=True, 
-                                    export_object_groups=False, 
-                                    #keep_vertex_order=False, 
-                                    global_scale=1, 
-                                    path_mode='AUTO')
-                
+            # all the selected models go in one OBJ
+            Failed = VoxMethods.ExportModels(context, [ExportObjArray], ExportDirectory, "OBJ")
             
             for obj in ExportObjArray:
                 obj.select_set(True)
 
+            # the textures were being written in the background, wait for them
+            TexturesFailed += TextureWriter.Wait()
+            t = max(t - TexturesFailed, 0)
+            VoxProfiler.EndRun("Export")
+
             MeshText = str(len(ExportObjArray)) + str(" OBJs" if len(ExportObjArray) > 1 else " OBJ")
             TextureText = str(int(t)) + str(" textures" if int(t) > 1 else " texture")
 
             stmt = MeshText+" with "+TextureText+" exported!"
 
+            # failed textures fail the export too, so batch jobs don't pass with missing PNGs
+            Failures = []
+            if Failed > 0: Failures.append(str(Failed) + (" models" if Failed > 1 else " model"))
+            if TexturesFailed > 0: Failures.append(str(TexturesFailed) + (" textures" if TexturesFailed > 1 else " texture"))
+            if len(Failures) > 0:
+                FlowData.ExportError = stmt[:-1]+", but "+" & ".join(Failures)+" failed"
+                self.report({'WARNING'}, FlowData.ExportError+"! Check the console")
+                return {'FINISHED'}
+
             self.report({'INFO'}, stmt)
             return {'FINISHED'}
         else:
@@ -2857,6 +5027,7 @@ class ExportFBX(bpy.types.Operator):
 
         #Mr Checker Checks
         CleanStatus,StepStatus, ExportStatus = VoxMethods.MrChecker(context)
+        FlowData.ExportError = None
 
 
         
@@ -2865,59 +5036,205 @@ class ExportFBX(bpy.types.Operator):
             ExportFbxArray = bpy.context.selected_objects
 
             #export fbx texture
-            t = 0
+            t, TexturesFailed = 0, 0
             try:
-                TextueresExportedForThisObject = VoxMethods.TextureExport(context)
-                t+=TextueresExportedForThisObject
+                t, TexturesFailed = VoxMethods.TextureExport(context)
             except Exception as e:
-                pass
+                # couldn't even list them, count it as a failed one
+                print("Texture Export Error",e)
+                TexturesFailed = 1
             
-            i = 0
-            while i < len(ExportFbxArray):
-                #deselect everything
-                bpy.ops.object.select_all(action='DESELECT')
-                bpy.context.view_layer.objects.active = None
-                
-                #select ith obj
-                bpy.context.view_layer.objects.active = ExportFbxArray[i]
-                ExportFbxArray[i].select_set(True)
-
-                #Generate file names
-                FileNameOBJ=ExportFbxArray[i].name+'.fbx'
-                #ImageFileName=ExportFbxArray[i].name+'.png'
-
-                
-                #Export FBX
-                if mytool.TriangulatedExport:
-                    #Dupe n do that triangulation
-                    bpy.ops.object.duplicate()
-                    TriaDommi = bpy.context.active_object
-                    VoxMethods.TriangulateModel(context)
-                    TargetFile = os.path.join(ExportDirectory, FileNameOBJ)
-                    bpy.ops.export_scene.fbx(filepath=str(TargetFile), use_selection=True, apply_scale_options = 'FBX_SCALE_ALL')
-                    TriaDommi.select_set(True)
-                    bpy.context.view_layer.objects.active = TriaDommi
-                    bpy.ops.object.delete(use_global=False)
-                else:
-                    TargetFile = os.path.join(ExportDirectory, FileNameOBJ)
-                    bpy.ops.export_scene.fbx(filepath=str(TargetFile), use_selection=True, apply_scale_options = 'FBX_SCALE_ALL')
-
-                i = i+1
+            # one FBX per model
+            Failed = VoxMethods.ExportModels(context, [[Obj] for Obj in ExportFbxArray], ExportDirectory, "FBX")
             
             for obj in ExportFbxArray:
                 obj.select_set(True)
 
+            # the textures were being written in the background, wait for them
+            TexturesFailed += TextureWriter.Wait()
+            t = max(t - TexturesFailed, 0)
+            VoxProfiler.EndRun("Export")
+
             MeshText = str(len(ExportFbxArray)) + str(" FBXs" if len(ExportFbxArray) > 1 else " FBX")
             TextureText = str(int(t)) + str(" textures" if int(t) > 1 else " texture")
 
             stmt = MeshText+" with "+TextureText+" exported!"
 
+            # failed textures fail the export too, so batch jobs don't pass with missing PNGs
+            Failures = []
+            if Failed > 0: Failures.append(str(Failed) + (" models" if Failed > 1 else " model"))
+            if TexturesFailed > 0: Failures.append(str(TexturesFailed) + (" textures" if TexturesFailed > 1 else " texture"))
+            if len(Failures) > 0:
+                FlowData.ExportError = stmt[:-1]+", but "+" & ".join(Failures)+" failed"
+                self.report({'WARNING'}, FlowData.ExportError+"! Check the console")
+                return {'FINISHED'}
+
             self.report({'INFO'}, stmt)
             return {'FINISHED'}
         else:
             self.report({'WARNING'}, ExportStatus)
             return {'CANCELLED'}
     
+class ExportGLB(bpy.types.Operator):
+    """Export binary glTF (GLB) files of the selected meshes, with their textures embedded.
+Engine ready, smaller & faster to export than OBJ or FBX"""
+    bl_idname = "voxcleaner.exportglb"
+    bl_label = "Export GLB"
+    bl_options = {'UNDO'}
+    
+    def execute(self, context):
+        
+        scene = context.scene
+        mytool = scene.vox_tool
+        
+        #Directory checks
+        if len(mytool.ExportLocation) <= 0:
+            self.report({'WARNING'}, 'Please add an export location')
+            return {'CANCELLED'}
+
+        ExportDirectory = os.path.realpath(bpy.path.abspath(mytool.ExportLocation))
+
+        if not os.path.exists(ExportDirectory):
+            self.report({'WARNING'}, 'Export Location does not exist, please add another location')
+            return {'CANCELLED'}
+
+        #Mr Checker Checks
+        CleanStatus,StepStatus, ExportStatus = VoxMethods.MrChecker(context)
+        FlowData.ExportError = None
+        
+        if type(ExportStatus) == int:
+            ExportGlbArray = bpy.context.selected_objects
+
+            # one GLB per model, textures go inside the GLB
+            Failed = VoxMethods.ExportModels(context, [[Obj] for Obj in ExportGlbArray], ExportDirectory, "GLB")
+            
+            for obj in ExportGlbArray:
+                obj.select_set(True)
+            VoxProfiler.EndRun("Export")
+
+            stmt = str(len(ExportGlbArray)) + str(" GLBs" if len(ExportGlbArray) > 1 else " GLB") + " exported!"
+
+            if Failed > 0:
+                FlowData.ExportError = stmt[:-1]+", but "+str(Failed)+" failed"
+                self.report({'WARNING'}, FlowData.ExportError+"! Check the console")
+                return {'FINISHED'}
+
+            self.report({'INFO'}, stmt)
+            return {'FINISHED'}
+        else:
+            self.report({'WARNING'}, ExportStatus)
+            return {'CANCELLED'}
+    
+class BatchClean(bpy.types.Operator):
+    """Import, clean & export every .vox & .blend file in the batch folder, several at once in background Blender processes.
+The models go into the Export Folder, along with a manifest.json of the results"""
+    bl_idname = "voxcleaner.batchclean"
+    bl_label = "Clean Folder"
+
+    def Check(self, context):
+        mytool = context.scene.vox_tool
+
+        if VoxFarm.Directory != None:
+            self.report({'WARNING'}, "A batch is already running")
+            return False
+        if not os.path.isdir(os.path.realpath(bpy.path.abspath(mytool.BatchInput))):
+            self.report({'WARNING'}, "Please add a folder to clean")
+            return False
+        if len(mytool.ExportLocation) <= 0 or not os.path.isdir(os.path.realpath(bpy.path.abspath(mytool.ExportLocation))):
+            self.report({'WARNING'}, "Please add an existing export location")
+            return False
+        if len(mytool.BatchFormats) == 0:
+            self.report({'WARNING'}, "Select atleast one export format")
+            return False
+
+        Files = VoxFarm.Start(context, os.path.realpath(bpy.path.abspath(mytool.BatchInput)), os.path.realpath(bpy.path.abspath(mytool.ExportLocation)), mytool.BatchFormats, mytool.WorkerCount, mytool.BatchRetries)
+        if Files == 0:
+            self.report({'WARNING'}, "No .vox or .blend files in the folder")
+            return False
+        return True
+
+    def Report(self, Cancelled = False):
+        ManifestFile = VoxFarm.Finish(Cancelled)
+        stmt = str(VoxFarm.Done)+" of "+str(VoxFarm.Total)+" files cleaned"
+        if VoxFarm.Failed > 0: stmt += ", "+str(VoxFarm.Failed)+" failed"
+        if Cancelled: stmt += ", cancelled"
+        print(stmt, "-", ManifestFile)
+        self.report({'WARNING'} if VoxFarm.Failed > 0 or Cancelled else {'INFO'}, stmt+"! Details in manifest.json")
+
+    def execute(self, context):
+        # blocking, for scripts & the command line
+        if not self.Check(context): return {'CANCELLED'}
+        while VoxFarm.Poll(): time.sleep(0.5)
+        self.Report()
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not self.Check(context): return {'CANCELLED'}
+
+        self.Timer = context.window_manager.event_timer_add(0.5, window = context.window)
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        Cancelled = event.type == 'ESC' and event.value == 'PRESS'
+        if not Cancelled and (event.type != 'TIMER' or event.timer != self.Timer): return {'PASS_THROUGH'}
+
+        if not Cancelled and VoxFarm.Poll():
+            for Area in context.screen.areas: Area.tag_redraw()
+            return {'RUNNING_MODAL'}
+
+        context.window_manager.event_timer_remove(self.Timer)
+        self.Report(Cancelled)
+        for Area in context.screen.areas: Area.tag_redraw()
+        return {'CANCELLED'} if Cancelled else {'FINISHED'}
+
+
+class WatchFolder(bpy.types.Operator):
+    """Keep cleaning every new or changed .vox & .blend file in the batch folder, in a background Blender process with the current settings.
+The models go into the Export Folder. Click again to stop watching"""
+    bl_idname = "voxcleaner.watchfolder"
+    bl_label = "Watch Folder"
+
+    def execute(self, context):
+        mytool = context.scene.vox_tool
+
+        if VoxWatcher.Running():
+            VoxWatcher.Stop()
+            self.report({'INFO'}, "Stopped watching the folder")
+            return {'FINISHED'}
+
+        Folder = os.path.realpath(bpy.path.abspath(mytool.BatchInput))
+        Output = os.path.realpath(bpy.path.abspath(mytool.ExportLocation))
+        if not os.path.isdir(Folder):
+            self.report({'WARNING'}, "Please add a folder to watch")
+            return {'CANCELLED'}
+        if len(mytool.ExportLocation) <= 0 or not os.path.isdir(Output):
+            self.report({'WARNING'}, "Please add an existing export location")
+            return {'CANCELLED'}
+        if len(mytool.BatchFormats) == 0:
+            self.report({'WARNING'}, "Select atleast one export format")
+            return {'CANCELLED'}
+
+        # already headless, this is the watcher
+        if bpy.app.background:
+            VoxWatcher.Run(context, Folder, Output, sorted(mytool.BatchFormats))
+            return {'FINISHED'}
+
+        # start a watcher on a copy of this file, so it has the same settings
+        VoxWatcher.Stop()
+        VoxWatcher.WorkDirectory = tempfile.mkdtemp(prefix = "VoxWatch_")
+        BlendFile = os.path.join(VoxWatcher.WorkDirectory, "Settings.blend")
+        bpy.ops.wm.save_as_mainfile(filepath = BlendFile, copy = True, check_existing = False)
+
+        ConfigFile = os.path.join(VoxWatcher.WorkDirectory, "watch.json")
+        with open(ConfigFile, 'w') as File:
+            json.dump({"Folder": Folder, "Output": Output, "Formats": sorted(mytool.BatchFormats)}, File)
+        VoxWatcher.Process = subprocess.Popen(VoxWorkers.Command("watch", ConfigFile, BlendFile))
+
+        self.report({'INFO'}, "Watching the folder in the background")
+        return {'FINISHED'}
+
+
 class ResetSettings(bpy.types.Operator):
     """Reset all settings in this add-on"""
     bl_idname = "voxcleaner.resetsettings"
@@ -2929,21 +5246,45 @@ class ResetSettings(bpy.types.Operator):
         mytool = context.scene.vox_tool
         mytool.BaseColor = StaticData.BaseColorDefault
         mytool.AlphaBool = StaticData.AlphaDefault
+        mytool.BakeDevice = StaticData.BakeDeviceDefault
+        mytool.PackORM = StaticData.PackORMDefault
+        mytool.MemoryBudget = StaticData.MemoryBudgetDefault
+        mytool.BudgetAction = StaticData.BudgetActionDefault
         mytool.ResolutionSet = StaticData.ResolutionDefault
         mytool.TextureScaleMultiplier = StaticData.UpscalingDefault
+        mytool.MaxTileSize = StaticData.MaxTileDefault
         mytool.UVMethod = StaticData.UVMethodDefault
         mytool.RotateUV = StaticData.RotateUVDefault
+        mytool.CollapseIslands = StaticData.CollapseIslandsDefault
+        mytool.ShareIslands = StaticData.ShareIslandsDefault
 
         mytool.MCNVResolution = StaticData.MCNVResDefault
         mytool.NVDecimation = StaticData.NVDecimationDefault
 
         mytool.CreateBackup = StaticData.ModelBackupDefault
         mytool.OrganiseBackups = StaticData.OrganiseDefault
+        mytool.BackgroundClean = StaticData.BackgroundCleanDefault
         mytool.TriangulatedExport = StaticData.TriangulateDefault
+        mytool.ParallelExport = StaticData.ParallelExportDefault
+        mytool.WorkerCount = StaticData.WorkerCountDefault
+        mytool.BatchRetries = StaticData.BatchRetriesDefault
+        mytool.UseCache = StaticData.CacheDefault
+        mytool.CacheSize = StaticData.CacheSizeDefault
         mytool.EmitStrength = StaticData.EmitStrengthDefault
+        mytool.AtlasSize = StaticData.AtlasSizeDefault
 
         return {'FINISHED'} 
     
+class ClearCache(bpy.types.Operator):
+    """Remove every cleaned model in the cache"""
+    bl_idname = "voxcleaner.clearcache"
+    bl_label = "Clear Cache"
+
+    def execute(self, context):
+        VoxCache.Clear()
+        self.report({'INFO'}, "Cache cleared")
+        return {'FINISHED'}
+
 class CheckForUpdates(bpy.types.Operator):
     """Check for add-on updates on Vox Cleaner's Official Gumroad page!
 All V3.x updates are FREE!"""
@@ -3048,12 +5389,15 @@ class VoxClean(bpy.types.Panel):
 
             row = col.row(align = False)
             row.scale_y = StaticData.BigButtonHeight
+            LazyCleanOperator = "voxcleaner.lazycleanmodal" if mytool.BackgroundClean else "voxcleaner.lazyclean"
             if type(CleanStatus) == int:
                 if CleanStatus == 1:
-                    row.operator("voxcleaner.lazyclean",icon = 'SOLO_ON',text = 'Clean Model')
+                    row.operator(LazyCleanOperator,icon = 'SOLO_ON',text = 'Clean Model')
                 else:
                     if mytool.CommonUV == True:
-                        row.operator("voxcleaner.lazyclean",icon = 'COLOR',text = 'Clean with Shared UVs')
+                        row.operator(LazyCleanOperator,icon = 'COLOR',text = 'Clean with Shared UVs')
+            elif FlowData.BackgroundCleanStage != None:
+                row.label(icon="TIME", text = FlowData.BackgroundCleanStage + "... (Esc to cancel)")
             else:
                 row.label(icon="ERROR", text = CleanStatus)
 
@@ -3219,6 +5563,22 @@ class VoxExport(bpy.types.Panel):
             col.prop(mytool, "ExportEmission")
             col.prop(mytool, "ExportTransmission")
 
+        # Texture Atlas
+        header, panel = layout.panel("AtlasSub", default_closed=True)
+        header.label(icon='IMAGE_DATA',text = "Texture Atlas")
+        if panel:
+            split = panel.split(factor = StaticData.VerticalSplitFactor)
+            labels = split.column()
+            labels.alignment = "RIGHT"
+            labels.label(text = "Max Atlas Size:")
+            props = split.column()
+            props.prop(mytool, "AtlasSize")
+
+            row = panel.row()
+            row.scale_y = StaticData.ButtonHeightMedium
+            row.operator("voxcleaner.packatlas", icon = 'TEXTURE')
+            row.enabled = len(context.selected_objects) > 1
+
         #MainButtonBox
         box = layout.box()
 
@@ -3239,15 +5599,71 @@ class VoxExport(bpy.types.Panel):
                 #row.operator("voxcleaner.exportobj",icon = 'SNAP_FACE',text = "OBJ")
                 row.operator("voxcleaner.exportfbx",icon = 'SNAP_FACE',text = "FBX")
                 row.operator("voxcleaner.exportobj",icon = 'SNAP_FACE',text = "OBJ")
+                row.operator("voxcleaner.exportglb",icon = 'SNAP_FACE',text = "GLB")
             elif ExportStatus >1:
                 #row.operator("voxcleaner.exportobj",icon = 'SNAP_VERTEX',text = "OBJs")
                 row.operator("voxcleaner.exportfbx",icon = 'SNAP_VERTEX',text = "FBXs")
                 row.operator("voxcleaner.exportobj",icon = 'SNAP_VERTEX',text = "OBJs")
+                row.operator("voxcleaner.exportglb",icon = 'SNAP_VERTEX',text = "GLBs")
                 
         else:
             row.label(icon="ERROR", text = ExportStatus)
 
 
+class VoxBatch(bpy.types.Panel):
+    #bl_parent_id = "VoxCleaner_PT_main_panel"
+    bl_label = "Batch"
+    bl_idname = "BATCH_PT_panel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Vox Cleaner"
+    bl_options = {'DEFAULT_CLOSED'}
+    
+    
+    def draw_header(self, _):
+        layout = self.layout
+        layout.label(text="", icon='PACKAGE')
+
+    def draw(self, context):
+        layout = self.layout
+
+        scene = context.scene
+        mytool = scene.vox_tool
+
+        col = layout.column()
+        col.enabled = VoxFarm.Directory == None
+
+        split = col.split(factor = StaticData.VerticalSplitFactor)
+
+        labels = split.column()
+        labels.alignment = "RIGHT"
+        labels.label(text = "Batch Folder:")
+        labels.label(text = "Export Folder:")
+        labels.label(text = "Formats:")
+        labels.label(text = "Workers:")
+        labels.label(text = "Retries:")
+
+        props = split.column()
+        props.prop(mytool, "BatchInput")
+        props.prop(mytool, "ExportLocation")
+        row = props.row(align = True)
+        row.prop(mytool, "BatchFormats")
+        props.prop(mytool, "WorkerCount")
+        props.prop(mytool, "BatchRetries")
+
+        row = layout.row()
+        row.scale_y = StaticData.BigButtonHeight
+        if VoxFarm.Directory == None:
+            row.operator("voxcleaner.batchclean", icon = 'PLAY')
+        else:
+            row.label(icon = 'TIME', text = "Cleaning "+str(VoxFarm.Done+VoxFarm.Failed)+"/"+str(VoxFarm.Total)+" files (Esc to cancel)")
+
+        row = layout.row()
+        row.scale_y = StaticData.ButtonHeightMedium
+        if VoxWatcher.Running(): row.operator("voxcleaner.watchfolder", icon = 'PAUSE', text = "Stop Watching", depress = True)
+        else: row.operator("voxcleaner.watchfolder", icon = 'HIDE_OFF')
+
+
 class VoxSettings(bpy.types.Panel):
     #bl_parent_id = "VoxCleaner_PT_main_panel"
     bl_label = "General Settings"
@@ -3286,10 +5702,18 @@ class VoxSettings(bpy.types.Panel):
         labels.alignment = "RIGHT"
         labels.label(text = "Base Color:")
         labels.label(text = "Base Image has Aplha:")
+        labels.label(text = "Bake Device:")
+        labels.label(text = "Pack ORM Map:")
+        labels.label(text = "Bake Memory Budget (MB):")
+        labels.label(text = "Over Budget:")
 
         props = split.column()
         props.prop(mytool, "BaseColor")
         props.prop(mytool, "AlphaBool")
+        props.prop(mytool, "BakeDevice")
+        props.prop(mytool, "PackORM")
+        props.prop(mytool, "MemoryBudget")
+        props.prop(mytool, "BudgetAction")
 
 
         # Voxel Models
@@ -3304,6 +5728,7 @@ class VoxSettings(bpy.types.Panel):
             labels.alignment = "RIGHT"  
             labels.label(text = "Resolution Set (px):")
             labels.label(text = "Resolution Upscaling:")
+            labels.label(text = "Max Texture Size:")
             
             #Spacing
             row = labels.row()      
@@ -3312,11 +5737,14 @@ class VoxSettings(bpy.types.Panel):
             
             labels.label(text = "UV Projection Method:")
             labels.label(text = "Rotate UV Islands:")
+            labels.label(text = "Collapse Flat Islands:")
+            labels.label(text = "Share Repeated Islands:")
             
             props = split.column(align = True)
             labels.alignment = "LEFT"
             props.prop(mytool, "ResolutionSet")
             props.prop(mytool, "TextureScaleMultiplier")
+            props.prop(mytool, "MaxTileSize")
             
             #Spacing
             row = props.row()      
@@ -3325,6 +5753,8 @@ class VoxSettings(bpy.types.Panel):
             
             props.prop(mytool, "UVMethod")
             props.prop(mytool, "RotateUV")
+            props.prop(mytool, "CollapseIslands")
+            props.prop(mytool, "ShareIslands")
 
         
         # MC+Non-Voxel Models
@@ -3365,16 +5795,65 @@ class VoxSettings(bpy.types.Panel):
         BackupFolderRow.prop(mytool, "OrganiseBackups")
         BackupFolderRow.enabled = True if mytool.CreateBackup == True else False
 
+        COL.prop(mytool, "BackgroundClean")
         COL.prop(mytool, "TriangulatedExport")
+        COL.prop(mytool, "ParallelExport")
 
         split = COL.split(factor = StaticData.VerticalSplitFactor)
 
         labels = split.column()
         labels.alignment = "RIGHT"
         labels.label(text = "Default Emit Strength:")
+        labels.label(text = "Background Workers:")
 
         props = split.column()
         props.prop(mytool, "EmitStrength")
+        props.prop(mytool, "WorkerCount")
+
+        # Profiler
+        header, panel = box.panel("Profiler", default_closed=True)
+        header.label(icon='TIME',text = "Profiler")
+        if panel:
+            ProfileCol = panel.column(align = True)
+            ProfileCol.prop(mytool, "ProfileStages")
+
+            OptionsCol = ProfileCol.column(align = True)
+            OptionsCol.enabled = mytool.ProfileStages
+            OptionsCol.prop(mytool, "ProfileMemory")
+            OptionsCol.prop(mytool, "ProfileCProfile")
+            OptionsCol.prop(mytool, "ProfileLog")
+
+            # Summary of the last run
+            if len(VoxProfiler.LastRun) > 0:
+                SummaryBox = panel.box()
+                SummaryCol = SummaryBox.column(align = True)
+                for Stage in VoxProfiler.LastRun:
+                    row = SummaryCol.row()
+                    row.label(text = "  "*Stage["Depth"] + Stage["Stage"])
+                    row.label(text = str(round(Stage["Seconds"], 2)) + " s")
+                    row.label(text = str(Stage["Operators"]) + " ops, " + str(Stage["ModeSets"]) + " modes")
+
+        # Cache
+        header, panel = box.panel("Cache", default_closed=True)
+        header.label(icon='DISK_DRIVE',text = "Clean Cache")
+        if panel:
+            CacheCol = panel.column(align = True)
+            CacheCol.prop(mytool, "UseCache")
+
+            split = CacheCol.split(factor = StaticData.VerticalSplitFactor)
+            split.enabled = mytool.UseCache
+            labels = split.column()
+            labels.alignment = "RIGHT"
+            labels.label(text = "Cache Size (MB):")
+            props = split.column()
+            props.prop(mytool, "CacheSize")
+
+            Entries = VoxCache.Entries()
+            row = panel.row()
+            row.label(text = str(len(Entries)) + " models, " + str(round(sum(Entry[1] for Entry in Entries)/2**20, 1)) + " MB")
+            row.label(text = str(VoxCache.Hits) + " hits, " + str(VoxCache.Misses) + " misses")
+            row = panel.row()
+            row.operator("voxcleaner.clearcache", icon = 'TRASH')
 
 
         row = col.row()
@@ -3392,7 +5871,7 @@ class VoxSettings(bpy.types.Panel):
 
 
 
-classes = [ApplyVColors,VoxProperties,LazyClean,PrepareForBake,PostUVBake,VoxTerminate,VoxImport,VoxClean,VoxExport,VoxSettings,ImportVox,ExportOBJ,ExportFBX,OpenExportFolder,ResetSettings,CheckForUpdates]
+classes = [ApplyVColors,VoxProperties,LazyClean,LazyCleanModal,PrepareForBake,PostUVBake,VoxTerminate,VoxImport,VoxClean,VoxExport,VoxBatch,VoxSettings,ImportVox,ExportOBJ,ExportFBX,ExportGLB,PackAtlas,OpenExportFolder,BatchClean,WatchFolder,ResetSettings,ClearCache,CheckForUpdates]
  
 def menu_func_import(self, context):
     self.layout.operator(ImportVox.bl_idname, icon = "FILE_3D",text="MagicaVoxel (.vox)")
@@ -3406,6 +5885,10 @@ def register():
 
         
 def unregister():
+    TextureWriter.Shutdown()
+    if VoxFarm.Directory != None: VoxFarm.Finish(Cancelled = True)
+    VoxWatcher.Stop()
+    VoxProfiler.CountOperators(False)
     del bpy.types.Scene.vox_tool
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
     for cls in classes:
@@ -3414,4 +5897,4 @@ def unregister():
     
  
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
\ No newline at end of file
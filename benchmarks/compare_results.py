@@ -0,0 +1,71 @@
+# Compares two benchmark result files made by run_benchmarks.py, e.g. of two commits or releases:
+#
+#   python benchmarks/compare_results.py base.jsonl new.jsonl [--threshold 10] [--stage Total]
+#
+# The median time of every fixture, phase & stage is compared. Exits with 1 when something got slower
+# than the threshold, so it can be used as a check.
+
+import sys
+import argparse
+import json
+import statistics
+
+
+def Load(FilePath, Commit = None):
+    # Returns {(Fixture, Phase, Stage): [Seconds]} of one commit, the last one in the file by default
+    Records = [json.loads(Line) for Line in open(FilePath) if Line.strip()]
+    if not Records: raise SystemExit(FilePath + " has no results")
+
+    Commit = Commit or Records[-1]["Commit"]
+    Times = {}
+    for Record in Records:
+        if Record["Commit"] != Commit: continue
+        Times.setdefault((Record["Fixture"], Record["Phase"], Record["Stage"]), []).append(Record["Seconds"])
+    return Commit, Times
+
+
+def main(Argv):
+    Parser = argparse.ArgumentParser(description = "Compare two Vox Cleaner benchmark result files")
+    Parser.add_argument("base")
+    Parser.add_argument("new")
+    Parser.add_argument("--base-commit", help = "Commit to use from the base file, defaults to its last one")
+    Parser.add_argument("--new-commit", help = "Commit to use from the new file, defaults to its last one")
+    Parser.add_argument("--threshold", type = float, default = 10.0, help = "Slowdown in percent that counts as a regression")
+    Parser.add_argument("--min-seconds", type = float, default = 0.01, help = "Ignore stages faster than this in both files")
+    Parser.add_argument("--stage", action = "append", help = "Only compare these stages, e.g. --stage Total")
+    Args = Parser.parse_args(Argv)
+
+    BaseCommit, Base = Load(Args.base, Args.base_commit)
+    NewCommit, New = Load(Args.new, Args.new_commit)
+
+    print("Base:", BaseCommit, "   New:", NewCommit, "\n")
+    print("Fixture".ljust(20), "Phase".ljust(10), "Stage".ljust(18), "Base (s)".rjust(10), "New (s)".rjust(10), "Change".rjust(9))
+    print("-" * 82)
+
+    Regressions = 0
+    for Key in sorted(set(Base) | set(New)):
+        Fixture, Phase, Stage = Key
+        if Args.stage and Stage not in Args.stage: continue
+
+        BaseTime = statistics.median(Base[Key]) if Key in Base else None
+        NewTime = statistics.median(New[Key]) if Key in New else None
+
+        if BaseTime is None or NewTime is None:
+            Change, Flag = "only " + ("new" if BaseTime is None else "base"), ""
+        elif max(BaseTime, NewTime) < Args.min_seconds:
+            continue
+        else:
+            Percent = (NewTime - BaseTime) * 100 / BaseTime if BaseTime > 0 else 0.0
+            Change = ("+" if Percent >= 0 else "") + str(round(Percent, 1)) + "%"
+            Flag = "  <- slower" if Percent > Args.threshold else ""
+            Regressions += Percent > Args.threshold
+
+        Format = lambda Seconds: "-" if Seconds is None else str(round(Seconds, 3))
+        print(Fixture.ljust(20), Phase.ljust(10), Stage.ljust(18), Format(BaseTime).rjust(10), Format(NewTime).rjust(10), Change.rjust(9) + Flag)
+
+    print("\n" + str(Regressions), "regression(s) above", str(Args.threshold) + "%")
+    return 1 if Regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
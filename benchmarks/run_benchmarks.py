@@ -0,0 +1,208 @@
+# Vox Cleaner benchmark runner. Runs inside Blender, on the CPU only:
+#
+#   blender --background --factory-startup --python benchmarks/run_benchmarks.py -- [options]
+#
+# Every fixture is imported, Lazy Cleaned & exported (OBJ, FBX & GLB) a few times & the time of every stage is
+# written as JSON lines to --out, together with the commit, Blender version & machine. Compare two of those files with
+# compare_results.py. Use --addon to benchmark a released zip (e.g. Vox_Cleaner_V3.1.zip) instead of this checkout;
+# versions without the stage profiler only get the total time of every phase.
+
+import os, sys
+import argparse
+import hashlib
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import zipfile
+
+import bpy
+
+BenchmarkDirectory = os.path.dirname(os.path.abspath(__file__))
+RepoDirectory = os.path.dirname(BenchmarkDirectory)
+sys.path.insert(0, BenchmarkDirectory)
+
+import vox_generator
+
+
+def LoadAddon(AddonPath):
+    # Loads & registers the add-on from a source folder or a release zip, under its own module name
+    if AddonPath.endswith(".zip"):
+        Extracted = tempfile.mkdtemp(prefix = "VoxBenchAddon_")
+        with zipfile.ZipFile(AddonPath) as Zip: Zip.extractall(Extracted)
+        AddonPath = Extracted
+
+    Spec = importlib.util.spec_from_file_location("vox_cleaner_bench", os.path.join(AddonPath, "__init__.py"), submodule_search_locations = [AddonPath])
+    Module = importlib.util.module_from_spec(Spec)
+    sys.modules[Spec.name] = Module
+    Spec.loader.exec_module(Module)
+    Module.register()
+    return Module
+
+def AddonVersion(AddonPath):
+    Manifest = os.path.join(AddonPath, "blender_manifest.toml")
+    if AddonPath.endswith(".zip"):
+        with zipfile.ZipFile(AddonPath) as Zip: Text = Zip.read("blender_manifest.toml").decode("utf-8")
+    elif os.path.exists(Manifest):
+        Text = open(Manifest, encoding = "utf-8").read()
+    else: return None
+
+    for Line in Text.splitlines():
+        if Line.strip().startswith("version"): return Line.split("=")[1].strip().strip('"')
+    return None
+
+def CommitInfo(AddonPath):
+    if AddonPath.endswith(".zip"): return os.path.basename(AddonPath), False
+    try:
+        Commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd = AddonPath, stderr = subprocess.DEVNULL).decode().strip()
+        Dirty = subprocess.call(["git", "diff", "--quiet", "HEAD", "--", "__init__.py"], cwd = AddonPath, stderr = subprocess.DEVNULL) != 0
+        return Commit, Dirty
+    except Exception:
+        return "unknown", False
+
+
+def ForceCPU(Module):
+    # No GPU devices & Cycles on the CPU, so every machine bakes the same way
+    Cycles = bpy.context.preferences.addons.get("cycles")
+    if Cycles is not None: Cycles.preferences.compute_device_type = 'NONE'
+    bpy.context.scene.cycles.device = 'CPU'
+
+    mytool = bpy.context.scene.vox_tool
+    if hasattr(mytool, "BakeDevice"): mytool.BakeDevice = 'CPU'
+
+def ClearScene():
+    if bpy.context.object is not None and bpy.context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode = 'OBJECT')
+    for Collection in (bpy.data.objects, bpy.data.meshes, bpy.data.materials, bpy.data.images):
+        for Block in list(Collection):
+            Collection.remove(Block)
+    for Collection in list(bpy.data.collections):
+        bpy.data.collections.remove(Collection)
+
+def SelectOnly(Objects):
+    bpy.ops.object.select_all(action = 'DESELECT')
+    for Obj in Objects: Obj.select_set(True)
+    bpy.context.view_layer.objects.active = Objects[0]
+
+
+def RunPhase(Module, Phase, Function):
+    # Runs one phase & returns its stages. The profiler ends its run inside the operators,
+    # the total wall time of the phase is always added as the "Total" stage
+    Start = time.perf_counter()
+    Result = Function()
+    Seconds = time.perf_counter() - Start
+
+    Stages = []
+    Profiler = getattr(Module, "VoxProfiler", None)
+    if Profiler is not None:
+        Stages = [dict(Stage) for Stage in Profiler.LastRun]
+        Profiler.LastRun = []
+
+        # The parser has no stage of its own, it's the import minus the model generation
+        if Phase == "Import":
+            Import = sum(Stage["Seconds"] for Stage in Stages if Stage["Stage"] == "Import")
+            Generate = sum(Stage["Seconds"] for Stage in Stages if Stage["Stage"] == "Generate")
+            Stages.append({"Stage": "Parse", "Depth": 1, "Seconds": round(Import - Generate, 4)})
+
+    Stages.append({"Stage": "Total", "Depth": 0, "Seconds": round(Seconds, 4), "Result": sorted(Result) if isinstance(Result, set) else str(Result)})
+    return Stages
+
+def BenchmarkFixture(Module, FixturePath, ExportDirectory, Formats):
+    mytool = bpy.context.scene.vox_tool
+    Phases = []
+
+    ClearScene()
+
+    # Import
+    Directory, FileName = os.path.split(FixturePath)
+    Phases.append(("Import", RunPhase(Module, "Import", lambda: bpy.ops.voxcleaner.importvox(filepath = FixturePath, directory = Directory, files = [{"name": FileName}]))))
+
+    Models = [Obj for Obj in bpy.context.scene.objects if Obj.type == 'MESH']
+    VerticesBefore = sum(len(Obj.data.vertices) for Obj in Models)
+
+    # Lazy Clean, a single model solo & multiple models with Shared UVs
+    mytool.CommonUV = len(Models) > 1
+    SelectOnly(Models)
+    Phases.append(("Clean", RunPhase(Module, "Clean", lambda: bpy.ops.voxcleaner.lazyclean())))
+
+    Cleaned = [Obj for Obj in bpy.context.selected_objects if Obj.type == 'MESH'] or [bpy.context.active_object]
+    VerticesAfter = sum(len(Obj.data.vertices) for Obj in Cleaned)
+
+    # Export the first cleaned model in every format
+    mytool.ExportLocation = ExportDirectory
+    for Format in Formats:
+        Operator = getattr(bpy.ops.voxcleaner, "export" + Format.lower())
+        SelectOnly(Cleaned[:1])
+        Phases.append(("Export" + Format, RunPhase(Module, "Export", lambda: Operator())))
+
+    return Phases, {"Models": len(Models), "VerticesBefore": VerticesBefore, "VerticesAfter": VerticesAfter}
+
+
+def main(Argv):
+    Parser = argparse.ArgumentParser(description = "Vox Cleaner benchmarks, run inside 'blender --background --factory-startup --python'")
+    Parser.add_argument("--addon", default = RepoDirectory, help = "Add-on folder or release zip to benchmark, defaults to this checkout")
+    Parser.add_argument("--fixtures", default = vox_generator.FixturesDirectory, help = "Folder with the .vox fixtures")
+    Parser.add_argument("--preset", action = "append", choices = sorted(vox_generator.PRESETS), help = "Only run these presets, generating the ones missing from --fixtures")
+    Parser.add_argument("--repeat", type = int, default = 3, help = "Runs per fixture")
+    Parser.add_argument("--formats", default = "OBJ,FBX,GLB", help = "Comma separated export formats")
+    Parser.add_argument("--out", default = os.path.join(BenchmarkDirectory, "results", "results.jsonl"), help = "JSON-lines file the results are added to")
+    Args = Parser.parse_args(Argv)
+
+    Module = LoadAddon(Args.addon)
+    mytool = bpy.context.scene.vox_tool
+    ForceCPU(Module)
+
+    # The profiler writes its own log too, keep that out of the way
+    if hasattr(mytool, "ProfileStages"):
+        mytool.ProfileStages = True
+        mytool.ProfileLog = os.path.join(tempfile.gettempdir(), "VoxBenchmarkProfile.jsonl")
+    mytool.CreateBackup = False
+
+    # Fixtures
+    Presets = Args.preset or sorted(vox_generator.FIXTURES)
+    Fixtures = []
+    for Name in Presets:
+        FixturePath = os.path.join(Args.fixtures, Name + ".vox")
+        if not os.path.exists(FixturePath):
+            FixturePath = os.path.join(tempfile.gettempdir(), "VoxBenchmark_" + Name + ".vox")
+            with open(FixturePath, "wb") as File: File.write(vox_generator.GeneratePreset(Name))
+        Fixtures.append((Name, FixturePath))
+
+    Commit, Dirty = CommitInfo(Args.addon)
+    RunInfo = {"Commit": Commit, "Dirty": Dirty, "AddonVersion": AddonVersion(Args.addon), "Blender": bpy.app.version_string,
+               "Platform": platform.platform(), "Machine": platform.machine(), "CPUs": os.cpu_count(), "Time": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+    ExportDirectory = tempfile.mkdtemp(prefix = "VoxBenchExport_")
+    Formats = [Format.strip().upper() for Format in Args.formats.split(",") if Format.strip()]
+    os.makedirs(os.path.dirname(os.path.abspath(Args.out)), exist_ok = True)
+
+    with open(Args.out, "a") as Out:
+        for Name, FixturePath in Fixtures:
+            Digest = hashlib.sha1(open(FixturePath, "rb").read()).hexdigest()
+            Totals = {}
+
+            for Repeat in range(Args.repeat):
+                Phases, Counts = BenchmarkFixture(Module, FixturePath, ExportDirectory, Formats)
+
+                for Phase, Stages in Phases:
+                    for Stage in Stages:
+                        Record = dict(RunInfo, Fixture = Name, FixtureSHA1 = Digest, Preset = vox_generator.PRESETS.get(Name), Repeat = Repeat, Phase = Phase, **Counts)
+                        Record.update(Stage)
+                        Out.write(json.dumps(Record) + "\n")
+
+                        if Stage["Stage"] == "Total": Totals.setdefault(Phase, []).append(Stage["Seconds"])
+                Out.flush()
+
+            print(Name.ljust(20), "  ".join(Phase + " " + str(round(statistics.median(Seconds), 3)) + "s" for Phase, Seconds in Totals.items()))
+
+    ClearScene()
+    print("Results added to", os.path.abspath(Args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    Argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(main(Argv))
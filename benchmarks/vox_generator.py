@@ -0,0 +1,242 @@
+# Deterministic synthetic MagicaVoxel (.vox, version 200) generator for the Vox Cleaner benchmarks.
+#
+# Every file is fully described by its parameters & seed, so the same preset always gives the same bytes.
+# The checked in fixtures are made with:
+#
+#   python benchmarks/vox_generator.py              (writes all the FIXTURES into benchmarks/fixtures)
+#   python benchmarks/vox_generator.py --check      (fails if a checked in fixture doesn't match its preset)
+#   python benchmarks/vox_generator.py --out DIR --preset stress_terrain
+
+import os, sys
+import argparse
+import hashlib
+import math
+import random
+import struct
+
+
+# Material types of the MATL chunk & the keys the importer reads for them
+MaterialTypes = ["_diffuse", "_metal", "_glass", "_emit", "_blend"]
+
+# Presets, checked in under benchmarks/fixtures. Keep these small, the big ones are in STRESS
+FIXTURES = {
+    "single_small":     dict(Voxels = 2000,  Palette = 8,   Models = 1, Instances = 1,  Depth = 1, Materials = {"_diffuse": 1}),
+    "single_medium":    dict(Voxels = 20000, Palette = 32,  Models = 1, Instances = 1,  Depth = 1, Materials = {"_diffuse": 1}),
+    "palette_full":     dict(Voxels = 12000, Palette = 255, Models = 1, Instances = 1,  Depth = 1, Materials = {"_diffuse": 1}),
+    "materials_mixed":  dict(Voxels = 8000,  Palette = 40,  Models = 1, Instances = 1,  Depth = 1, Materials = {"_diffuse": 2, "_metal": 1, "_glass": 1, "_emit": 1, "_blend": 1}),
+    "graph_deep":       dict(Voxels = 500,   Palette = 16,  Models = 2, Instances = 8,  Depth = 6, Materials = {"_diffuse": 3, "_metal": 1}),
+    "instanced_many":   dict(Voxels = 300,   Palette = 16,  Models = 4, Instances = 32, Depth = 2, Materials = {"_diffuse": 1}),
+    "scattered_sparse": dict(Voxels = 3000,  Palette = 24,  Models = 1, Instances = 1,  Depth = 1, Materials = {"_diffuse": 1}, Shape = "Scatter"),
+}
+
+# Generated on demand only, too big for the repo
+STRESS = {
+    "stress_terrain":   dict(Voxels = 250000, Palette = 128, Models = 1, Instances = 1,  Depth = 1, Materials = {"_diffuse": 4, "_metal": 1, "_emit": 1}),
+    "stress_scene":     dict(Voxels = 20000,  Palette = 64,  Models = 8, Instances = 64, Depth = 4, Materials = {"_diffuse": 4, "_metal": 1, "_glass": 1}),
+}
+
+PRESETS = dict(FIXTURES, **STRESS)
+
+FixturesDirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# Chunk writing ##########################################################################################################################
+
+def String(Value):
+    Value = Value.encode("utf-8")
+    return struct.pack("<i", len(Value)) + Value
+
+def Dict(Values):
+    Data = struct.pack("<i", len(Values))
+    for Key, Value in Values.items():
+        Data += String(Key) + String(Value)
+    return Data
+
+def Chunk(Name, Content, Children = b""):
+    return Name + struct.pack("<ii", len(Content), len(Children)) + Content + Children
+
+
+# Model generation ##########################################################################################################################
+
+def ModelSize(Voxels, Shape):
+    # Terrain fills about half of a cube, scatter about a tenth
+    Fill = 0.5 if Shape == "Terrain" else 0.1
+    Side = max(2, math.ceil((Voxels/Fill) ** (1/3)))
+    if Side > 256: raise ValueError("Too many voxels for one model, use more models instead")
+    return Side, Side, Side
+
+def ModelVoxels(Rng, Voxels, Size, Palette, Shape):
+    # Returns exactly 'Voxels' (x, y, z, ColorIndex) tuples inside Size
+    X, Y, Z = Size
+    Voxels = min(Voxels, X*Y*Z)
+
+    if Shape == "Scatter":
+        Cells = sorted(Rng.sample(range(X*Y*Z), Voxels))
+        Positions = [(Cell % X, (Cell // X) % Y, Cell // (X*Y)) for Cell in Cells]
+    else:
+        # A bumpy height field, filled column by column from the bottom until the voxel count is reached
+        Bumps = [(Rng.uniform(0, X), Rng.uniform(0, Y), Rng.uniform(2, max(3, X/3)), Rng.uniform(-1, 1)) for _ in range(6)]
+        Heights = {}
+        for x in range(X):
+            for y in range(Y):
+                h = sum(Amp * math.exp(-((x-bx)**2 + (y-by)**2) / (2*r*r)) for bx, by, r, Amp in Bumps)
+                Heights[(x, y)] = h
+
+        Cells = sorted(((z - Z*0.25*Heights[(x, y)], x, y, z) for x in range(X) for y in range(Y) for z in range(Z)))
+        Positions = sorted((x, y, z) for _, x, y, z in Cells[:Voxels])
+
+    # Colors in 4x4x4 patches, so the baked textures have some structure
+    Patches = {}
+    Result = []
+    for x, y, z in Positions:
+        Patch = (x//4, y//4, z//4)
+        if Patch not in Patches: Patches[Patch] = Rng.randint(1, Palette)
+        Result.append((x, y, z, Patches[Patch]))
+    return Result
+
+def RotationByte(Rng):
+    # Random valid MagicaVoxel rotation, first & second row index + three signs
+    Rows = [0, 1, 2]
+    Rng.shuffle(Rows)
+    Signs = [Rng.randint(0, 1) for _ in range(3)]
+    return Rows[0] | (Rows[1] << 2) | (Signs[0] << 4) | (Signs[1] << 5) | (Signs[2] << 6)
+
+
+# File generation ##########################################################################################################################
+
+def GenerateVox(Voxels = 1000, Palette = 16, Models = 1, Instances = 1, Depth = 1, Materials = {"_diffuse": 1}, Shape = "Terrain", Seed = 0):
+    """Returns the bytes of a .vox file.
+    Voxels: voxel count of each model, Palette: colors used (1-255), Models: distinct models,
+    Instances: shape nodes placed in the scene (reusing the models), Depth: nested group levels,
+    Materials: relative weights of the MATL types, Shape: 'Terrain' or 'Scatter'"""
+
+    Rng = random.Random(Seed)
+    Palette = max(1, min(255, Palette))
+    Instances = max(Instances, Models)
+
+    Chunks = b""
+
+    # SIZE & XYZI for every model
+    for _ in range(Models):
+        Size = ModelSize(Voxels, Shape)
+        ModelData = ModelVoxels(Rng, Voxels, Size, Palette, Shape)
+
+        Chunks += Chunk(b"SIZE", struct.pack("<3i", *Size))
+        Chunks += Chunk(b"XYZI", struct.pack("<i", len(ModelData)) + b"".join(struct.pack("<4B", *Voxel) for Voxel in ModelData))
+
+    # Scene graph: ROOT transform > group > [transform > group] * (Depth-1) > transforms > shapes
+    # The leaves are spread over the deepest groups, node ids are shared between all node types
+    NodeID = [0]
+    def NewID():
+        NodeID[0] += 1
+        return NodeID[0] - 1
+
+    def Transform(ID, ChildID, Layer, Name = None, Frame = {}):
+        Attributes = {"_name": Name} if Name else {}
+        return Chunk(b"nTRN", struct.pack("<i", ID) + Dict(Attributes) + struct.pack("<3i", ChildID, -1, Layer) + struct.pack("<i", 1) + Dict(Frame))
+
+    def Group(ID, ChildIDs):
+        return Chunk(b"nGRP", struct.pack("<i", ID) + Dict({}) + struct.pack("<i", len(ChildIDs)) + b"".join(struct.pack("<i", i) for i in ChildIDs))
+
+    def Shape(ID, ModelID):
+        return Chunk(b"nSHP", struct.pack("<i", ID) + Dict({}) + struct.pack("<i", 1) + struct.pack("<i", ModelID) + Dict({}))
+
+    Leaves = [i % Models for i in range(Instances)]
+    Spacing = ModelSize(Voxels, Shape)[0] + 2
+    LeafIndex = [0]
+
+    def Branch(Level, LeafCount, Layer):
+        # Writes a transform (+ group or shape) & returns (transform id, chunks)
+        TransformID = NewID()
+        if Level == 0:
+            Index = LeafIndex[0]
+            LeafIndex[0] += 1
+            ShapeID = NewID()
+            Frame = {"_t": str(Index % 8 * Spacing) + " " + str(Index // 8 * Spacing) + " 0"}
+            if Index % 3 == 1: Frame["_r"] = str(RotationByte(Rng))
+            return TransformID, Transform(TransformID, ShapeID, Layer, "Model_" + str(Index), Frame) + Shape(ShapeID, Leaves[Index])
+
+        GroupID = NewID()
+        Children = [LeafCount // 2 + LeafCount % 2, LeafCount // 2] if Level > 1 and LeafCount > 1 else [1] * LeafCount
+        Data, ChildIDs = b"", []
+        for Count in Children:
+            ChildID, ChildData = Branch(Level - 1, Count, Layer)
+            ChildIDs.append(ChildID)
+            Data += ChildData
+        Frame = {"_t": "0 0 " + str(Level)} if Level % 2 == 0 else {}
+        return TransformID, Transform(TransformID, GroupID, Layer, "Group_" + str(TransformID), Frame) + Group(GroupID, ChildIDs) + Data
+
+    # The root transform isn't on any layer, everything else is on layer 0
+    RootID = NewID()
+    RootGroupID = NewID()
+    Data, ChildIDs = b"", []
+    if Depth <= 1:
+        for _ in range(Instances):
+            ChildID, ChildData = Branch(0, 1, 0)
+            ChildIDs.append(ChildID)
+            Data += ChildData
+    else:
+        ChildID, Data = Branch(Depth - 1, Instances, 0)
+        ChildIDs.append(ChildID)
+    Chunks += Transform(RootID, RootGroupID, -1) + Group(RootGroupID, ChildIDs) + Data
+
+    # Layers, the second one is hidden & empty
+    Chunks += Chunk(b"LAYR", struct.pack("<i", 0) + Dict({"_name": "Models"}) + struct.pack("<i", -1))
+    Chunks += Chunk(b"LAYR", struct.pack("<i", 1) + Dict({"_name": "Hidden", "_hidden": "1"}) + struct.pack("<i", -1))
+
+    # Palette, 256 entries, the unused ones are grey
+    Colors = []
+    for i in range(256):
+        if i < Palette: Colors.append(bytes([Rng.randint(0, 255), Rng.randint(0, 255), Rng.randint(0, 255), 255]))
+        else: Colors.append(bytes([128, 128, 128, 255]))
+    Chunks += Chunk(b"RGBA", b"".join(Colors))
+
+    # Materials, types are handed out in proportion to their weights
+    Weights = [(Type, Materials.get(Type, 0)) for Type in MaterialTypes if Materials.get(Type, 0) > 0]
+    TypeCycle = [Type for Type, Weight in Weights for _ in range(Weight)] or ["_diffuse"]
+    for i in range(1, 257):
+        Type = TypeCycle[(i-1) % len(TypeCycle)] if i <= Palette else "_diffuse"
+        Values = {"_type": Type, "_rough": "%.3f" % Rng.uniform(0.05, 0.95)}
+        if Type in ("_metal", "_blend"): Values["_metal"] = "%.3f" % Rng.uniform(0.2, 1.0)
+        if Type in ("_glass", "_blend"): Values.update({"_alpha": "%.3f" % Rng.uniform(0.2, 0.9), "_trans": "0.5", "_ior": "0.3"})
+        if Type == "_emit": Values.update({"_emit": "%.3f" % Rng.uniform(0.2, 1.0), "_flux": "2"})
+        Chunks += Chunk(b"MATL", struct.pack("<i", i) + Dict(Values))
+
+    return b"VOX " + struct.pack("<i", 200) + Chunk(b"MAIN", b"", Chunks)
+
+def GeneratePreset(Name, Seed = 0):
+    return GenerateVox(Seed = Seed, **PRESETS[Name])
+
+def Digest(Data):
+    return hashlib.sha1(Data).hexdigest()
+
+
+def main(Argv):
+    Parser = argparse.ArgumentParser(description = "Generate the synthetic .vox benchmark fixtures")
+    Parser.add_argument("--out", default = FixturesDirectory, help = "Output directory")
+    Parser.add_argument("--preset", action = "append", choices = sorted(PRESETS), help = "Preset(s) to write, defaults to all the checked in fixtures")
+    Parser.add_argument("--seed", type = int, default = 0)
+    Parser.add_argument("--check", action = "store_true", help = "Only check that the files in --out match the presets")
+    Args = Parser.parse_args(Argv)
+
+    Mismatches = 0
+    os.makedirs(Args.out, exist_ok = True)
+    for Name in Args.preset or sorted(FIXTURES):
+        Data = GeneratePreset(Name, Args.seed)
+        FilePath = os.path.join(Args.out, Name + ".vox")
+
+        if Args.check:
+            Existing = open(FilePath, "rb").read() if os.path.exists(FilePath) else b""
+            Status = "ok" if Existing == Data else "MISMATCH"
+            Mismatches += Status != "ok"
+        else:
+            with open(FilePath, "wb") as File: File.write(Data)
+            Status = "written"
+
+        print(Name.ljust(20), str(len(Data)).rjust(9), "bytes", Digest(Data)[:12], Status)
+
+    return 1 if Mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))